@@ -0,0 +1,121 @@
+# elihaus_audit.py — offline provably-fair check of every stored roulette/lotto seed
+# Streams `rounds` and `lotto_draws` from one or more guild shards (read-only), replays each
+# seed through elihaus_games and prints any row whose stored pocket/color/winner doesn't match.
+#
+#   python elihaus_audit.py                      # every shard in $ELIHAUS_DB_DIR (default elihaus_db)
+#   python elihaus_audit.py path/guild_1.db ...  # specific files (a legacy single DB works too)
+#   python elihaus_audit.py --workers 8          # spread roulette replays over processes
+#
+# Exit status is 1 if anything mismatched, so it can run from cron/CI.
+import argparse, glob, json, os, sqlite3, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+from elihaus_games import roulette_roll, roulette_color, lotto_draw, lotto_pick
+
+BATCH = 5000
+
+def _connect_ro(path: str) -> sqlite3.Connection:
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+def _check_rounds(batch: list[tuple]) -> tuple[int, list[tuple]]:
+    """(rid, seed, outcome, pocket) rows -> (rows checked, mismatches as (rid, stored, replayed)).
+    pocket is NULL on rounds settled before bet types; then only the color is checked."""
+    bad = []
+    for rid, seed, outcome, pocket in batch:
+        p = roulette_roll(seed)
+        if roulette_color(p) != outcome or (pocket is not None and pocket != p):
+            bad.append((rid, outcome if pocket is None else f"{pocket} {outcome}", f"{p} {roulette_color(p)}"))
+    return len(batch), bad
+
+def _round_batches(conn: sqlite3.Connection):
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(rounds)")}
+    pocket_col = "pocket" if "pocket" in cols else "NULL"
+    c = conn.execute(f"""SELECT rid, seed, outcome, {pocket_col} FROM rounds
+                         WHERE status='RESOLVED' AND seed IS NOT NULL""")
+    while True:
+        batch = c.fetchmany(BATCH)
+        if not batch:
+            return
+        yield batch
+
+def audit_rounds(conn: sqlite3.Connection, pool: ProcessPoolExecutor | None) -> tuple[int, list[tuple]]:
+    checked, bad = 0, []
+    batches = _round_batches(conn)
+    for n, found in (pool.map(_check_rounds, batches) if pool else map(_check_rounds, batches)):
+        checked += n
+        bad += found
+    return checked, bad
+
+def audit_lotto(conn: sqlite3.Connection) -> tuple[int, list[tuple]]:
+    """(week, stored winner(s), replayed winner(s)) for each draw that doesn't replay."""
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(lotto_draws)")}
+    count_col = "ticket_count" if "ticket_count" in cols else "NULL"
+    winners_col = "winner_ids" if "winner_ids" in cols else "NULL"
+    checked, bad = 0, []
+    draws = conn.execute(f"""SELECT week_id, run_at, winner_id, seed, {count_col}, {winners_col} FROM lotto_draws
+                             WHERE status='DONE' AND seed IS NOT NULL ORDER BY id""").fetchall()
+    for wk, run_at, winner_id, seed, ticket_count, winner_ids in draws:
+        if winner_ids:
+            # weighted draw without replacement over per-holder counts of the first ticket_count tickets
+            holders = conn.execute("""SELECT discord_id, COUNT(*) FROM
+                                      (SELECT id, discord_id FROM tickets WHERE week_id=? ORDER BY id LIMIT ?)
+                                      GROUP BY discord_id ORDER BY MIN(id)""", (wk, ticket_count)).fetchall()
+            stored = json.loads(winner_ids)
+            replayed = lotto_draw(seed, holders, len(stored))
+            checked += 1
+            if replayed != stored:
+                bad.append((wk, ",".join(stored), ",".join(replayed) or None))
+            continue
+        if ticket_count:
+            tix = conn.execute("SELECT id, discord_id FROM tickets WHERE week_id=? ORDER BY id LIMIT ?",
+                               (wk, ticket_count)).fetchall()
+        else:
+            # draws from before ticket_count was stored: tickets bought up to the draw
+            tix = conn.execute("SELECT id, discord_id FROM tickets WHERE week_id=? AND ts<=? ORDER BY id",
+                               (wk, run_at)).fetchall()
+        checked += 1
+        replayed = lotto_pick(seed, tix)[1] if tix else None
+        if replayed != winner_id:
+            bad.append((wk, winner_id, replayed))
+    return checked, bad
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Replay stored EliHaus roulette/lotto seeds and report mismatches.")
+    ap.add_argument("paths", nargs="*", help="DB files (default: every guild shard in ELIHAUS_DB_DIR)")
+    ap.add_argument("--workers", type=int, default=0, help="processes for roulette replays (0 = in-process)")
+    args = ap.parse_args(argv)
+
+    paths = args.paths or sorted(glob.glob(os.path.join(os.getenv("ELIHAUS_DB_DIR", "elihaus_db"), "guild_*.db")))
+    if not paths:
+        print("No databases to audit.", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    total_rounds = total_draws = mismatches = 0
+    pool = ProcessPoolExecutor(args.workers) if args.workers > 0 else None
+    try:
+        for path in paths:
+            conn = _connect_ro(path)
+            try:
+                n_rounds, bad_rounds = audit_rounds(conn, pool)
+                n_draws, bad_draws = audit_lotto(conn)
+            finally:
+                conn.close()
+            total_rounds += n_rounds
+            total_draws += n_draws
+            for rid, stored, replayed in bad_rounds:
+                print(f"MISMATCH {path} round {rid}: stored {stored}, seed gives {replayed}")
+            for wk, stored, replayed in bad_draws:
+                print(f"MISMATCH {path} lotto {wk}: stored winner {stored}, seed gives {replayed}")
+            mismatches += len(bad_rounds) + len(bad_draws)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - started
+    print(f"Audited {total_rounds} rounds and {total_draws} lotto draws in {len(paths)} DB(s) "
+          f"in {elapsed:.2f}s — {mismatches} mismatch(es).")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# elihaus_backup.py — online, verified, rotated backups of the guild shards
+# Copies a live SQLite file with the backup API, `pages` at a time, from its own connection that
+# holds one read transaction for the whole copy. Under WAL that pins a snapshot: the bot keeps
+# writing (it never waits on us) and the copy is that snapshot, instead of restarting every time
+# a write lands between steps. The copy then has to pass PRAGMA integrity_check, is gzip'd into
+#
+#   <out>/<name>-YYYYmmdd-HHMMSS.db.gz
+#
+# and the archive is read back and compared (sha256) with the checked copy before it replaces
+# anything; only then are the oldest archives beyond `keep` deleted. Blocking throughout: the bot
+# runs it in a worker thread. Also a CLI:
+#
+#   python elihaus_backup.py                       # every shard in $ELIHAUS_DB_DIR -> elihaus_backups/
+#   python elihaus_backup.py path/guild_1.db --out /mnt/backups --keep 30
+#   python elihaus_backup.py --verify elihaus_backups/guild_1-20260101-030000.db.gz
+#
+# Stdlib only, so it can be imported without discord.py.
+import argparse, glob, gzip, hashlib, os, shutil, sqlite3, sys, tempfile, threading, time
+from datetime import datetime
+
+PAGES = 256          # pages copied per step
+STEP_PAUSE = 0.002   # seconds between steps, so a big copy doesn't hog the disk
+CHUNK = 1 << 20
+
+_running: set[str] = set()
+_running_lock = threading.Lock()
+
+class BackupError(Exception):
+    pass
+
+def _sha256(f, chunk: int = CHUNK) -> str:
+    h = hashlib.sha256()
+    while block := f.read(chunk):
+        h.update(block)
+    return h.hexdigest()
+
+def integrity_check(path: str) -> str:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute("PRAGMA integrity_check").fetchall()
+    finally:
+        conn.close()
+    return "; ".join(r[0] for r in rows[:5])
+
+def snapshot(src_path: str, dest_path: str, pages: int = PAGES, pause: float = STEP_PAUSE) -> int:
+    """Consistent copy of a live DB into dest_path. Returns the number of steps taken."""
+    src = sqlite3.connect(f"file:{src_path}?mode=ro", uri=True, isolation_level=None)
+    dst = sqlite3.connect(dest_path)
+    steps = 0
+
+    def progress(_status, _remaining, _total):
+        nonlocal steps
+        steps += 1
+        if pause:
+            time.sleep(pause)
+    try:
+        src.execute("BEGIN")
+        src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()  # start the read: pins the snapshot
+        src.backup(dst, pages=pages, progress=progress)
+        src.execute("COMMIT")
+    finally:
+        dst.close()
+        src.close()
+    return steps
+
+def archives(out_dir: str, name: str) -> list[str]:
+    """Existing archives for `name`, oldest first."""
+    return sorted(glob.glob(os.path.join(out_dir, f"{glob.escape(name)}-????????-??????.db.gz")))
+
+def verify_archive(path: str) -> str:
+    """Decompress `path` to a temp file and integrity_check it; returns 'ok' or the problems."""
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = os.path.join(tmp, "check.db")
+        try:
+            with gzip.open(path, "rb") as src, open(raw, "wb") as dst:
+                shutil.copyfileobj(src, dst, CHUNK)
+        except (OSError, EOFError) as e:
+            return f"unreadable archive: {e}"
+        return integrity_check(raw)
+
+def backup_db(src_path: str, out_dir: str, name: str | None = None, keep: int = 14,
+              pages: int = PAGES, pause: float = STEP_PAUSE) -> dict:
+    """Snapshot, check, compress, verify and rotate one DB. Returns a summary dict; raises
+    BackupError if the copy fails its checks (nothing is rotated away then)."""
+    name = name or os.path.splitext(os.path.basename(src_path))[0]
+    key = os.path.abspath(src_path)
+    with _running_lock:
+        if key in _running:
+            raise BackupError(f"a backup of {name} is already running")
+        _running.add(key)
+    started = time.monotonic()
+    try:
+        os.makedirs(out_dir, exist_ok=True)
+        final = os.path.join(out_dir, f"{name}-{datetime.now():%Y%m%d-%H%M%S}.db.gz")
+        with tempfile.TemporaryDirectory(dir=out_dir, prefix=".backup-") as tmp:
+            raw = os.path.join(tmp, "snapshot.db")
+            steps = snapshot(src_path, raw, pages, pause)
+            check = integrity_check(raw)
+            if check != "ok":
+                raise BackupError(f"{name}: snapshot failed integrity_check: {check}")
+            with open(raw, "rb") as f:
+                digest = _sha256(f)
+            packed = os.path.join(tmp, "snapshot.db.gz")
+            with open(raw, "rb") as src, gzip.open(packed, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, CHUNK)
+            with gzip.open(packed, "rb") as f:  # read back: gzip CRC + content must match
+                if _sha256(f) != digest:
+                    raise BackupError(f"{name}: compressed copy doesn't match the snapshot")
+            raw_size, size = os.path.getsize(raw), os.path.getsize(packed)
+            os.replace(packed, final)
+        removed = []
+        for old in archives(out_dir, name)[:-keep] if keep > 0 else []:
+            os.remove(old)
+            removed.append(old)
+        return {"path": final, "bytes": size, "raw_bytes": raw_size, "steps": steps, "sha256": digest,
+                "seconds": round(time.monotonic() - started, 2), "removed": removed}
+    finally:
+        with _running_lock:
+            _running.discard(key)
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Online, verified, rotated backups of EliHaus SQLite shards.")
+    ap.add_argument("paths", nargs="*", help="DB files (default: every guild shard in ELIHAUS_DB_DIR)")
+    ap.add_argument("--out", default=os.getenv("ELIHAUS_BACKUP_DIR", "elihaus_backups"), help="archive directory")
+    ap.add_argument("--keep", type=int, default=14, help="archives kept per DB (0 = keep all)")
+    ap.add_argument("--verify", metavar="ARCHIVE", nargs="+", help="only check existing .db.gz archives")
+    args = ap.parse_args(argv)
+
+    if args.verify:
+        bad = 0
+        for path in args.verify:
+            result = verify_archive(path)
+            bad += result != "ok"
+            print(f"{path}: {result}")
+        return 1 if bad else 0
+    paths = args.paths or sorted(glob.glob(os.path.join(os.getenv("ELIHAUS_DB_DIR", "elihaus_db"), "guild_*.db")))
+    if not paths:
+        print("No databases to back up.", file=sys.stderr)
+        return 2
+    failed = 0
+    for path in paths:
+        try:
+            r = backup_db(path, args.out, keep=args.keep)
+        except (BackupError, sqlite3.Error, OSError) as e:
+            failed += 1
+            print(f"FAILED {path}: {e}", file=sys.stderr)
+            continue
+        print(f"{path} -> {r['path']} ({r['raw_bytes'] // 1024} KB -> {r['bytes'] // 1024} KB, "
+              f"{r['steps']} steps, {r['seconds']}s, {len(r['removed'])} rotated out)")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
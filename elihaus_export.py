@@ -0,0 +1,153 @@
+# elihaus_export.py — streaming export of ledger / game history (tx, bets, slots_spins, withdraw_requests)
+# Rows are read with fetchmany() and written straight into a gzip stream, so memory stays flat
+# no matter how long the history is. Used by the bot's /eh_export and as a CLI:
+#
+#   python elihaus_export.py --guild 123 --tables tx,bets --format jsonl --user 456 --since 2025-01-01 --out exports/
+#   python elihaus_export.py --db elihaus_db/guild_123.db --game slots
+#   python elihaus_export.py --guild 123 --tables tx --user 456 --kind payout
+#
+# Writes one <table>.<csv|jsonl>.gz per table. Dates compare against the stored ISO timestamps,
+# so --since/--until take YYYY-MM-DD (until is inclusive of that whole day).
+# Stdlib only, so it can be imported without discord.py.
+import argparse, csv, gzip, io, json, os, sqlite3, sys
+from typing import IO
+
+CHUNK = 2000
+
+# table -> (columns, user column, timestamp column)
+EXPORT_TABLES: dict[str, tuple[tuple[str, ...], str, str]] = {
+    "tx": (("id", "discord_id", "kind", "amount", "meta", "ts"), "discord_id", "ts"),
+    "bets": (("id", "rid", "channel_id", "discord_id", "choice", "stake", "ts"), "discord_id", "ts"),
+    "slots_spins": (("id", "channel_id", "discord_id", "r1", "r2", "r3", "win", "pot_before", "ts"), "discord_id", "ts"),
+    "withdraw_requests": (("id", "discord_id", "coins", "gifts", "imvu_name", "imvu_profile", "note", "status",
+                           "ticket_channel_id", "message_id", "reviewer_id", "review_note", "created_ts", "updated_ts"),
+                          "discord_id", "created_ts"),
+}
+GAMES = ("roulette", "slots", "lotto")
+# (table, game) -> extra WHERE; a table with no entry for the chosen game is skipped
+GAME_FILTERS: dict[tuple[str, str], str] = {
+    ("tx", "roulette"): "meta LIKE 'roulette:%'",
+    ("tx", "slots"): "meta LIKE 'slots|%'",
+    ("tx", "lotto"): "(kind='lotto' OR meta LIKE 'tickets %')",
+    ("bets", "roulette"): "1",
+    ("slots_spins", "slots"): "1",
+}
+FORMATS = ("csv", "jsonl")
+
+def build_where(table: str, user: str | None = None, since: str | None = None, until: str | None = None,
+                game: str | None = None, kind: str | None = None) -> tuple[list[str], list] | None:
+    """WHERE conditions + args for one table's filters, or None if `game`/`kind` doesn't apply to it
+    (kind is a tx column only)."""
+    _cols, user_col, ts_col = EXPORT_TABLES[table]
+    where, args = [], []
+    if game:
+        cond = GAME_FILTERS.get((table, game))
+        if cond is None:
+            return None
+        where.append(cond)
+    if kind:
+        if table != "tx":
+            return None
+        where.append("kind=?")
+        args.append(kind)
+    if user:
+        where.append(f"{user_col}=?")
+        args.append(str(user))
+    if since:
+        where.append(f"{ts_col}>=?")
+        args.append(since)
+    if until:
+        where.append(f"{ts_col}<?")
+        args.append(until + "\uffff")  # any timestamp on that day sorts below this
+    return where, args
+
+def build_query(table: str, **filters) -> tuple[str, list] | None:
+    """SELECT for one table with the filters applied (see build_where), or None if they rule it out."""
+    clause = build_where(table, **filters)
+    if clause is None:
+        return None
+    where, args = clause
+    sql = f"SELECT {','.join(EXPORT_TABLES[table][0])} FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return sql + " ORDER BY id", args
+
+def export_table(conn: sqlite3.Connection, table: str, fmt: str, out: IO[bytes], **filters) -> int:
+    """Stream one table into `out` as gzip'd CSV (with header) or JSONL. Returns rows written."""
+    q = build_query(table, **filters)
+    cols = EXPORT_TABLES[table][0]
+    n = 0
+    with gzip.GzipFile(fileobj=out, mode="wb") as gz, io.TextIOWrapper(gz, encoding="utf-8", newline="") as text:
+        writer = csv.writer(text) if fmt == "csv" else None
+        if writer:
+            writer.writerow(cols)
+        if q is None:
+            return 0
+        cur = conn.execute(*q)
+        while True:
+            rows = cur.fetchmany(CHUNK)
+            if not rows:
+                break
+            if writer:
+                writer.writerows(rows)
+            else:
+                text.writelines(json.dumps(dict(zip(cols, r)), ensure_ascii=False) + "\n" for r in rows)
+            n += len(rows)
+    return n
+
+def export_to_dir(db_path: str, out_dir: str, tables: list[str], fmt: str = "csv", **filters) -> dict[str, tuple[str, int]]:
+    """Write <table>.<fmt>.gz files into out_dir from a read-only connection.
+    Returns {table: (path, rows)}."""
+    os.makedirs(out_dir, exist_ok=True)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    done = {}
+    try:
+        for table in tables:
+            path = os.path.join(out_dir, f"{table}.{fmt}.gz")
+            with open(path, "wb") as f:
+                done[table] = (path, export_table(conn, table, fmt, f, **filters))
+    finally:
+        conn.close()
+    return done
+
+def parse_tables(spec: str | None) -> list[str]:
+    """'tx,bets' / 'all' / None -> table names; raises ValueError on an unknown one."""
+    if not spec or spec.strip().lower() == "all":
+        return list(EXPORT_TABLES)
+    tables = [t.strip() for t in spec.split(",") if t.strip()]
+    unknown = [t for t in tables if t not in EXPORT_TABLES]
+    if unknown:
+        raise ValueError(f"unknown table(s): {', '.join(unknown)} (choose from {', '.join(EXPORT_TABLES)})")
+    return tables
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Export EliHaus ledger/game history as gzip'd CSV or JSONL.")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--db", help="SQLite file to read")
+    src.add_argument("--guild", type=int, help="guild id (reads $ELIHAUS_DB_DIR/guild_<id>.db)")
+    ap.add_argument("--tables", default="all", help=f"comma list or 'all' ({', '.join(EXPORT_TABLES)})")
+    ap.add_argument("--format", choices=FORMATS, default="csv")
+    ap.add_argument("--user", help="only rows for this Discord user id")
+    ap.add_argument("--since", help="YYYY-MM-DD (inclusive)")
+    ap.add_argument("--until", help="YYYY-MM-DD (inclusive)")
+    ap.add_argument("--game", choices=GAMES)
+    ap.add_argument("--kind", help="only tx rows of this kind (other tables are skipped)")
+    ap.add_argument("--out", default="exports", help="output directory")
+    args = ap.parse_args(argv)
+
+    try:
+        tables = parse_tables(args.tables)
+    except ValueError as e:
+        ap.error(str(e))
+    db_path = args.db or os.path.join(os.getenv("ELIHAUS_DB_DIR", "elihaus_db"), f"guild_{args.guild}.db")
+    if not os.path.exists(db_path):
+        print(f"No database at {db_path}", file=sys.stderr)
+        return 2
+    done = export_to_dir(db_path, args.out, tables, args.format,
+                         user=args.user, since=args.since, until=args.until, game=args.game, kind=args.kind)
+    for table, (path, rows) in done.items():
+        print(f"{table}: {rows} rows -> {path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+# elihaus_games.py — EliHaus game rules (roulette roll + bet types, lotto draw, slots paylines)
+# Every draw runs on its own random.Random(seed), never the shared `random` module, so:
+#   - a stored seed always replays to the same outcome (elihaus_audit.py checks this), and
+#   - one game's reseeding can't shift another game's sequence (slots keeps its own RNG).
+# Seeded exactly like the old random.seed(seed) calls, so pre-existing seeds still verify.
+# The bot and the offline simulator (elihaus_sim.py) both take their rules from here.
+# Stdlib only, so it can be imported without discord.py.
+import dataclasses
+import itertools
+import json
+import os
+import random
+import secrets
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Sequence, TypeVar
+
+T = TypeVar("T")
+
+RED_NUMS = frozenset({1,3,5,7,9,12,14,16,18,19,21,23,25,27,30,32,34,36})
+
+def new_seed(prefix: str, ident: str, now_ts: float) -> str:
+    """e.g. ROUL-{rid}-{unix}-{nonce} / LOTTO-{week}-{unix}-{nonce}; the nonce is unpredictable."""
+    return f"{prefix}-{ident}-{int(now_ts)}-{secrets.randbelow(1_000_000) + 1}"
+
+# ---------------- Roulette ----------------
+def roulette_roll(seed: str) -> int:
+    """Pocket 0-36 for this seed (0 = green)."""
+    return random.Random(seed).randint(0, 36)
+
+def roulette_color(pocket: int) -> str:
+    if pocket == 0:
+        return "green"
+    return "red" if pocket in RED_NUMS else "black"
+
+def roulette_outcome(seed: str) -> str:
+    return roulette_color(roulette_roll(seed))
+
+# Every bet type is a 37-bit mask over the pockets plus a stake multiplier (stake included), built
+# once per rules instance. Settling a bet is one bit test, however many bet types the table offers.
+def _mask(pockets) -> int:
+    m = 0
+    for p in pockets:
+        m |= 1 << p
+    return m
+
+POCKET_MASKS: dict[str, int] = {
+    "red": _mask(RED_NUMS),
+    "black": _mask(p for p in range(1, 37) if p not in RED_NUMS),
+    "green": _mask([0]),
+    "odd": _mask(range(1, 37, 2)),
+    "even": _mask(range(2, 37, 2)),
+    "low": _mask(range(1, 19)),
+    "high": _mask(range(19, 37)),
+    **{f"dozen{d}": _mask(range(12 * d - 11, 12 * d + 1)) for d in (1, 2, 3)},
+    **{f"col{k}": _mask(range(k, 37, 3)) for k in (1, 2, 3)},
+    **{str(n): _mask([n]) for n in range(37)},  # straight up
+}
+
+# what players may type for a bet -> canonical choice (numbers 0-36 are accepted as-is)
+_CHOICE_ALIASES = {
+    "r": "red", "b": "black", "g": "green", "zero": "0",
+    "1-18": "low", "19-36": "high", "manque": "low", "passe": "high",
+    "1st12": "dozen1", "2nd12": "dozen2", "3rd12": "dozen3", "d1": "dozen1", "d2": "dozen2", "d3": "dozen3",
+    "1-12": "dozen1", "13-24": "dozen2", "25-36": "dozen3",
+    "column1": "col1", "column2": "col2", "column3": "col3", "c1": "col1", "c2": "col2", "c3": "col3",
+}
+
+@dataclass(frozen=True)
+class RouletteRules:
+    payout_red_black: float = 2.0  # stake multiplier, stake included; also odd/even and low/high
+    payout_green: float = 14.0
+    payout_dozen: float = 3.0      # dozens and columns
+    payout_straight: float = 36.0  # a single number
+
+    @cached_property
+    def bet_types(self) -> dict[str, tuple[int, float]]:
+        """choice -> (pocket mask, multiplier)."""
+        pay = {"red": self.payout_red_black, "black": self.payout_red_black, "green": self.payout_green,
+               "odd": self.payout_red_black, "even": self.payout_red_black,
+               "low": self.payout_red_black, "high": self.payout_red_black}
+        return {ch: (mask, pay[ch] if ch in pay else self.payout_dozen if ch[0] in "dc" else self.payout_straight)
+                for ch, mask in POCKET_MASKS.items()}
+
+    def parse_choice(self, text: str) -> str | None:
+        """Player input ("17", "odd", "2nd 12", "col 3", ...) -> canonical choice, or None."""
+        key = "".join(str(text).lower().split())
+        key = _CHOICE_ALIASES.get(key, key)
+        return key if key in self.bet_types else None
+
+    def multiplier(self, choice: str) -> float:
+        return self.bet_types[choice][1]
+
+    def hits(self, choice: str, pocket: int) -> bool:
+        return bool(self.bet_types[choice][0] >> pocket & 1)
+
+    def win(self, choice: str, pocket: int, stake: int) -> int:
+        """Coins credited back for one bet (0 if it lost)."""
+        mask, mult = self.bet_types[choice]
+        return int(stake * mult) if mask >> pocket & 1 else 0
+
+    def settle(self, bets: Sequence[tuple[str, str, int]], pocket: int) -> list[tuple[str, int]]:
+        """(uid, choice, stake) rows -> [(uid, coins back)] for the winners. Stakes are grouped by
+        bet type first, so each group costs one mask test."""
+        groups: dict[str, list[tuple[str, int]]] = {}
+        for uid, choice, stake in bets:
+            groups.setdefault(choice, []).append((uid, stake))
+        out = []
+        for choice, rows in groups.items():
+            mask, mult = self.bet_types.get(choice, (0, 0.0))
+            if mask >> pocket & 1:
+                out.extend((uid, int(stake * mult)) for uid, stake in rows)
+        return out
+
+# ---------------- Lotto ----------------
+def lotto_pick(seed: str, tickets: Sequence[T]) -> T:
+    """Winning ticket; `tickets` must be in ticket-id order. Single-winner draws made before
+    lotto_draw (lotto_draws.winner_ids NULL) replay with this."""
+    return random.Random(seed).choice(tickets)
+
+class FenwickTree:
+    """Binary indexed tree over non-negative integer weights: point updates and "whose slot
+    holds unit r of the running total" in O(log n), built in O(n)."""
+    __slots__ = ("tree", "total")
+
+    def __init__(self, weights: Sequence[int]):
+        n = len(weights)
+        self.tree = [0] * (n + 1)
+        self.total = 0
+        for i, w in enumerate(weights, 1):
+            self.tree[i] += w
+            self.total += w
+            j = i + (i & -i)
+            if j <= n:
+                self.tree[j] += self.tree[i]
+
+    def add(self, i: int, delta: int):
+        self.total += delta
+        i += 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def find(self, r: int) -> int:
+        """Index i with sum(weights[:i]) <= r < sum(weights[:i + 1]), for 0 <= r < total."""
+        pos, step = 0, 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self.tree) and self.tree[nxt] <= r:
+                pos = nxt
+                r -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+def lotto_draw(seed: str, holders: Sequence[tuple[T, int]], winners: int) -> list[T]:
+    """Up to `winners` distinct holders, in draw order. `holders` is [(holder, tickets)] in order
+    of each holder's first ticket; every pick is weighted by tickets, and a winner's tickets leave
+    the draw, so nobody wins twice."""
+    rng = random.Random(seed)
+    tree = FenwickTree([n for _h, n in holders])
+    out = []
+    while len(out) < winners and tree.total > 0:
+        i = tree.find(rng.randrange(tree.total))
+        out.append(holders[i][0])
+        tree.add(i, -holders[i][1])
+    return out
+
+# ---------------- Slots ----------------
+# Reels are weighted per symbol (optionally per reel) and sampled through alias tables, so a
+# draw costs one RNG call whatever the weights. Paylines are rules checked in order (first match
+# wins), compiled once into a lookup over every symbol triple, so evaluating a spin is one index.
+# A JSON config (SLOTS_PAYTABLE=path) can replace both; without one it's the classic setup:
+# uniform reels, any triple = payout_triple of the pot, any pair = payout_double flat.
+#
+#   {"symbols": {"🍒": 30, "🍋": 25, "7️⃣": 5},          # or "reels": [{...}, {...}, {...}]
+#    "paytable": [{"match": ["7️⃣", "7️⃣", "7️⃣"], "share": 1.0},
+#                 {"match": "triple", "share": 0.8},
+#                 {"match": ["🍒", "*", "*"], "flat": 100},
+#                 {"match": "pair", "flat": 2000}]}
+class AliasTable:
+    """Vose's alias method: O(n) build, O(1) weighted draw."""
+    __slots__ = ("prob", "alias")
+
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0 or min(weights) < 0:
+            raise ValueError("reel weights must be non-negative with a positive total")
+        scaled = [w * n / total for w in weights]
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s], self.alias[s] = scaled[s], l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:  # leftovers are 1.0 up to float error
+            self.prob[i] = 1.0
+
+    def draw(self, rng: random.Random) -> int:
+        u = rng.random() * len(self.prob)
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+
+@dataclass(frozen=True)
+class Payline:
+    match: tuple[str, str, str] | str  # three symbols ("*" = any), or "triple" / "pair" / "any"
+    share: float = 0.0                 # share of the available pot
+    flat: int = 0                      # flat coins (the total is capped by the available pot)
+
+    def hits(self, r: tuple[str, str, str]) -> bool:
+        if self.match == "triple":
+            return r[0] == r[1] == r[2]
+        if self.match == "pair":  # at least two alike (a triple also counts, if no rule above took it)
+            return r[0] == r[1] or r[0] == r[2] or r[1] == r[2]
+        if self.match == "any":
+            return True
+        return all(m == "*" or m == x for m, x in zip(self.match, r))
+
+@dataclass(frozen=True)
+class SlotsRules:
+    symbols: tuple[str, ...] = ("🍒", "🍋", "🍇", "🍀", "⭐", "💎", "7️⃣")
+    cost: int = 500             # coins per spin (goes into the channel pot)
+    seed: int = 1000            # pot floor; wins only come out of pot - seed
+    payout_triple: float = 0.80 # default paytable: share of the available pot
+    payout_double: int = 2000   # default paytable: flat, capped by the available pot
+    weights: tuple[tuple[float, ...], ...] | None = None  # per reel, aligned with symbols (None = uniform)
+    paytable: tuple[Payline, ...] | None = None           # None = the default triple/pair table
+
+    @classmethod
+    def from_env(cls) -> "SlotsRules":
+        d = cls()
+        rules = cls(
+            cost=int(os.getenv("SLOTS_COST", str(d.cost))),
+            seed=int(os.getenv("SLOTS_SEED", str(d.seed))),
+            payout_triple=float(os.getenv("SLOTS_PAYOUT_TRIPLE", str(d.payout_triple))),
+            payout_double=int(os.getenv("SLOTS_PAYOUT_DOUBLE", str(d.payout_double))),
+        )
+        path = os.getenv("SLOTS_PAYTABLE")
+        return rules.with_config(path) if path else rules
+
+    def with_config(self, path: str) -> "SlotsRules":
+        """Copy with reels/paytable from a JSON file (see the format above)."""
+        with open(path, encoding="utf-8") as f:
+            cfg = json.load(f)
+        reels = cfg.get("reels") or [cfg.get("symbols") or dict.fromkeys(self.symbols, 1)] * 3
+        if len(reels) != 3:
+            raise ValueError(f"{path}: 'reels' needs exactly 3 entries")
+        symbols = tuple(dict.fromkeys(sym for reel in reels for sym in reel))
+        weights = tuple(tuple(float(reel.get(sym, 0)) for sym in symbols) for reel in reels)
+        paytable = None
+        if "paytable" in cfg:
+            paytable = []
+            for row in cfg["paytable"]:
+                match = row["match"] if isinstance(row["match"], str) else tuple(row["match"])
+                if isinstance(match, str) and match not in ("triple", "pair", "any"):
+                    raise ValueError(f"{path}: unknown match '{match}'")
+                if not isinstance(match, str) and (len(match) != 3 or any(m != "*" and m not in symbols for m in match)):
+                    raise ValueError(f"{path}: match {list(match)} must be 3 reel symbols or '*'")
+                paytable.append(Payline(match, float(row.get("share", 0)), int(row.get("flat", 0))))
+            paytable = tuple(paytable)
+        return dataclasses.replace(self, symbols=symbols, weights=weights, paytable=paytable)
+
+    @cached_property
+    def reels(self) -> tuple[AliasTable, AliasTable, AliasTable]:
+        w = self.weights or ((1.0,) * len(self.symbols),) * 3
+        return tuple(AliasTable(reel) for reel in w)
+
+    @cached_property
+    def paylines(self) -> tuple[Payline, ...]:
+        return self.paytable or (Payline("triple", share=self.payout_triple),
+                                 Payline("pair", flat=self.payout_double))
+
+    @cached_property
+    def lines(self) -> tuple[tuple[float, int], ...]:
+        """(share, flat) for every symbol triple, flat-indexed (i*n + j)*n + k."""
+        out = []
+        for r in itertools.product(self.symbols, repeat=3):
+            hit = next((p for p in self.paylines if p.hits(r)), None)
+            out.append((hit.share, hit.flat) if hit else (0.0, 0))
+        return tuple(out)
+
+    @cached_property
+    def _index(self) -> dict[str, int]:
+        return {s: i for i, s in enumerate(self.symbols)}
+
+    def line(self, r1: str, r2: str, r3: str) -> tuple[float, int]:
+        """Payline for a result as (share of available pot, flat coins)."""
+        n, ix = len(self.symbols), self._index
+        return self.lines[(ix[r1] * n + ix[r2]) * n + ix[r3]]
+
+    def win(self, line: tuple[float, int], pot: int) -> int:
+        """Coins paid for `line` from a pot of `pot` (never dips below the seed)."""
+        available = max(0, pot - self.seed)
+        share, flat = line
+        return min(int(available * share) + flat, available)
+
+    def spin(self, rng: random.Random) -> tuple[str, str, str]:
+        a, b, c = self.reels
+        sym = self.symbols
+        return sym[a.draw(rng)], sym[b.draw(rng)], sym[c.draw(rng)]
+
+    def describe(self) -> str:
+        """Paytable for the slots panel, one line per rule."""
+        out = []
+        for p in self.paylines:
+            what = {"triple": "Triples pay", "pair": "Doubles pay", "any": "Every spin pays"}.get(p.match) \
+                if isinstance(p.match, str) else "".join("❔" if m == "*" else m for m in p.match) + " pays"
+            pays = " + ".join(x for x in (f"**{p.share:.0%}** of available pot" if p.share else "",
+                                          f"**{p.flat}**" if p.flat else "") if x)
+            if pays:
+                out.append(f"{what} {pays}.")
+        return "\n".join(out)
@@ -0,0 +1,144 @@
+# elihaus_profiler.py — on-demand sampling profiler for the bot's interaction callbacks
+# Every slash command / button / modal submit runs in its own asyncio task. While profiling is on,
+# the bot registers that task here (track()), and a daemon thread samples each tracked task every
+# `interval` seconds:
+#   - if the task is the one running on the event loop thread: the real thread stack from the
+#     task's coroutine down (sync DB calls, JSON, ... show up here), and
+#   - otherwise: the chain of coroutines it is suspended in, ending in "(await)" — time spent
+#     waiting on Discord/REST shows up here.
+# When a task finishes its samples are kept only if it took at least `threshold` seconds, so the
+# result is "where do the slow calls spend their time". collapsed() gives Brendan Gregg's folded
+# format (`root;frame;frame count` per line), ready for flamegraph.pl / speedscope / inferno.
+# Off (the default), track() is a single attribute check. Stdlib only.
+import asyncio, os, sys, threading, time
+from collections import Counter
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _coro_stack(coro) -> list[str]:
+    """Outermost-first frames of a suspended coroutine chain."""
+    out = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        out.append(_frame_name(frame.f_code))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    out.append("(await)")
+    return out
+
+def _thread_stack(frame, root_code) -> list[str]:
+    """Outermost-first frames of a running thread, from the task's own coroutine down."""
+    out = []
+    while frame is not None:
+        out.append(_frame_name(frame.f_code))
+        if frame.f_code is root_code:
+            break
+        frame = frame.f_back
+    out.reverse()
+    return out
+
+class _Call:
+    __slots__ = ("label", "started", "stacks")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.started = time.perf_counter()
+        self.stacks: Counter = Counter()
+
+class TaskProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.threshold = 0.25
+        self.interval = 0.005
+        self.stacks: Counter = Counter()   # "label;frame;..." -> samples, slow calls only
+        self.calls = 0                     # tracked calls finished while enabled
+        self.slow_calls = 0                # ...of which were kept
+        self.started_at: float | None = None
+        self._active: dict[asyncio.Task, _Call] = {}
+        self._lock = threading.Lock()
+        self._stop: threading.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread = 0
+
+    # ---- control (call from the event loop thread) ----
+    def start(self, threshold: float | None = None, interval: float | None = None):
+        if threshold is not None:
+            self.threshold = threshold
+        if interval is not None:
+            self.interval = interval
+        if self.enabled:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stop = threading.Event()
+        self.started_at = time.time()
+        self.enabled = True
+        threading.Thread(target=self._sample, args=(self._stop,), name="elihaus-profiler", daemon=True).start()
+
+    def stop(self):
+        self.enabled = False
+        if self._stop:
+            self._stop.set()
+        self._active.clear()
+
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+            self.calls = self.slow_calls = 0
+
+    # ---- hooks ----
+    def track(self, label: str):
+        """Profile the current task (one interaction callback) until it finishes."""
+        if not self.enabled:
+            return
+        task = asyncio.current_task()
+        if task is None or task in self._active:
+            return
+        self._active[task] = _Call(label)
+        task.add_done_callback(self._finish)
+
+    def _finish(self, task: asyncio.Task):
+        call = self._active.pop(task, None)
+        if call is None:
+            return
+        slow = time.perf_counter() - call.started >= self.threshold
+        with self._lock:
+            self.calls += 1
+            if slow:
+                self.slow_calls += 1
+                for stack, n in call.stacks.items():
+                    self.stacks[f"{call.label};{stack}"] += n
+
+    # ---- sampler thread ----
+    def _sample(self, stop: threading.Event):
+        while not stop.wait(self.interval):
+            active = list(self._active.items())
+            if not active:
+                continue
+            running = asyncio.current_task(self._loop)
+            frame = sys._current_frames().get(self._loop_thread)
+            for task, call in active:
+                if task.done():  # finished, done-callback not run yet
+                    continue
+                coro = task.get_coro()
+                if task is running and frame is not None and coro.cr_frame is not None:
+                    stack = _thread_stack(frame, coro.cr_frame.f_code)
+                else:
+                    stack = _coro_stack(coro)
+                with self._lock:  # _finish may be folding this call right now
+                    call.stacks[";".join(stack)] += 1
+
+    # ---- output ----
+    def collapsed(self) -> str:
+        with self._lock:
+            return "".join(f"{stack} {n}\n" for stack, n in sorted(self.stacks.items()))
+
+    def top(self, limit: int = 5) -> list[tuple[str, int]]:
+        """Heaviest leaf frames across kept samples: [(frame, samples)]."""
+        leaves = Counter()
+        with self._lock:
+            for stack, n in self.stacks.items():
+                leaves[stack.rsplit(";", 1)[-1]] += n
+        return leaves.most_common(limit)
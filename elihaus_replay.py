@@ -0,0 +1,514 @@
+# elihaus_replay.py — feed an /eh_trace recording through the bot's own handlers, offline
+# Every recorded command / button / modal submit is dispatched to the real callback (same
+# interaction_check → callback path discord.py uses) against a scratch DB directory and an
+# in-memory stand-in for Discord, at the recorded pace, N× faster, or back to back:
+#
+#   python elihaus_replay.py elihaus_trace.jsonl                 # as fast as possible
+#   python elihaus_replay.py elihaus_trace.jsonl --speed 1       # real time (concurrent, like prod)
+#   python elihaus_replay.py elihaus_trace.jsonl --speed 10 --workers
+#
+# and reports, per operation, latency (total and to the first reply), SQL statements issued, and
+# the latency the same operation had in production. Runs are deterministic: users are seeded with
+# --seed-balance coins on first sight, the bot's clock follows the trace's timeline, and roulette /
+# lotto seeds and the slots RNG come from --rng-seed. Rounds whose window has passed on that
+# clock are settled before the next event (the scheduler's job in production), and counted as
+# "(round expiry)". Needs discord.py, like the bot; never connects to Discord.
+import argparse, asyncio, inspect, itertools, os, random, sys, tempfile, time
+from collections import defaultdict
+from contextvars import ContextVar
+from datetime import datetime
+
+import discord
+
+from elihaus_trace import read_trace
+
+_snowflakes = itertools.count(1_100_000_000_000_000_000)  # snowflake-sized, so int()/str() round trips look real
+
+# ---------------- Fake Discord ----------------
+class FakeMessage:
+    def __init__(self, channel, content=None, embed=None, embeds=None, view=None):
+        self.id = next(_snowflakes)
+        self.channel, self.guild = channel, channel.guild
+        self.content = content
+        self.embeds = list(embeds or ([embed] if embed is not None else []))
+        self.view = view
+        self.pinned = False
+
+    async def edit(self, **kw):
+        if kw.get("embed") is not None:
+            self.embeds = [kw["embed"]]
+        if "embeds" in kw:
+            self.embeds = list(kw["embeds"])
+        if "content" in kw:
+            self.content = kw["content"]
+        if "view" in kw:
+            self.view = kw["view"]
+        return self
+
+    async def delete(self, **kw):
+        self.channel.messages.pop(self.id, None)
+
+    async def pin(self, **kw):
+        self.pinned = True
+
+class FakeChannel:
+    def __init__(self, guild, name: str, category=None):
+        self.id = next(_snowflakes)
+        self.guild, self.name, self.category = guild, name, category
+        self.mention = f"<#{self.id}>"
+        self.messages: dict[int, FakeMessage] = {}
+        self.text_channels: list["FakeChannel"] = []  # when used as a category
+
+    async def send(self, content=None, *, embed=None, embeds=None, view=None, **kw):
+        msg = FakeMessage(self, content, embed, embeds, view)
+        self.messages[msg.id] = msg
+        return msg
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        msg = self.messages.get(int(message_id))
+        if msg is None:
+            raise discord.NotFound(_NotFound, "Unknown Message")
+        return msg
+
+    def get_partial_message(self, message_id: int) -> FakeMessage:
+        return self.messages.get(int(message_id)) or FakeMessage(self)
+
+    def last_message_with(self, view_cls) -> FakeMessage | None:
+        return next((m for m in reversed(self.messages.values()) if isinstance(m.view, view_cls)), None)
+
+    async def edit(self, *, name=None, **kw):
+        self.name = name or self.name
+
+    async def delete(self, **kw):
+        self.guild.channels.pop(self.id, None)
+
+class _NotFound:  # enough of an aiohttp response for discord.NotFound
+    status, reason = 404, "Not Found"
+
+class FakeMember:
+    def __init__(self, guild, uid: int, admin: bool):
+        self.id, self.guild = uid, guild
+        self.name = self.display_name = f"user{uid % 100_000}"
+        self.mention = f"<@{uid}>"
+        self.bot = False
+        self.roles = []
+        self.guild_permissions = discord.Permissions(manage_guild=admin)
+
+    def __str__(self):
+        return self.name
+
+class FakeGuild:
+    def __init__(self, gid: int):
+        self.id = gid
+        self.owner_id = 0
+        self.filesize_limit = 25 * 1024 * 1024
+        self.default_role, self.me = object(), object()
+        self.channels: dict[int, FakeChannel] = {}
+        self.categories: list[FakeChannel] = []
+
+    @property
+    def text_channels(self):
+        return [ch for ch in self.channels.values() if ch not in self.categories]
+
+    def get_channel(self, cid: int):
+        return self.channels.get(int(cid))
+
+    def get_member(self, uid: int):
+        return None
+
+    def get_role(self, rid: int):
+        return None
+
+    async def create_text_channel(self, name: str, *, category=None, **kw) -> FakeChannel:
+        ch = FakeChannel(self, name, category)
+        self.channels[ch.id] = ch
+        if category is not None:
+            category.text_channels.append(ch)
+        return ch
+
+    async def create_category(self, name: str, **kw) -> FakeChannel:
+        cat = FakeChannel(self, name)
+        self.channels[cat.id] = cat
+        self.categories.append(cat)
+        return cat
+
+class FakeResponse:
+    def __init__(self, it: "FakeInteraction"):
+        self._it = it
+        self._done = False
+
+    def _first(self):
+        self._done = True
+        if self._it.first_reply is None:
+            self._it.first_reply = time.perf_counter()
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def send_message(self, content=None, *, embed=None, embeds=None, view=None, ephemeral=False, **kw):
+        self._first()
+        if not ephemeral and self._it.channel is not None:
+            await self._it.channel.send(content, embed=embed, embeds=embeds, view=view)
+
+    async def defer(self, **kw):
+        self._first()
+
+    async def send_modal(self, modal):
+        self._first()
+
+    async def edit_message(self, **kw):
+        self._first()
+        if self._it.message is not None:
+            await self._it.message.edit(**kw)
+
+class FakeFollowup:
+    def __init__(self, it: "FakeInteraction"):
+        self._it = it
+
+    async def send(self, content=None, *, embed=None, embeds=None, view=None, ephemeral=False, **kw):
+        if self._it.first_reply is None:
+            self._it.first_reply = time.perf_counter()
+        return await self._it.channel.send(content, embed=embed, embeds=embeds, view=view)
+
+class FakeInteraction:
+    def __init__(self, guild: FakeGuild | None, channel: FakeChannel, user: FakeMember, data: dict):
+        self.guild, self.channel, self.user, self.data = guild, channel, user, data
+        self.guild_id = guild.id if guild else None
+        self.channel_id = channel.id
+        self.message: FakeMessage | None = None
+        self.first_reply: float | None = None
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+
+# ---------------- Replay ----------------
+class TraceClock:
+    """The bot's now_local() during a replay. Back to back (speed 0) it jumps to each event's
+    recorded time; paced, it runs `speed`× real time from the start of the replay."""
+
+    def __init__(self, tz, speed: float):
+        self.tz, self.speed = tz, speed
+        self.base = time.time()
+        self.started = time.monotonic()
+        self.offset, self.mark = 0.0, self.started
+
+    def advance(self, t: float):
+        if not self.speed:
+            self.offset, self.mark = t, time.monotonic()
+
+    def timestamp(self) -> float:
+        if self.speed:
+            return self.base + (time.monotonic() - self.started) * self.speed
+        return self.base + self.offset + (time.monotonic() - self.mark)
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp(), self.tz)
+
+class Op:
+    __slots__ = ("total", "first", "sql", "prod", "errors")
+
+    def __init__(self):
+        self.total: list[float] = []
+        self.first: list[float] = []
+        self.sql: list[int] = []
+        self.prod: list[float] = []
+        self.errors = 0
+
+class _Skip(Exception):
+    """The event can't be dispatched in this build; counted under "skipped", not timed."""
+
+_STATEMENTS: ContextVar[list | None] = ContextVar("_STATEMENTS", default=None)
+
+def _count_statement(_sql: str):
+    counter = _STATEMENTS.get()  # to_thread() copies the context, so off-loop DB work counts too
+    if counter is not None:
+        counter[0] += 1
+
+def _pct(xs: list[float], q: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q * len(xs)))] if xs else 0.0
+
+class Replayer:
+    def __init__(self, bot_mod, speed: float, seed_balance: int, rng_seed: int):
+        self.b = bot_mod
+        self.speed, self.seed_balance = speed, seed_balance
+        self.clock = TraceClock(bot_mod.TZ, speed)
+        self.ops: dict[str, Op] = defaultdict(Op)
+        self.guilds: dict[int | None, FakeGuild] = {}
+        self.channels: dict[int, FakeChannel] = {}
+        self.members: dict[tuple[int | None, int], FakeMember] = {}
+        self.ids: dict[int, int] = {}  # trace anon id -> replay snowflake
+        self.seeded: set[tuple[int, int]] = set()
+        self.skipped: dict[str, int] = defaultdict(int)
+
+        rng = random.Random(rng_seed)
+        seeds = itertools.count(1)
+        bot_mod.SLOTS_RNG.seed(rng_seed)
+        bot_mod.new_seed = lambda prefix, ident, now_ts: f"{prefix}-replay{next(seeds)}-{rng.randint(1, 1_000_000)}"
+        bot_mod.now_local = self.clock.now  # STORE's clock reads it too
+        open_shard = bot_mod._open_shard
+
+        def _open_counted(path: str):
+            conn = open_shard(path)
+            conn.set_trace_callback(_count_statement)
+            return conn
+        bot_mod._open_shard = _open_counted
+
+    # ---- world ----
+    def snowflake(self, anon: int) -> int:
+        return self.ids.setdefault(anon, next(_snowflakes))
+
+    def guild(self, anon: int | None) -> FakeGuild | None:
+        if anon is None:
+            return None
+        if anon not in self.guilds:
+            self.guilds[anon] = FakeGuild(self.snowflake(anon))
+        return self.guilds[anon]
+
+    def channel(self, guild: FakeGuild | None, anon: int) -> FakeChannel:
+        if anon not in self.channels:
+            ch = FakeChannel(guild, f"channel-{anon}")
+            ch.id = self.snowflake(anon)
+            ch.mention = f"<#{ch.id}>"
+            if guild is not None:
+                guild.channels[ch.id] = ch
+            self.channels[anon] = ch
+        return self.channels[anon]
+
+    def member(self, guild: FakeGuild | None, anon: int, admin: bool = False) -> FakeMember:
+        key = (guild.id if guild else None, anon)
+        m = self.members.get(key)
+        if m is None:
+            m = self.members[key] = FakeMember(guild, self.snowflake(anon), admin)
+        m.guild_permissions = discord.Permissions(manage_guild=admin)
+        gid = guild.id if guild else 0
+        if (gid, m.id) not in self.seeded:
+            self.seeded.add((gid, m.id))
+            with self.b.guild_scope(gid), self.b.db_tx() as conn:
+                self.b.STORE.ensure_user(str(m.id))
+                self.b.apply_ledger(conn.cursor(), str(m.id), self.seed_balance, "starter", "replay seed")
+        return m
+
+    def resolve(self, key: str, value, guild: FakeGuild | None, channel: FakeChannel, user: FakeMember):
+        """Recorded view/modal state -> this replay's equivalent."""
+        if isinstance(value, dict) and "$id" in value:
+            return self.snowflake(value["$id"])
+        if value == "$round":
+            return self._round_in(guild, channel)
+        gid = guild.id if guild else 0
+        if key == "prize_id":
+            return self._latest(gid, "SELECT id FROM prizes WHERE winner_id=? ORDER BY id DESC LIMIT 1",
+                                (str(user.id),), value)
+        if key == "request_id":
+            return self._latest(gid, "SELECT id FROM withdraw_requests WHERE status='pending' ORDER BY id LIMIT 1",
+                                (), value)
+        return value
+
+    def _latest(self, gid: int, sql: str, args: tuple, fallback):
+        with self.b.guild_scope(gid), self.b.db() as conn:
+            row = conn.execute(sql, args).fetchone()
+        return row[0] if row else fallback
+
+    def _round_in(self, guild: FakeGuild | None, channel: FakeChannel) -> str:
+        gid = guild.id if guild else 0
+        return self._latest(gid, "SELECT rid FROM rounds WHERE channel_id=? ORDER BY rowid DESC LIMIT 1",
+                            (str(channel.id),), "")
+
+    # ---- dispatch ----
+    async def expire_rounds(self, everything: bool = False):
+        """Settle rounds whose betting window closed on the trace clock (the scheduler's job in prod)."""
+        sched, now_ts = self.b.ROUND_SCHEDULER, self.clock.timestamp()
+        for rid, (channel, exp_ts) in list(sched._rounds.items()):
+            if everything or exp_ts <= now_ts:
+                sched.discard(rid)
+                await self._measure("(round expiry)", None, self._expire(channel, rid))
+
+    async def _expire(self, channel, rid: str):
+        self.b.use_guild(channel.guild.id if channel.guild else 0)
+        await self.b._auto_resolve_round(channel, rid)
+
+    async def play(self, event: dict):
+        guild = self.guild(event.get("guild"))
+        channel = self.channel(guild, event.get("channel") or 0)
+        user = self.member(guild, event["user"], event.get("admin", False))
+        kind, name = event["kind"], event["name"]
+        if kind == "command":
+            label, coro = f"/{name}", self._command(event, guild, channel, user)
+        elif kind == "component":
+            label, coro = f"{name}[{event.get('item')}]", self._component(event, guild, channel, user)
+        else:
+            label, coro = f"{name}.on_submit", self._modal(event, guild, channel, user)
+        if coro is None:
+            self.skipped[label] += 1
+            return
+        await self._measure(label, event.get("ms"), coro)
+
+    async def _measure(self, label: str, prod_ms: float | None, coro):
+        counter = [0]
+        token = _STATEMENTS.set(counter)
+        started = time.perf_counter()
+        it = None
+        try:
+            it = await coro
+        except _Skip:
+            self.skipped[label] += 1
+            return
+        except Exception as e:
+            self.ops[label].errors += 1
+            print(f"[replay] {label}: {type(e).__name__}: {e}", file=sys.stderr)
+        finally:
+            _STATEMENTS.reset(token)
+        op = self.ops[label]
+        op.total.append((time.perf_counter() - started) * 1000)
+        if it is not None and it.first_reply is not None:
+            op.first.append((it.first_reply - started) * 1000)
+        op.sql.append(counter[0])
+        if prod_ms is not None:
+            op.prod.append(prod_ms)
+
+    def _command(self, event, guild, channel, user):
+        cmd = self.b.bot.tree.get_command(event["name"])
+        if cmd is None:
+            return None
+        kwargs = {}
+        for param in cmd.parameters:
+            if param.name not in event.get("options", {}):
+                continue
+            value = event["options"][param.name]
+            if isinstance(value, dict) and "$id" in value:
+                if param.type is discord.AppCommandOptionType.user:
+                    value = self.member(guild, value["$id"])
+                elif param.type is discord.AppCommandOptionType.channel:
+                    value = self.channel(guild, value["$id"])
+                else:
+                    value = None
+            kwargs[param.name] = value
+        it = FakeInteraction(guild, channel, user, {"name": event["name"], "options": []})
+
+        async def run():
+            if await self.b.bot.tree.interaction_check(it):
+                await cmd.callback(it, **kwargs)
+            return it
+        return run()
+
+    def _build(self, cls, event, guild, channel, user):
+        state = {k: self.resolve(k, v, guild, channel, user) for k, v in event.get("state", {}).items()}
+        params = inspect.signature(cls.__init__).parameters
+        obj = cls(**{k: v for k, v in state.items() if k in params})
+        for k, v in state.items():
+            if k not in params:
+                setattr(obj, k, v)
+        return obj
+
+    def _component(self, event, guild, channel, user):
+        cls = getattr(self.b, event["name"], None)
+        if cls is None:
+            return None
+
+        async def run():
+            try:
+                view = self._build(cls, event, guild, channel, user)
+            except TypeError:  # needs state the trace doesn't carry (e.g. a list of leased rows)
+                raise _Skip
+            item = next((i for i in view.children if getattr(i, "label", None) == event.get("item")), None)
+            if item is None:
+                raise LookupError(f"no {event.get('item')!r} button on {event['name']}")
+            it = FakeInteraction(guild, channel, user, {"custom_id": item.custom_id})
+            it.message = channel.last_message_with(cls) or await channel.send(view=view)
+            if await view.interaction_check(it):
+                await item.callback(it)
+            return it
+        return run()
+
+    def _modal(self, event, guild, channel, user):
+        cls = getattr(self.b, event["name"], None)
+        if cls is None:
+            return None
+
+        async def run():
+            modal = self._build(cls, event, guild, channel, user)
+            for name, value in event.get("inputs", {}).items():
+                getattr(modal, name)._value = value
+            it = FakeInteraction(guild, channel, user, {"components": []})
+            if await modal.interaction_check(it):
+                await modal.on_submit(it)
+            return it
+        return run()
+
+    async def run(self, events: list[dict]):
+        if not self.speed:
+            for event in events:
+                self.clock.advance(event["t"])
+                await self.expire_rounds()
+                await self.play(event)
+        else:
+            async def at(event):
+                await asyncio.sleep(max(0.0, event["t"] / self.speed - (time.monotonic() - self.clock.started)))
+                await self.expire_rounds()
+                await self.play(event)
+            await asyncio.gather(*(at(e) for e in events))
+        await self.expire_rounds(everything=True)  # rounds still open when the trace ends
+
+    # ---- output ----
+    def report(self, wall: float) -> str:
+        n = sum(len(op.total) for op in self.ops.values())
+        lines = [f"Replayed {n:,} operations in {wall:.1f}s "
+                 f"({'back to back' if not self.speed else f'{self.speed:g}x'}), "
+                 f"{len(self.guilds)} guild(s), {len(self.members)} user(s)",
+                 f"  {'operation':<34} {'n':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} "
+                 f"{'reply p50':>10} {'SQL/op':>7} {'prod p50':>9} {'err':>4}"]
+        for label, op in sorted(self.ops.items(), key=lambda kv: -sum(kv[1].total)):
+            prod = f"{_pct(op.prod, 0.5):.1f}" if op.prod else "—"
+            first = f"{_pct(op.first, 0.5):.1f}" if op.first else "—"
+            lines.append(f"  {label[:34]:<34} {len(op.total):>6} {_pct(op.total, 0.5):>8.1f} "
+                         f"{_pct(op.total, 0.95):>8.1f} {max(op.total):>8.1f} {first:>10} "
+                         f"{sum(op.sql) / len(op.sql):>7.1f} {prod:>9} {op.errors:>4}")
+        for label, count in sorted(self.skipped.items()):
+            lines.append(f"  skipped {count} × {label} (not in this build, or can't be rebuilt from the trace)")
+        return "\n".join(lines)
+
+def load_bot(db_dir: str):
+    """Import the bot against a scratch DB directory; it only connects when run as a script."""
+    os.environ["ELIHAUS_DB_DIR"] = db_dir
+    os.environ["ELIHAUS_DB"] = os.path.join(db_dir, "legacy.db")
+    os.environ.setdefault("DISCORD_TOKEN", "replay")
+    os.environ.pop("ELIHAUS_TRACE", None)
+    import elihause_bot
+    return elihause_bot
+
+async def _replay(args) -> str:
+    b = load_bot(args.db_dir or tempfile.mkdtemp(prefix="elihaus-replay-"))
+    if not args.workers:
+        b.OUTBOX_REPLY_WAIT = 0  # nobody drains the outbox; don't wait on tickets
+    rp = Replayer(b, args.speed, args.seed_balance, args.rng_seed)
+    events = list(read_trace(args.trace))
+    if args.limit:
+        events = events[:args.limit]
+    if args.workers:
+        for e in events:  # make the guilds/channels exist before the workers look for them
+            rp.channel(rp.guild(e.get("guild")), e.get("channel") or 0)
+        b.bot.get_guild = lambda gid: next((g for g in rp.guilds.values() if g.id == gid), None)
+        b.bot.get_channel = lambda cid: next((c for c in rp.channels.values() if c.id == cid), None)
+
+        async def fetch_channel(cid):
+            return b.bot.get_channel(cid)
+        b.bot.fetch_channel = fetch_channel
+        b._start_background_workers()
+    started = time.perf_counter()
+    await rp.run(events)
+    return rp.report(time.perf_counter() - started)
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Replay an EliHaus interaction trace against a scratch DB.")
+    ap.add_argument("trace", help="JSONL written by /eh_trace (or ELIHAUS_TRACE)")
+    ap.add_argument("--speed", type=float, default=0, help="1 = recorded pace, 10 = 10x faster, 0 = back to back")
+    ap.add_argument("--seed-balance", type=int, default=1_000_000, help="coins each user starts with")
+    ap.add_argument("--rng-seed", type=int, default=0, help="roulette/lotto seeds and slots RNG")
+    ap.add_argument("--limit", type=int, default=0, help="only the first N events")
+    ap.add_argument("--db-dir", help="scratch shard directory (default: a new temp dir)")
+    ap.add_argument("--workers", action="store_true", help="also run the job/outbox workers (ticket channels etc.)")
+    args = ap.parse_args(argv)
+    print(asyncio.run(_replay(args)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
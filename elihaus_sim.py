@@ -0,0 +1,249 @@
+# elihaus_sim.py — offline Monte Carlo of the slots pot and roulette payouts, for tuning config
+# Batched NumPy arrays: slots runs thousands of independent channel pots side by side, roulette
+# whole blocks of rounds at once. Payout lookups are built from the same SlotsRules/RouletteRules
+# the bot uses (elihaus_games), and defaults come from the same env vars, so
+#
+#   SLOTS_PAYOUT_TRIPLE=0.6 python elihaus_sim.py slots --spins 5000000
+#   python elihaus_sim.py slots --paytable paytable.json
+#   python elihaus_sim.py roulette --rounds 1000000 --green 12 --mix red=0.45,black=0.45,green=0.1
+#   python elihaus_sim.py roulette --mix red=0.4,odd=0.3,dozen2=0.2,17=0.1
+#
+# shows what a config change does before it ships. Needs numpy (not a bot dependency):
+#   pip install numpy
+import argparse, dataclasses, sys, time
+
+import numpy as np
+
+from elihaus_games import RouletteRules, SlotsRules
+
+# ---------------- Slots ----------------
+def slots_tables(rules: SlotsRules) -> tuple[np.ndarray, np.ndarray]:
+    """(share, flat) for every symbol triple, indexed [i, j, k] — the rules' own lookup reshaped."""
+    n = len(rules.symbols)
+    lines = np.array(rules.lines, dtype=np.float64).reshape(n, n, n, 2)
+    return lines[..., 0], lines[..., 1].astype(np.int64)
+
+def reel_draw(rules: SlotsRules, rng: np.random.Generator, size: tuple[int, ...]) -> np.ndarray:
+    """Symbol indices of shape (..., 3, channels) drawn through each reel's alias table (as SlotsRules.spin)."""
+    n = len(rules.symbols)
+    out = np.empty(size, dtype=np.int64)
+    for r, table in enumerate(rules.reels):
+        prob, alias = np.array(table.prob), np.array(table.alias)
+        u = rng.random(size[:-2] + size[-1:]) * n
+        i = u.astype(np.int64)
+        out[..., r, :] = np.where(u - i < prob[i], i, alias[i])
+    return out
+
+def slots_win(rules: SlotsRules, share: np.ndarray, flat: np.ndarray, pot: np.ndarray) -> np.ndarray:
+    """Vector form of SlotsRules.win()."""
+    available = np.maximum(pot - rules.seed, 0)
+    return np.minimum((available * share).astype(np.int64) + flat, available)
+
+def _check_slots_win(rules: SlotsRules, rng: np.random.Generator, n: int = 2000):
+    # guard against the vector formula drifting from the bot's scalar one
+    share_t, flat_t = slots_tables(rules)
+    idx = rng.integers(0, len(rules.symbols), size=(3, n))
+    pots = rng.integers(0, 50 * rules.seed + 10 * rules.cost, size=n)
+    got = slots_win(rules, share_t[idx[0], idx[1], idx[2]], flat_t[idx[0], idx[1], idx[2]], pots)
+    for t in range(n):
+        i, j, k = idx[:, t]
+        want = rules.win(rules.line(rules.symbols[i], rules.symbols[j], rules.symbols[k]), int(pots[t]))
+        if got[t] != want:
+            raise AssertionError(f"vectorised slots payout {got[t]} != rules {want} for pot {pots[t]}")
+
+def simulate_slots(rules: SlotsRules, spins: int = 5_000_000, channels: int = 10_000, bundle: int = 1,
+                   checkpoints: int = 10, seed: int | None = None) -> dict:
+    """`channels` independent pots, each fed bundles of `bundle` spins (charged up front, like SlotsModal)."""
+    rng = np.random.default_rng(seed)
+    _check_slots_win(rules, rng)
+    share_t, flat_t = slots_tables(rules)
+    jackpot_t = share_t > 0
+    rounds = max(1, -(-spins // (channels * bundle)))  # bundles per channel
+    spins = rounds * channels * bundle
+
+    pot = np.full(channels, rules.seed, dtype=np.int64)
+    paid = 0
+    net_sum = net_sq = 0.0          # player net per spin (win - cost)
+    doubles = jackpots = jackpot_paid = 0
+    last_jp = np.zeros(channels, dtype=np.int64)  # spin index (per channel) of the previous jackpot
+    gaps: list[np.ndarray] = []
+    marks = set(np.linspace(1, rounds, min(checkpoints, rounds), dtype=int).tolist())
+    trajectory = []
+
+    step = 0
+    for r in range(1, rounds + 1):
+        pot += bundle * rules.cost
+        idx = reel_draw(rules, rng, (bundle, 3, channels))
+        for b in range(bundle):
+            step += 1
+            i, j, k = idx[b]
+            win = slots_win(rules, share_t[i, j, k], flat_t[i, j, k], pot)
+            pot -= win
+            paid += int(win.sum())
+            net = win - rules.cost
+            net_sum += float(net.sum())
+            net_sq += float((net.astype(np.float64) ** 2).sum())
+            jp = jackpot_t[i, j, k]
+            jackpots += int(jp.sum())
+            jackpot_paid += int(win[jp].sum())
+            doubles += int(((flat_t[i, j, k] > 0) & ~jp).sum())
+            if jp.any():
+                gaps.append(step - last_jp[jp])
+                last_jp[jp] = step
+        if r in marks:
+            trajectory.append((r * bundle, *np.percentile(pot, (5, 50, 95)).astype(int), int(pot.mean())))
+
+    wagered = spins * rules.cost
+    mean = net_sum / spins
+    gap = np.concatenate(gaps) if gaps else np.array([], dtype=np.int64)
+    return {
+        "rules": rules, "spins": spins, "channels": channels, "bundle": bundle,
+        "wagered": wagered, "paid": paid, "rtp": paid / wagered, "house_edge": 1 - paid / wagered,
+        "net_mean": mean, "net_std": (net_sq / spins - mean * mean) ** 0.5,
+        "double_rate": doubles / spins, "jackpot_rate": jackpots / spins,
+        "jackpot_mean": jackpot_paid / jackpots if jackpots else 0,
+        "time_to_jackpot": (float(gap.mean()), float(np.median(gap)), float(np.percentile(gap, 90))) if gap.size else None,
+        "pot_trajectory": trajectory,  # (spins per channel, p5, p50, p95, mean)
+        "pot_end_mean": float(pot.mean()),
+    }
+
+def format_slots(rep: dict) -> str:
+    r = rep["rules"]
+    lines = [
+        f"Slots — cost {r.cost}, seed {r.seed}, {len(r.symbols)} symbols"
+        f"{', weighted reels' if r.weights else ''}; " + r.describe().replace("**", "").replace("\n", " "),
+        f"{rep['spins']:,} spins over {rep['channels']:,} pots (bundles of {rep['bundle']})",
+        f"  RTP {rep['rtp']:.2%} · house edge {rep['house_edge']:.2%} (unpaid coins stay in the pots)",
+        f"  player net/spin: mean {rep['net_mean']:+.1f}, std {rep['net_std']:.1f}",
+        f"  doubles {rep['double_rate']:.2%} · jackpots {rep['jackpot_rate']:.3%}, avg jackpot {rep['jackpot_mean']:,.0f}",
+    ]
+    if rep["time_to_jackpot"]:
+        mean, med, p90 = rep["time_to_jackpot"]
+        lines.append(f"  spins between jackpots (per pot): mean {mean:.0f}, median {med:.0f}, p90 {p90:.0f}")
+    lines.append("  pot after N spins/pot:      p5       p50       p95      mean")
+    for n, p5, p50, p95, mean in rep["pot_trajectory"]:
+        lines.append(f"  {n:>18,} {p5:>9,} {p50:>9,} {p95:>9,} {mean:>9,}")
+    return "\n".join(lines)
+
+# ---------------- Roulette ----------------
+def roulette_tables(rules: RouletteRules, choices: list[str], stake: int) -> np.ndarray:
+    """[choice, pocket] -> coins back, from the rules' pocket masks (rules.win())."""
+    return np.array([[rules.win(ch, p, stake) for p in range(37)] for ch in choices], dtype=np.int64)
+
+def simulate_roulette(rules: RouletteRules, rounds: int = 1_000_000, bets: int = 10, stake: int = 1000,
+                      mix: dict[str, float] | None = None, block: int = 100_000, seed: int | None = None) -> dict:
+    """`bets` bets of `stake` per round, each on a bet type drawn from `mix`."""
+    rng = np.random.default_rng(seed)
+    mix = mix or {"red": 0.45, "black": 0.45, "green": 0.10}
+    choices = list(mix)
+    p = np.array([mix[ch] for ch in choices], dtype=np.float64)
+    p /= p.sum()
+    win_t = roulette_tables(rules, choices, stake)
+    k = len(choices)
+
+    staked = np.zeros(k); returned = np.zeros(k); net_sq = np.zeros(k)
+    house: list[np.ndarray] = []
+    done = 0
+    while done < rounds:
+        n = min(block, rounds - done)
+        pockets = rng.integers(0, 37, size=n)                     # same uniform 0-36 roll as the bot
+        picks = rng.choice(k, size=(n, bets), p=p)
+        won = win_t[picks, pockets[:, None]]
+        for ch in range(k):
+            m = picks == ch
+            staked[ch] += m.sum() * stake
+            returned[ch] += won[m].sum()
+            net_sq[ch] += (((won[m] - stake).astype(np.float64)) ** 2).sum()
+        house.append(bets * stake - won.sum(axis=1))
+        done += n
+
+    house_pnl = np.concatenate(house)
+    per_choice = {}
+    for ch in range(k):
+        n_bets = staked[ch] / stake
+        if n_bets:
+            mean = (returned[ch] - staked[ch]) / n_bets
+            per_choice[choices[ch]] = (returned[ch] / staked[ch], (net_sq[ch] / n_bets - mean * mean) ** 0.5)
+    return {
+        "rules": rules, "rounds": rounds, "bets": bets, "stake": stake, "mix": dict(zip(choices, p)),
+        "rtp": returned.sum() / staked.sum(), "house_edge": 1 - returned.sum() / staked.sum(),
+        "per_choice": per_choice,  # choice -> (rtp, std of player net per bet)
+        "house_round": (float(house_pnl.mean()), *np.percentile(house_pnl, (1, 50, 99)).astype(int)),
+        "house_losing_rounds": float((house_pnl < 0).mean()),
+    }
+
+def format_roulette(rep: dict) -> str:
+    r = rep["rules"]
+    mix = ", ".join(f"{k} {v:.0%}" for k, v in rep["mix"].items())
+    mean, p1, p50, p99 = rep["house_round"]
+    lines = [
+        f"Roulette — red/black/odd/even/low/high x{r.payout_red_black}, green x{r.payout_green}, "
+        f"dozen/column x{r.payout_dozen}, straight x{r.payout_straight}; {rep['bets']} bets of "
+        f"{rep['stake']} per round ({mix})",
+        f"{rep['rounds']:,} rounds",
+        f"  RTP {rep['rtp']:.2%} · house edge {rep['house_edge']:.2%}",
+    ]
+    for ch, (rtp, std) in rep["per_choice"].items():
+        lines.append(f"  {ch:>6}: RTP {rtp:.2%}, player net std {std:,.0f} per bet")
+    lines.append(f"  house P&L per round: mean {mean:+,.0f}, p1 {p1:+,}, median {p50:+,}, p99 {p99:+,}; "
+                 f"house loses {rep['house_losing_rounds']:.1%} of rounds")
+    return "\n".join(lines)
+
+# ---------------- CLI ----------------
+def _parse_mix(spec: str) -> dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        choice = RouletteRules().parse_choice(name)
+        if choice is None:
+            raise argparse.ArgumentTypeError(f"unknown bet '{name}' (0-36, red/black/green, odd/even, "
+                                             f"low/high, dozen1-3, col1-3)")
+        mix[choice] = float(weight)
+    return mix
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Monte Carlo the EliHaus slots pot / roulette payouts.")
+    ap.add_argument("--rng-seed", type=int, help="fix the simulation RNG for repeatable runs")
+    sub = ap.add_subparsers(dest="game", required=True)
+
+    d = SlotsRules.from_env()
+    sp = sub.add_parser("slots", help="shared-pot slots (defaults from SLOTS_* env, like the bot)")
+    sp.add_argument("--spins", type=int, default=5_000_000)
+    sp.add_argument("--channels", type=int, default=10_000, help="independent pots simulated side by side")
+    sp.add_argument("--bundle", type=int, default=1, help="spins per submission (charged up front)")
+    sp.add_argument("--cost", type=int, default=d.cost)
+    sp.add_argument("--seed-pot", type=int, default=d.seed, help="pot floor (SLOTS_SEED)")
+    sp.add_argument("--triple", type=float, default=d.payout_triple, help="share of available pot for a triple")
+    sp.add_argument("--double", type=int, default=d.payout_double, help="flat payout for a double")
+    sp.add_argument("--paytable", help="JSON reels/paytable (like SLOTS_PAYTABLE); replaces --triple/--double")
+
+    r = RouletteRules()
+    rp = sub.add_parser("roulette", help="roulette, any mix of bet types")
+    rp.add_argument("--rounds", type=int, default=1_000_000)
+    rp.add_argument("--bets", type=int, default=10, help="bets per round")
+    rp.add_argument("--stake", type=int, default=1000)
+    rp.add_argument("--mix", type=_parse_mix, default=None, help="e.g. red=0.45,black=0.45,green=0.1")
+    rp.add_argument("--red-black", type=float, default=r.payout_red_black)
+    rp.add_argument("--green", type=float, default=r.payout_green)
+    rp.add_argument("--dozen", type=float, default=r.payout_dozen, help="dozens and columns")
+    rp.add_argument("--straight", type=float, default=r.payout_straight, help="single numbers")
+    args = ap.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.game == "slots":
+        rules = dataclasses.replace(d, cost=args.cost, seed=args.seed_pot,
+                                    payout_triple=args.triple, payout_double=args.double)
+        if args.paytable:
+            rules = rules.with_config(args.paytable)
+        out = format_slots(simulate_slots(rules, args.spins, args.channels, args.bundle, seed=args.rng_seed))
+    else:
+        rules = RouletteRules(payout_red_black=args.red_black, payout_green=args.green,
+                              payout_dozen=args.dozen, payout_straight=args.straight)
+        out = format_roulette(simulate_roulette(rules, args.rounds, args.bets, args.stake, args.mix,
+                                                seed=args.rng_seed))
+    print(out)
+    print(f"({time.perf_counter() - started:.1f}s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
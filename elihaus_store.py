@@ -0,0 +1,1133 @@
+# elihaus_store.py — EliHaus repository layer (users, ledger, rounds, bets, tickets, prizes, withdrawals, slots)
+# Two interchangeable backends:
+#   SQLiteStore  — what the bot runs on (schema is created by elihause_bot.init_db)
+#   MemoryStore  — pure-Python dicts, for load tests / benchmarks of game logic without disk I/O
+# tests/test_store.py runs the same checks against both. Stdlib only, so it can be imported
+# without discord.py.
+import json, sqlite3
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+
+from elihaus_games import lotto_draw
+
+# ---------------- Records ----------------
+@dataclass(slots=True)
+class User:
+    discord_id: str
+    balance: int = 0
+    last_daily: str | None = None   # pre-daily_ts ISO stamps, no longer written
+    last_weekly: str | None = None
+    joined_at: str | None = None
+    daily_ts: int | None = None     # unix seconds of the last /eh_daily, /eh_weekly claim
+    weekly_ts: int | None = None
+
+@dataclass(slots=True)
+class LedgerEntry:
+    id: int
+    discord_id: str
+    kind: str
+    amount: int
+    meta: str
+    ts: str
+
+@dataclass(slots=True)
+class Round:
+    rid: str
+    channel_id: str
+    status: str          # OPEN|RESOLVED|CANCELLED
+    opened_by: str | None = None
+    opened_at: str | None = None
+    expires_at: str | None = None
+    outcome: str | None = None
+    seed: str | None = None
+    resolved_at: str | None = None
+    message_id: str | None = None
+    label: str | None = None
+    pocket: int | None = None    # 0-36 once RESOLVED (NULL on rounds settled before bet types)
+
+@dataclass(slots=True)
+class RoundSettlement:
+    """Result of settle_round / cancel_round: the closed round, its bets and what was credited."""
+    round: Round
+    bets: list           # [(discord_id, choice, stake)] in bet order
+    credits: list        # [(discord_id, coins)] paid out (settle) or refunded (cancel)
+
+    @property
+    def pool(self) -> int:
+        return sum(stake for _uid, _choice, stake in self.bets)
+
+@dataclass(slots=True)
+class Bet:
+    rid: str
+    discord_id: str
+    choice: str
+    stake: int
+    ts: str | None = None
+
+@dataclass(slots=True)
+class RoundSnapshot:
+    """What every round panel render needs, from one read."""
+    rid: str
+    status: str
+    message_id: str | None
+    expires_at: str | None
+    label: str | None
+    bet_count: int = 0
+    pool: int = 0
+    latest: list = field(default_factory=list)  # newest first: [(discord_id, choice, stake)]
+
+@dataclass(slots=True)
+class BetPlaced:
+    """Result of place_bet: balances around the debit + the round as it stands after this bet."""
+    balance_before: int
+    balance: int
+    snapshot: RoundSnapshot
+
+@dataclass(slots=True)
+class ClaimResult:
+    """Result of claim: `claimed` with the new balance, or refused with the stamp of the claim
+    that is still cooling down (`last_ts`)."""
+    claimed: bool
+    balance: int
+    last_ts: int | None
+
+@dataclass(slots=True)
+class Prize:
+    id: int
+    winner_id: str
+    kind: str
+    amount: int
+    meta: str
+    status: str
+    message_id: str | None = None
+    ticket_channel_id: str | None = None
+
+@dataclass(slots=True)
+class Withdrawal:
+    id: int
+    discord_id: str
+    coins: int
+    gifts: int
+    imvu_name: str
+    imvu_profile: str
+    status: str
+    ticket_channel_id: str | None = None
+    message_id: str | None = None
+    reviewer_id: str | None = None
+    review_note: str | None = None
+    created_ts: str | None = None
+
+@dataclass(slots=True)
+class PendingWithdrawal:
+    """A pending request as the review dashboard lists it, with the user's balance right now."""
+    request: Withdrawal
+    balance: int
+
+    @property
+    def payable(self) -> bool:
+        return self.balance >= self.request.coins
+
+@dataclass(slots=True)
+class QueuedPrize:
+    """prize_queue row: a claimed prize waiting for staff to gift it."""
+    id: int
+    prize_id: int
+    winner_id: str
+    imvu_name: str
+    imvu_profile: str
+    note: str
+    status: str          # ready|fulfilled
+    created_ts: str | None = None
+    leased_by: str | None = None
+    lease_until: int | None = None
+
+@dataclass(slots=True)
+class Fulfilment:
+    """A leased queue item with what staff need to gift it."""
+    queue_id: int
+    prize_id: int
+    winner_id: str
+    imvu_name: str
+    imvu_profile: str
+    amount: int
+    meta: str
+
+@dataclass(slots=True)
+class Standing:
+    """Where one player stands on a leaderboard; rank/value are None if they aren't on it."""
+    rank: int | None
+    value: int | None
+    size: int
+
+@dataclass(slots=True)
+class SlotsSpin:
+    channel_id: str
+    discord_id: str
+    r1: str
+    r2: str
+    r3: str
+    win: int
+    pot_before: int
+    ts: str | None = None
+
+
+class InsufficientFunds(Exception):
+    def __init__(self, balance: int):
+        super().__init__(f"balance {balance}")
+        self.balance = balance
+
+class RoundClosed(Exception):
+    """The round isn't OPEN any more, or its betting window has passed."""
+
+class AlreadyBet(Exception):
+    def __init__(self, bet: "Bet", balance: int):
+        super().__init__(f"already bet {bet.stake} on {bet.choice}")
+        self.bet = bet
+        self.balance = balance
+
+def _window_passed(expires_at: str | None, now_iso: str) -> bool:
+    try:
+        return datetime.fromisoformat(now_iso) > datetime.fromisoformat(expires_at)
+    except (TypeError, ValueError):
+        return False
+
+# op -> how a key compares to the bound for rows on that side of it, in ascending key order
+_KEYSET_OPS = {">": ">", ">=": ">=", "<": "<", "<=": "<="}
+_KEYSET_FLIP = {">": "<", ">=": "<=", "<": ">", "<=": ">="}
+
+def keyset_rows(c: sqlite3.Cursor, sql: str, params: tuple, key: str, bound: tuple | None, op: str,
+                limit: int, desc: bool = False) -> list[tuple]:
+    """One page of `sql` (SELECT ... WHERE ..., no ORDER BY/LIMIT) in the order of `key` (columns,
+    e.g. "w.created_ts, w.id"; descending with desc=True). op ">"/">=" reads forward from `bound`,
+    "<"/"<=" backward; rows always come back in display order. With an index on the key columns every
+    page is a range scan from `bound`, however deep."""
+    forward = op in (">", ">=")
+    cmp = _KEYSET_FLIP[op] if desc else _KEYSET_OPS[op]
+    direction = "DESC" if desc == forward else "ASC"
+    if bound is not None:
+        sql += f" AND ({key}) {cmp} ({','.join('?' * len(bound))})"
+        params = (*params, *bound)
+    c.execute(f"{sql} ORDER BY {', '.join(f'{col} {direction}' for col in key.split(','))} LIMIT ?",
+              (*params, limit))
+    rows = c.fetchall()
+    return rows if forward else rows[::-1]
+
+def _keyset_list(rows: list, key: Callable, bound: tuple | None, op: str, limit: int, desc: bool = False) -> list:
+    """keyset_rows for an in-memory list already in display order (descending key with desc=True)."""
+    if bound is None:
+        return rows[:limit]
+    cmp = _KEYSET_FLIP[op] if desc else _KEYSET_OPS[op]
+    test = {">": tuple.__gt__, ">=": tuple.__ge__, "<": tuple.__lt__, "<=": tuple.__le__}[cmp]
+    picked = [r for r in rows if test(tuple(key(r)), tuple(bound))]
+    return picked[:limit] if op in (">", ">=") else picked[-limit:]
+
+LEADERBOARDS = ("balance", "roulette")  # roulette = payouts − bets, optionally since an ISO time
+
+
+# ---------------- SQLite ----------------
+class SQLiteStore:
+    """`connect` returns an autocommit sqlite3 connection (elihause_bot.db, the current guild's shard); `clock` returns the ISO timestamp to stamp rows with."""
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], clock: Callable[[], str]):
+        self._connect = connect
+        self._clock = clock
+
+    @contextmanager
+    def _tx(self):
+        conn = self._connect()
+        if conn.in_transaction:  # shared connection: join the caller's transaction
+            yield conn.cursor()
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn.cursor()
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ---- users / ledger ----
+    def ensure_user(self, uid: str):
+        with self._connect() as conn:
+            conn.execute("""INSERT OR IGNORE INTO users(discord_id,balance,last_daily,last_weekly,joined_at)
+                            VALUES(?,?,?,?,?)""", (uid, 0, None, None, self._clock()))
+
+    def get_user(self, uid: str) -> User | None:
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("""SELECT discord_id, balance, last_daily, last_weekly, joined_at, daily_ts, weekly_ts
+                         FROM users WHERE discord_id=?""", (uid,))
+            row = c.fetchone()
+        return User(*row) if row else None
+
+    def get_balance(self, uid: str) -> int:
+        self.ensure_user(uid)
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("SELECT balance FROM users WHERE discord_id=?", (uid,))
+            row = c.fetchone()
+            return row[0] if row else 0
+
+    def change_balance(self, uid: str, delta: int, kind: str, meta: str = "") -> int:
+        """Apply delta + write its ledger row; returns the new balance."""
+        self.ensure_user(uid)
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("UPDATE users SET balance=balance+? WHERE discord_id=?", (delta, uid))
+            c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
+                      (uid, kind, delta, meta, self._clock()))
+            c.execute("SELECT balance FROM users WHERE discord_id=?", (uid,))
+            return c.fetchone()[0]
+
+    def post_ledger(self, uid: str, delta: int, kind: str, meta: str = "") -> int:
+        """change_balance that joins the caller's transaction and returns the tx id."""
+        with self._tx() as c:
+            c.execute("INSERT OR IGNORE INTO users(discord_id,balance,joined_at) VALUES(?,0,?)", (uid, self._clock()))
+            c.execute("UPDATE users SET balance=balance+? WHERE discord_id=?", (delta, uid))
+            c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
+                      (uid, kind, delta, meta, self._clock()))
+            return c.lastrowid
+
+    def debit(self, uid: str, amount: int, kind: str, meta: str = "") -> tuple[int, int]:
+        """Take `amount` only if the balance covers it, with its ledger row; returns (tx id, new
+        balance). Raises InsufficientFunds (nothing written)."""
+        with self._tx() as c:
+            c.execute("UPDATE users SET balance=balance-? WHERE discord_id=? AND balance>=? RETURNING balance",
+                      (amount, uid, amount))
+            row = c.fetchone()
+            if row is None:
+                c.execute("SELECT balance FROM users WHERE discord_id=?", (uid,))
+                raise InsufficientFunds((c.fetchone() or (0,))[0])
+            c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
+                      (uid, kind, -amount, meta, self._clock()))
+            return c.lastrowid, row[0]
+
+    def _credit(self, c: sqlite3.Cursor, credits: list[tuple[str, int]], kind: str, meta: str):
+        now = self._clock()
+        c.executemany("UPDATE users SET balance=balance+? WHERE discord_id=?", [(amt, uid) for uid, amt in credits])
+        c.executemany("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
+                      [(uid, kind, amt, meta, now) for uid, amt in credits])
+
+    _CLAIM_COLUMNS = {"daily": "daily_ts", "weekly": "weekly_ts"}
+
+    def claim(self, uid: str, period: str, amount: int, now_ts: int, cutoff: int, meta: str) -> ClaimResult:
+        """Credit a periodic claim if the last one (users.daily_ts / weekly_ts) is at or before `cutoff`:
+        creating the user, the cooldown check, the credit and the new stamp are one upsert, and the
+        ledger row joins it in the same transaction. Refused claims write nothing."""
+        col = self._CLAIM_COLUMNS[period]
+        now = self._clock()
+        with self._tx() as c:
+            c.execute(f"""INSERT INTO users(discord_id,balance,joined_at,{col}) VALUES(?,?,?,?)
+                          ON CONFLICT(discord_id) DO UPDATE SET balance=balance+excluded.balance, {col}=excluded.{col}
+                          WHERE COALESCE({col}, 0) <= ?
+                          RETURNING balance""", (uid, amount, now, now_ts, cutoff))
+            row = c.fetchone()
+            if row is None:
+                c.execute(f"SELECT balance, {col} FROM users WHERE discord_id=?", (uid,))
+                return ClaimResult(False, *c.fetchone())
+            c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
+                      (uid, "claim", amount, meta, now))
+        return ClaimResult(True, row[0], now_ts)
+
+    def has_ledger_kind(self, uid: str, kind: str) -> bool:
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("SELECT 1 FROM tx WHERE discord_id=? AND kind=? LIMIT 1", (uid, kind))
+            return c.fetchone() is not None
+
+    # ---- rounds / bets ----
+    def open_round(self, rid: str, channel_id: str, opener_id: str, expires_at: str) -> str:
+        """Insert an OPEN round and return its per-channel label ("#N")."""
+        with self._tx() as c:
+            c.execute("""INSERT INTO round_counters(channel_id,last_no) VALUES(?,1)
+                         ON CONFLICT(channel_id) DO UPDATE SET last_no=last_no+1""", (channel_id,))
+            c.execute("SELECT last_no FROM round_counters WHERE channel_id=?", (channel_id,))
+            label = f"#{c.fetchone()[0]}"
+            c.execute("INSERT INTO rounds(rid,channel_id,status,opened_by,opened_at,expires_at,label) VALUES(?,?,?,?,?,?,?)",
+                      (rid, channel_id, "OPEN", opener_id, self._clock(), expires_at, label))
+        return label
+
+    def get_round(self, rid: str) -> Round | None:
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("""SELECT rid, channel_id, status, opened_by, opened_at, expires_at, outcome, seed,
+                                resolved_at, message_id, label, pocket
+                         FROM rounds WHERE rid=?""", (rid,))
+            row = c.fetchone()
+        return Round(*row) if row else None
+
+    def latest_open_round(self, channel_id: str) -> Round | None:
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("""SELECT rid FROM rounds WHERE channel_id=? AND status='OPEN'
+                         ORDER BY opened_at DESC LIMIT 1""", (channel_id,))
+            row = c.fetchone()
+        return self.get_round(row[0]) if row else None
+
+    def set_round_message(self, rid: str, message_id: int | str):
+        with self._connect() as conn:
+            conn.execute("UPDATE rounds SET message_id=? WHERE rid=?", (str(message_id), rid))
+
+    def get_bet(self, rid: str, uid: str) -> Bet | None:
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("SELECT rid, discord_id, choice, stake, ts FROM bets WHERE rid=? AND discord_id=? LIMIT 1", (rid, uid))
+            row = c.fetchone()
+        return Bet(*row) if row else None
+
+    def place_bet(self, rid: str, channel_id: str, uid: str, choice: str, stake: int, meta: str,
+                  one_per_round: bool = True, latest: int = 10) -> BetPlaced:
+        """Check the round is open, enforce one bet per user, debit, write the ledger row and the bet,
+        and read back the round totals — one transaction, so a crowd betting at the buzzer can't
+        double-bet or overdraw. Raises RoundClosed / AlreadyBet / InsufficientFunds (nothing written)."""
+        now = self._clock()
+        with self._tx() as c:
+            c.execute("SELECT status, expires_at, message_id, label FROM rounds WHERE rid=?", (rid,))
+            row = c.fetchone()
+            if not row or row[0] != "OPEN" or _window_passed(row[1], now):
+                raise RoundClosed(rid)
+            c.execute("INSERT OR IGNORE INTO users(discord_id,balance,joined_at) VALUES(?,0,?)", (uid, now))
+            if one_per_round:  # bets(rid, discord_id) is also UNIQUE in the schema when the rule is on
+                c.execute("SELECT rid, discord_id, choice, stake, ts FROM bets WHERE rid=? AND discord_id=? LIMIT 1", (rid, uid))
+                prev = c.fetchone()
+                if prev:
+                    c.execute("SELECT balance FROM users WHERE discord_id=?", (uid,))
+                    raise AlreadyBet(Bet(*prev), c.fetchone()[0])
+            c.execute("UPDATE users SET balance=balance-? WHERE discord_id=? AND balance>=? RETURNING balance",
+                      (stake, uid, stake))
+            debited = c.fetchone()
+            if debited is None:
+                c.execute("SELECT balance FROM users WHERE discord_id=?", (uid,))
+                raise InsufficientFunds(c.fetchone()[0])
+            c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)", (uid, "bet", -stake, meta, now))
+            c.execute("INSERT INTO bets(rid,channel_id,discord_id,choice,stake,ts) VALUES(?,?,?,?,?,?)",
+                      (rid, channel_id, uid, choice, stake, now))
+            c.execute("SELECT COUNT(*), COALESCE(SUM(stake),0) FROM bets WHERE rid=?", (rid,))
+            snap = RoundSnapshot(rid, row[0], row[2], row[1], row[3], *c.fetchone())
+            c.execute("SELECT discord_id, choice, stake FROM bets WHERE rid=? ORDER BY ts DESC LIMIT ?", (rid, latest))
+            snap.latest = c.fetchall()
+        return BetPlaced(debited[0] + stake, debited[0], snap)
+
+    def settle_round(self, rid: str, outcome: str, pocket: int, seed: str,
+                     payouts: Callable[[list], list[tuple[str, int]]], meta: str) -> RoundSettlement | None:
+        """Resolve an OPEN round and credit payouts(bets) -> [(discord_id, win)] as kind 'payout', in one
+        transaction. Flipping the status first makes racing resolvers safe: None unless it was OPEN."""
+        with self._tx() as c:
+            c.execute("""UPDATE rounds SET status='RESOLVED', outcome=?, pocket=?, seed=?, resolved_at=?
+                         WHERE rid=? AND status='OPEN'""", (outcome, pocket, seed, self._clock(), rid))
+            if c.rowcount != 1:
+                return None
+            c.execute("SELECT discord_id, choice, stake FROM bets WHERE rid=? ORDER BY id", (rid,))
+            bets = c.fetchall()
+            credits = payouts(bets)
+            self._credit(c, credits, "payout", meta)
+        return RoundSettlement(self.get_round(rid), bets, credits)
+
+    def cancel_round(self, rid: str, refund_meta: str | None = None) -> RoundSettlement | None:
+        """Cancel an OPEN round; with refund_meta every stake goes back (kind 'payout', like the bet
+        it undoes). None unless it was OPEN, so a round is never both paid and refunded."""
+        with self._tx() as c:
+            c.execute("UPDATE rounds SET status='CANCELLED', resolved_at=? WHERE rid=? AND status='OPEN'",
+                      (self._clock(), rid))
+            if c.rowcount != 1:
+                return None
+            c.execute("SELECT discord_id, choice, stake FROM bets WHERE rid=? ORDER BY id", (rid,))
+            bets = c.fetchall()
+            credits = [(uid, stake) for uid, _choice, stake in bets] if refund_meta is not None else []
+            self._credit(c, credits, "payout", refund_meta or "")
+        return RoundSettlement(self.get_round(rid), bets, credits)
+
+    def round_snapshot(self, rid: str, latest: int = 10) -> RoundSnapshot | None:
+        return self.round_snapshots([rid], latest).get(rid)
+
+    def round_snapshots(self, rids: list[str], latest: int = 10, batch: int = 500) -> dict[str, RoundSnapshot]:
+        """Batched: round row + bet count/pool + newest `latest` bets for every rid."""
+        out: dict[str, RoundSnapshot] = {}
+        with self._connect() as conn:
+            c = conn.cursor()
+            for i in range(0, len(rids), batch):
+                chunk = rids[i:i + batch]
+                marks = ",".join("?" * len(chunk))
+                c.execute(f"""SELECT r.rid, r.status, r.message_id, r.expires_at, r.label,
+                                     COUNT(b.id), COALESCE(SUM(b.stake),0)
+                              FROM rounds r LEFT JOIN bets b ON b.rid = r.rid
+                              WHERE r.rid IN ({marks})
+                              GROUP BY r.rid""", chunk)
+                for row in c.fetchall():
+                    out[row[0]] = RoundSnapshot(*row)
+                c.execute(f"""SELECT rid, discord_id, choice, stake FROM (
+                                  SELECT rid, discord_id, choice, stake,
+                                         ROW_NUMBER() OVER (PARTITION BY rid ORDER BY ts DESC) AS rn
+                                  FROM bets WHERE rid IN ({marks}))
+                              WHERE rn <= ?
+                              ORDER BY rid, rn""", (*chunk, latest))
+                for rid, uid, ch, st in c.fetchall():
+                    if rid in out:
+                        out[rid].latest.append((uid, ch, st))
+        return out
+
+    # ---- lotto tickets ----
+    def buy_tickets(self, uid: str, week: str, count: int, cost: int) -> int:
+        """Debit `cost` and issue `count` tickets in one transaction; returns new balance.
+        Raises InsufficientFunds without touching anything."""
+        self.ensure_user(uid)
+        with self._tx() as c:
+            c.execute("UPDATE users SET balance=balance-? WHERE discord_id=? AND balance>=?", (cost, uid, cost))
+            if c.rowcount != 1:
+                c.execute("SELECT balance FROM users WHERE discord_id=?", (uid,))
+                raise InsufficientFunds(c.fetchone()[0])
+            ts = self._clock()
+            c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
+                      (uid, "redeem", -cost, f"tickets {count}", ts))
+            c.executemany("INSERT INTO tickets(week_id,discord_id,ts) VALUES(?,?,?)", [(week, uid, ts)] * count)
+            c.execute("SELECT balance FROM users WHERE discord_id=?", (uid,))
+            return c.fetchone()[0]
+
+    def ticket_counts(self, week: str, uid: str) -> tuple[int, int]:
+        """(total tickets this week, uid's tickets)."""
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("SELECT COUNT(*), COALESCE(SUM(discord_id=?),0) FROM tickets WHERE week_id=?", (uid, week))
+            return tuple(c.fetchone())
+
+    def lotto_drawn(self, week: str) -> bool:
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("SELECT 1 FROM lotto_draws WHERE week_id=? AND status='DONE' LIMIT 1", (week,))
+            return c.fetchone() is not None
+
+    def draw_lotto(self, week: str, seed: str, winners: int, prize_amount: int, shop: str) -> list[tuple[str, int]] | None:
+        """Draw `week` at most once: holders weighted by their ticket count (per-holder counts, tickets
+        are never loaded one by one), `winners` drawn without replacement by lotto_draw, then the draw
+        row and one WL prize per winner — one transaction. Returns [(winner_id, prize_id)] in place
+        order, or None if the week has no tickets or was already drawn."""
+        now = self._clock()
+        with self._tx() as c:
+            c.execute("SELECT 1 FROM lotto_draws WHERE week_id=? AND status='DONE' LIMIT 1", (week,))
+            if c.fetchone():
+                return None
+            c.execute("""SELECT discord_id, COUNT(*) FROM tickets WHERE week_id=?
+                         GROUP BY discord_id ORDER BY MIN(id)""", (week,))
+            holders = c.fetchall()
+            if not holders:
+                return None
+            winner_ids = lotto_draw(seed, holders, winners)
+            # ticket_count pins which tickets took part, so the audit can replay the draw
+            c.execute("""INSERT INTO lotto_draws(week_id,run_at,winner_id,seed,status,ticket_count,winner_ids)
+                         VALUES(?,?,?,?,?,?,?)""",
+                      (week, now, winner_ids[0], seed, "DONE", sum(n for _u, n in holders), json.dumps(winner_ids)))
+            drawn = []
+            for place, winner_id in enumerate(winner_ids, 1):
+                c.execute("""INSERT INTO prizes(winner_id,kind,amount,meta,status,created_ts,updated_ts)
+                             VALUES(?,?,?,?,?,?,?)""",
+                          (winner_id, "wl", prize_amount, json.dumps({"shop": shop, "week": week, "place": place}),
+                           "pending", now, now))
+                drawn.append((winner_id, c.lastrowid))
+        return drawn
+
+    # ---- prizes / withdrawals ----
+    def get_prize(self, prize_id: int) -> Prize | None:
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("""SELECT id, winner_id, kind, amount, meta, status, message_id, ticket_channel_id
+                         FROM prizes WHERE id=?""", (prize_id,))
+            row = c.fetchone()
+        return Prize(*row) if row else None
+
+    def set_prize_message(self, prize_id: int, message_id: int | str):
+        with self._connect() as conn:
+            conn.execute("UPDATE prizes SET message_id=? WHERE id=?", (str(message_id), prize_id))
+
+    def set_prize_ticket(self, prize_id: int, channel_id: int | str):
+        with self._connect() as conn:
+            conn.execute("UPDATE prizes SET ticket_channel_id=? WHERE id=?", (str(channel_id), prize_id))
+
+    def claim_prize(self, prize_id: int, uid: str, imvu_name: str, imvu_profile: str, note: str) -> bool:
+        """Mark a pending prize claimed and queue it for fulfilment, in one transaction (joins the
+        caller's); False if it was already claimed."""
+        now = self._clock()
+        with self._tx() as c:
+            c.execute("UPDATE prizes SET status='claimed', updated_ts=? WHERE id=? AND status='pending'", (now, prize_id))
+            if c.rowcount != 1:
+                return False
+            c.execute("""INSERT INTO prize_queue(prize_id,winner_id,imvu_name,imvu_profile,note,status,created_ts,updated_ts)
+                         VALUES(?,?,?,?,?,?,?,?)""", (prize_id, uid, imvu_name, imvu_profile, note, "ready", now, now))
+        return True
+
+    # ---- fulfilment queue ----
+    # Items are leased to one admin at a time (leased_by/lease_until, like jobs/outbox), so two staff
+    # members never gift the same claim; an expired lease makes the item available again.
+    def lease_fulfilments(self, admin_id: str, n: int, now_ts: int, until: int) -> list[Fulfilment]:
+        """Lease the oldest `n` ready items not held by another admin (this admin's own leases are
+        renewed); returns them in queue order."""
+        with self._tx() as c:
+            c.execute("""UPDATE prize_queue SET leased_by=?, lease_until=?
+                         WHERE id IN (SELECT id FROM prize_queue
+                                      WHERE status='ready' AND (lease_until IS NULL OR lease_until<=? OR leased_by=?)
+                                      ORDER BY created_ts, id LIMIT ?)
+                         RETURNING id""", (admin_id, until, now_ts, admin_id, n))
+            ids = [r[0] for r in c.fetchall()]
+            if not ids:
+                return []
+            c.execute(f"""SELECT pq.id, pq.prize_id, pq.winner_id, pq.imvu_name, pq.imvu_profile, p.amount, p.meta
+                          FROM prize_queue pq JOIN prizes p ON p.id = pq.prize_id
+                          WHERE pq.id IN ({','.join('?' * len(ids))}) ORDER BY pq.created_ts, pq.id""", ids)
+            return [Fulfilment(*row) for row in c.fetchall()]
+
+    def complete_fulfilments(self, admin_id: str, queue_ids: list[int], now_ts: int) -> list[int]:
+        """Mark items fulfilled (queue row + prize) in one transaction, skipping any already done or
+        leased to someone else; returns the queue ids actually marked."""
+        if not queue_ids:
+            return []
+        now = self._clock()
+        with self._tx() as c:
+            c.execute(f"""UPDATE prize_queue SET status='fulfilled', updated_ts=?, leased_by=NULL, lease_until=NULL
+                          WHERE id IN ({','.join('?' * len(queue_ids))}) AND status='ready'
+                            AND (leased_by=? OR lease_until IS NULL OR lease_until<=?)
+                          RETURNING id, prize_id""", (now, *queue_ids, admin_id, now_ts))
+            done = c.fetchall()
+            c.executemany("UPDATE prizes SET status='fulfilled', updated_ts=? WHERE id=?", [(now, pid) for _q, pid in done])
+        return [q for q, _p in done]
+
+    def release_fulfilments(self, admin_id: str, queue_ids: list[int]):
+        if not queue_ids:
+            return
+        with self._connect() as conn:
+            conn.execute(f"""UPDATE prize_queue SET leased_by=NULL, lease_until=NULL
+                             WHERE id IN ({','.join('?' * len(queue_ids))}) AND leased_by=? AND status='ready'""",
+                         (*queue_ids, admin_id))
+
+    def get_withdrawal(self, req_id: int) -> Withdrawal | None:
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute(f"SELECT {self._WITHDRAWAL_COLUMNS} FROM withdraw_requests w WHERE id=?", (req_id,))
+            row = c.fetchone()
+        return Withdrawal(*row) if row else None
+
+    _WITHDRAWAL_COLUMNS = """w.id, w.discord_id, w.coins, w.gifts, w.imvu_name, w.imvu_profile, w.status,
+                             w.ticket_channel_id, w.message_id, w.reviewer_id, w.review_note, w.created_ts"""
+
+    def set_withdrawal_ticket(self, req_id: int, channel_id: int | str, message_id: int | str):
+        with self._connect() as conn:
+            conn.execute("UPDATE withdraw_requests SET ticket_channel_id=?, message_id=?, updated_ts=? WHERE id=?",
+                         (str(channel_id), str(message_id), self._clock(), req_id))
+
+    def count_withdrawals(self, status: str) -> int:
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("SELECT COUNT(*) FROM withdraw_requests WHERE status=?", (status,))
+            return c.fetchone()[0]
+
+    def pending_withdrawals(self, bound: tuple | None, op: str, limit: int) -> list[PendingWithdrawal]:
+        """Pending requests oldest first, keyed (created_ts, id) over idx_withdraw_status_created; see
+        keyset_rows for `op`."""
+        with self._connect() as conn:
+            rows = keyset_rows(conn.cursor(),
+                               f"""SELECT {self._WITHDRAWAL_COLUMNS}, COALESCE(u.balance, 0)
+                                   FROM withdraw_requests w LEFT JOIN users u ON u.discord_id = w.discord_id
+                                   WHERE w.status='pending'""", (), "w.created_ts, w.id", bound, op, limit)
+        return [PendingWithdrawal(Withdrawal(*row[:-1]), row[-1]) for row in rows]
+
+    def create_withdrawal(self, uid: str, coins: int, gifts: int, imvu_name: str, imvu_profile: str,
+                          note: str = "") -> int:
+        now = self._clock()
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("""INSERT INTO withdraw_requests(discord_id,coins,gifts,imvu_name,imvu_profile,note,status,created_ts,updated_ts)
+                         VALUES(?,?,?,?,?,?,?,?,?)""", (uid, coins, gifts, imvu_name, imvu_profile, note, "pending", now, now))
+            return c.lastrowid
+
+    def approve_withdrawal(self, req_id: int, reviewer_id: str, note: str, coins_per_gift: int, shop: str,
+                           coins: int | None = None) -> tuple[str, int]:
+        """Debit the user, create the WL prize + its fulfilment queue row and mark the request approved,
+        in one transaction (joins the caller's). `coins` overrides the requested amount. Returns
+        (result, balance) with result 'approved', 'insufficient' or 'not_pending' (nothing written
+        unless approved)."""
+        now = self._clock()
+        with self._tx() as c:
+            c.execute("SELECT discord_id, status, coins, imvu_name, imvu_profile FROM withdraw_requests WHERE id=?",
+                      (req_id,))
+            row = c.fetchone()
+            if not row or row[1] != "pending":
+                return "not_pending", 0
+            uid, _status, requested, uname, prof = row
+            coins = coins or requested
+            gifts = coins // coins_per_gift
+            c.execute("UPDATE users SET balance=balance-? WHERE discord_id=? AND balance>=? RETURNING balance",
+                      (coins, uid, coins))
+            debited = c.fetchone()
+            if debited is None:
+                c.execute("SELECT balance FROM users WHERE discord_id=?", (uid,))
+                return "insufficient", (c.fetchone() or (0,))[0]
+            c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
+                      (uid, "wl_withdraw", -coins, f"withdraw_to_wl:{gifts} gifts", now))
+            c.execute("""INSERT INTO prizes(winner_id,kind,amount,meta,status,created_ts,updated_ts)
+                         VALUES(?,?,?,?,?,?,?)""",
+                      (uid, "wl", gifts, json.dumps({"shop": shop, "source": "user_withdraw"}), "pending", now, now))
+            c.execute("""INSERT INTO prize_queue(prize_id,winner_id,imvu_name,imvu_profile,note,status,created_ts,updated_ts)
+                         VALUES(?,?,?,?,?,?,?,?)""",
+                      (c.lastrowid, uid, uname, prof or "", note, "ready", now, now))
+            c.execute("""UPDATE withdraw_requests SET status='approved', reviewer_id=?, review_note=?, coins=?, gifts=?, updated_ts=?
+                         WHERE id=?""", (reviewer_id, note, coins, gifts, now, req_id))
+        return "approved", debited[0]
+
+    def reject_withdrawal(self, req_id: int, reviewer_id: str, reason: str) -> bool:
+        """Mark a still-pending request rejected; False if it was already handled."""
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("""UPDATE withdraw_requests SET status='rejected', reviewer_id=?, review_note=?, updated_ts=?
+                         WHERE id=? AND status='pending'""", (reviewer_id, reason, self._clock(), req_id))
+            return c.rowcount == 1
+
+    # ---- leaderboards ----
+    # Highest value first, keyed on (value, discord_id). Balance pages and ranks are ranges of
+    # idx_users_balance (a rank is a COUNT of the rows ahead), all-time roulette the same over
+    # idx_roulette_net (running nets kept by a trigger on tx), so neither sorts or sums anything.
+    # A roulette window (`since`) sums its tx rows through idx_tx_game_ts.
+    def _board(self, board: str, since: str | None) -> tuple[str, tuple, str]:
+        if board == "balance":
+            return "SELECT discord_id, balance FROM users WHERE 1", (), "balance, discord_id"
+        if board != "roulette":
+            raise ValueError(f"unknown leaderboard {board!r}")
+        if not since:
+            return "SELECT discord_id, net FROM roulette_net WHERE net != 0", (), "net, discord_id"
+        return ("""SELECT discord_id, net FROM (
+                       SELECT discord_id, SUM(amount) AS net FROM tx INDEXED BY idx_tx_game_ts
+                       WHERE kind IN ('bet','payout') AND ts >= ?
+                       GROUP BY discord_id HAVING net != 0)
+                   WHERE 1""", (since,), "net, discord_id")
+
+    def leaderboard_page(self, board: str, bound: tuple | None, op: str, limit: int,
+                         since: str | None = None) -> list[tuple[str, int]]:
+        """[(discord_id, value)] from `bound` = (value, discord_id); see keyset_rows for `op`."""
+        sql, params, key = self._board(board, since)
+        with self._connect() as conn:
+            return keyset_rows(conn.cursor(), sql, params, key, bound, op, limit, desc=True)
+
+    def leaderboard_rank(self, board: str, key: tuple, since: str | None = None) -> int:
+        """1-based rank of the row keyed (value, discord_id)."""
+        sql, params, cols = self._board(board, since)
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute(f"SELECT COUNT(*) FROM ({sql} AND ({cols}) > (?,?))", (*params, *key))
+            return c.fetchone()[0] + 1
+
+    def leaderboard_entry(self, board: str, uid: str, since: str | None = None) -> int | None:
+        sql, params, _key = self._board(board, since)
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute(f"{sql} AND discord_id=?", (*params, uid))
+            row = c.fetchone()
+        return row[1] if row else None
+
+    def leaderboard_size(self, board: str, since: str | None = None) -> int:
+        sql, params, _key = self._board(board, since)
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute(f"SELECT COUNT(*) FROM ({sql})", params)
+            return c.fetchone()[0]
+
+    def leaderboard_standing(self, board: str, uid: str, since: str | None = None) -> Standing:
+        """uid's rank and value plus the board size in one query; a windowed board is summed once."""
+        sql, params, key = self._board(board, since)
+        value, uid_col = key.split(", ")
+        materialize = "MATERIALIZED" if since else "NOT MATERIALIZED"
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute(f"""WITH b AS {materialize} ({sql})
+                          SELECT (SELECT COUNT(*) FROM b), me.{value},
+                                 (SELECT COUNT(*) FROM b WHERE ({key}) > (me.{value}, me.{uid_col})) + 1
+                          FROM (SELECT 1) LEFT JOIN b AS me ON me.{uid_col} = ?""", (*params, uid))
+            size, value, rank = c.fetchone()
+        return Standing(rank if value is not None else None, value, size)
+
+    # ---- slots ----
+    def get_slots_pot(self, channel_id: str) -> int | None:
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("SELECT pot FROM slots_pots WHERE channel_id=?", (channel_id,))
+            row = c.fetchone()
+        return row[0] if row and row[0] is not None else None
+
+    def set_slots_pot(self, channel_id: str, pot: int):
+        with self._connect() as conn:
+            conn.execute("""INSERT INTO slots_pots(channel_id,pot) VALUES(?,?)
+                            ON CONFLICT(channel_id) DO UPDATE SET pot=excluded.pot""", (channel_id, pot))
+
+    def get_slots_panel(self, channel_id: str) -> str | None:
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("SELECT message_id FROM slots_pots WHERE channel_id=?", (channel_id,))
+            row = c.fetchone()
+        return row[0] if row else None
+
+    def set_slots_panel(self, channel_id: str, message_id: int | str, seed: int):
+        with self._connect() as conn:
+            conn.execute("""INSERT INTO slots_pots(channel_id,pot,message_id) VALUES(?,?,?)
+                            ON CONFLICT(channel_id) DO UPDATE SET message_id=excluded.message_id""",
+                         (channel_id, seed, str(message_id)))
+
+    def record_spins(self, spins: list[SlotsSpin]):
+        ts = self._clock()
+        with self._connect() as conn:
+            conn.executemany("""INSERT INTO slots_spins(channel_id,discord_id,r1,r2,r3,win,pot_before,ts)
+                                VALUES(?,?,?,?,?,?,?,?)""",
+                             [(s.channel_id, s.discord_id, s.r1, s.r2, s.r3, s.win, s.pot_before, s.ts or ts) for s in spins])
+
+    def slots_top(self, channel_id: str, limit: int = 10) -> list[tuple[str, int]]:
+        with self._connect() as conn:
+            c = conn.cursor()
+            c.execute("""SELECT discord_id, COALESCE(SUM(win),0) AS total
+                         FROM slots_spins
+                         WHERE channel_id=?
+                         GROUP BY discord_id
+                         HAVING total>0
+                         ORDER BY total DESC
+                         LIMIT ?""", (channel_id, limit))
+            return c.fetchall()
+
+
+# ---------------- In-memory ----------------
+class MemoryStore:
+    """Same interface as SQLiteStore, backed by dicts. Not persistent and not thread-safe."""
+
+    def __init__(self, clock: Callable[[], str] = lambda: ""):
+        self._clock = clock
+        self.users: dict[str, User] = {}
+        self.ledger: list[LedgerEntry] = []
+        self.roulette_net: Counter = Counter()        # discord_id -> SUM of bet/payout entries
+        self.rounds: dict[str, Round] = {}
+        self.bets: dict[str, list[Bet]] = {}          # rid -> bets, oldest first
+        self.round_counters: Counter = Counter()
+        self.tickets: dict[str, Counter] = {}         # week -> Counter(discord_id)
+        self.prizes: dict[int, Prize] = {}
+        self.withdrawals: dict[int, Withdrawal] = {}
+        self.prize_queue: dict[int, QueuedPrize] = {}
+        self.lotto_draws: dict[str, list[str]] = {}   # week -> winner ids in place order
+        self.slots_pots: dict[str, list] = {}         # channel_id -> [pot, message_id]
+        self.slots_spins: list[SlotsSpin] = []
+
+    def _ledger(self, uid: str, kind: str, amount: int, meta: str):
+        self.ledger.append(LedgerEntry(len(self.ledger) + 1, uid, kind, amount, meta, self._clock()))
+        if kind in ("bet", "payout"):
+            self.roulette_net[uid] += amount
+
+    # ---- users / ledger ----
+    def ensure_user(self, uid: str):
+        if uid not in self.users:
+            self.users[uid] = User(uid, 0, None, None, self._clock())
+
+    def get_user(self, uid: str) -> User | None:
+        return self.users.get(uid)
+
+    def get_balance(self, uid: str) -> int:
+        self.ensure_user(uid)
+        return self.users[uid].balance
+
+    def change_balance(self, uid: str, delta: int, kind: str, meta: str = "") -> int:
+        self.ensure_user(uid)
+        user = self.users[uid]
+        user.balance += delta
+        self._ledger(uid, kind, delta, meta)
+        return user.balance
+
+    def post_ledger(self, uid: str, delta: int, kind: str, meta: str = "") -> int:
+        self.change_balance(uid, delta, kind, meta)
+        return self.ledger[-1].id
+
+    def debit(self, uid: str, amount: int, kind: str, meta: str = "") -> tuple[int, int]:
+        user = self.users.get(uid)
+        if user is None or user.balance < amount:
+            raise InsufficientFunds(user.balance if user else 0)
+        user.balance -= amount
+        self._ledger(uid, kind, -amount, meta)
+        return self.ledger[-1].id, user.balance
+
+    def _credit(self, credits: list[tuple[str, int]], kind: str, meta: str):
+        for uid, amt in credits:
+            self.change_balance(uid, amt, kind, meta)
+
+    def claim(self, uid: str, period: str, amount: int, now_ts: int, cutoff: int, meta: str) -> ClaimResult:
+        self.ensure_user(uid)
+        user = self.users[uid]
+        attr = SQLiteStore._CLAIM_COLUMNS[period]
+        last = getattr(user, attr)
+        if (last or 0) > cutoff:
+            return ClaimResult(False, user.balance, last)
+        setattr(user, attr, now_ts)
+        user.balance += amount
+        self._ledger(uid, "claim", amount, meta)
+        return ClaimResult(True, user.balance, now_ts)
+
+    def has_ledger_kind(self, uid: str, kind: str) -> bool:
+        return any(e.discord_id == uid and e.kind == kind for e in self.ledger)
+
+    # ---- rounds / bets ----
+    def open_round(self, rid: str, channel_id: str, opener_id: str, expires_at: str) -> str:
+        self.round_counters[channel_id] += 1
+        label = f"#{self.round_counters[channel_id]}"
+        self.rounds[rid] = Round(rid, channel_id, "OPEN", opener_id, self._clock(), expires_at, label=label)
+        self.bets[rid] = []
+        return label
+
+    def get_round(self, rid: str) -> Round | None:
+        return self.rounds.get(rid)
+
+    def latest_open_round(self, channel_id: str) -> Round | None:
+        open_rounds = [r for r in self.rounds.values() if r.channel_id == channel_id and r.status == "OPEN"]
+        return max(open_rounds, key=lambda r: r.opened_at or "", default=None)
+
+    def set_round_message(self, rid: str, message_id: int | str):
+        self.rounds[rid].message_id = str(message_id)
+
+    def get_bet(self, rid: str, uid: str) -> Bet | None:
+        return next((b for b in self.bets.get(rid, ()) if b.discord_id == uid), None)
+
+    def place_bet(self, rid: str, channel_id: str, uid: str, choice: str, stake: int, meta: str,
+                  one_per_round: bool = True, latest: int = 10) -> BetPlaced:
+        r = self.rounds.get(rid)
+        if r is None or r.status != "OPEN" or _window_passed(r.expires_at, self._clock()):
+            raise RoundClosed(rid)
+        self.ensure_user(uid)
+        user = self.users[uid]
+        prev = self.get_bet(rid, uid) if one_per_round else None
+        if prev:
+            raise AlreadyBet(prev, user.balance)
+        if user.balance < stake:
+            raise InsufficientFunds(user.balance)
+        user.balance -= stake
+        self._ledger(uid, "bet", -stake, meta)
+        self.bets.setdefault(rid, []).append(Bet(rid, uid, choice, stake, self._clock()))
+        return BetPlaced(user.balance + stake, user.balance, self.round_snapshot(rid, latest))
+
+    def _close_round(self, rid: str, status: str) -> list | None:
+        r = self.rounds.get(rid)
+        if r is None or r.status != "OPEN":
+            return None
+        r.status, r.resolved_at = status, self._clock()
+        return [(b.discord_id, b.choice, b.stake) for b in self.bets.get(rid, [])]
+
+    def settle_round(self, rid: str, outcome: str, pocket: int, seed: str,
+                     payouts: Callable[[list], list[tuple[str, int]]], meta: str) -> RoundSettlement | None:
+        bets = self._close_round(rid, "RESOLVED")
+        if bets is None:
+            return None
+        r = self.rounds[rid]
+        r.outcome, r.pocket, r.seed = outcome, pocket, seed
+        credits = payouts(bets)
+        self._credit(credits, "payout", meta)
+        return RoundSettlement(r, bets, credits)
+
+    def cancel_round(self, rid: str, refund_meta: str | None = None) -> RoundSettlement | None:
+        bets = self._close_round(rid, "CANCELLED")
+        if bets is None:
+            return None
+        credits = [(uid, stake) for uid, _choice, stake in bets] if refund_meta is not None else []
+        self._credit(credits, "payout", refund_meta or "")
+        return RoundSettlement(self.rounds[rid], bets, credits)
+
+    def round_snapshot(self, rid: str, latest: int = 10) -> RoundSnapshot | None:
+        return self.round_snapshots([rid], latest).get(rid)
+
+    def round_snapshots(self, rids: list[str], latest: int = 10, batch: int = 500) -> dict[str, RoundSnapshot]:
+        out = {}
+        for rid in rids:
+            r = self.rounds.get(rid)
+            if r is None:
+                continue
+            bets = self.bets.get(rid, [])
+            out[rid] = RoundSnapshot(rid, r.status, r.message_id, r.expires_at, r.label,
+                                     len(bets), sum(b.stake for b in bets),
+                                     [(b.discord_id, b.choice, b.stake) for b in reversed(bets[-latest:])])
+        return out
+
+    # ---- lotto tickets ----
+    def buy_tickets(self, uid: str, week: str, count: int, cost: int) -> int:
+        self.ensure_user(uid)
+        user = self.users[uid]
+        if user.balance < cost:
+            raise InsufficientFunds(user.balance)
+        user.balance -= cost
+        self._ledger(uid, "redeem", -cost, f"tickets {count}")
+        self.tickets.setdefault(week, Counter())[uid] += count
+        return user.balance
+
+    def ticket_counts(self, week: str, uid: str) -> tuple[int, int]:
+        counts = self.tickets.get(week, Counter())
+        return sum(counts.values()), counts[uid]
+
+    def lotto_drawn(self, week: str) -> bool:
+        return week in self.lotto_draws
+
+    def _add_prize(self, winner_id: str, amount: int, meta: dict) -> int:
+        prize_id = len(self.prizes) + 1
+        self.prizes[prize_id] = Prize(prize_id, winner_id, "wl", amount, json.dumps(meta), "pending")
+        return prize_id
+
+    def draw_lotto(self, week: str, seed: str, winners: int, prize_amount: int, shop: str) -> list[tuple[str, int]] | None:
+        holders = list(self.tickets.get(week, Counter()).items())  # Counter keeps first-ticket order
+        if week in self.lotto_draws or not holders:
+            return None
+        self.lotto_draws[week] = lotto_draw(seed, holders, winners)
+        return [(w, self._add_prize(w, prize_amount, {"shop": shop, "week": week, "place": place}))
+                for place, w in enumerate(self.lotto_draws[week], 1)]
+
+    # ---- prizes / withdrawals ----
+    def get_prize(self, prize_id: int) -> Prize | None:
+        return self.prizes.get(prize_id)
+
+    def set_prize_message(self, prize_id: int, message_id: int | str):
+        self.prizes[prize_id].message_id = str(message_id)
+
+    def set_prize_ticket(self, prize_id: int, channel_id: int | str):
+        self.prizes[prize_id].ticket_channel_id = str(channel_id)
+
+    def _queue_prize(self, prize_id: int, uid: str, imvu_name: str, imvu_profile: str, note: str):
+        queue_id = len(self.prize_queue) + 1
+        self.prize_queue[queue_id] = QueuedPrize(queue_id, prize_id, uid, imvu_name, imvu_profile, note, "ready",
+                                                 self._clock())
+
+    def claim_prize(self, prize_id: int, uid: str, imvu_name: str, imvu_profile: str, note: str) -> bool:
+        prize = self.prizes.get(prize_id)
+        if prize is None or prize.status != "pending":
+            return False
+        prize.status = "claimed"
+        self._queue_prize(prize_id, uid, imvu_name, imvu_profile, note)
+        return True
+
+    # ---- fulfilment queue ----
+    def lease_fulfilments(self, admin_id: str, n: int, now_ts: int, until: int) -> list[Fulfilment]:
+        free = [q for q in self.prize_queue.values()
+                if q.status == "ready" and (q.lease_until is None or q.lease_until <= now_ts or q.leased_by == admin_id)]
+        leased = sorted(free, key=lambda q: (q.created_ts or "", q.id))[:n]
+        for q in leased:
+            q.leased_by, q.lease_until = admin_id, until
+        return [Fulfilment(q.id, q.prize_id, q.winner_id, q.imvu_name, q.imvu_profile,
+                           self.prizes[q.prize_id].amount, self.prizes[q.prize_id].meta) for q in leased]
+
+    def complete_fulfilments(self, admin_id: str, queue_ids: list[int], now_ts: int) -> list[int]:
+        done = []
+        for queue_id in queue_ids:
+            q = self.prize_queue.get(queue_id)
+            if q is None or q.status != "ready" or \
+                    not (q.leased_by == admin_id or q.lease_until is None or q.lease_until <= now_ts):
+                continue
+            q.status, q.leased_by, q.lease_until = "fulfilled", None, None
+            self.prizes[q.prize_id].status = "fulfilled"
+            done.append(queue_id)
+        return done
+
+    def release_fulfilments(self, admin_id: str, queue_ids: list[int]):
+        for queue_id in queue_ids:
+            q = self.prize_queue.get(queue_id)
+            if q is not None and q.leased_by == admin_id and q.status == "ready":
+                q.leased_by = q.lease_until = None
+
+    def get_withdrawal(self, req_id: int) -> Withdrawal | None:
+        return self.withdrawals.get(req_id)
+
+    def create_withdrawal(self, uid: str, coins: int, gifts: int, imvu_name: str, imvu_profile: str,
+                          note: str = "") -> int:
+        req_id = len(self.withdrawals) + 1
+        self.withdrawals[req_id] = Withdrawal(req_id, uid, coins, gifts, imvu_name, imvu_profile, "pending",
+                                              created_ts=self._clock())
+        return req_id
+
+    def set_withdrawal_ticket(self, req_id: int, channel_id: int | str, message_id: int | str):
+        w = self.withdrawals[req_id]
+        w.ticket_channel_id, w.message_id = str(channel_id), str(message_id)
+
+    def count_withdrawals(self, status: str) -> int:
+        return sum(w.status == status for w in self.withdrawals.values())
+
+    def pending_withdrawals(self, bound: tuple | None, op: str, limit: int) -> list[PendingWithdrawal]:
+        pending = sorted((w for w in self.withdrawals.values() if w.status == "pending"),
+                         key=lambda w: (w.created_ts or "", w.id))
+        page = _keyset_list(pending, lambda w: (w.created_ts or "", w.id), bound, op, limit)
+        return [PendingWithdrawal(w, self.users[w.discord_id].balance if w.discord_id in self.users else 0)
+                for w in page]
+
+    def approve_withdrawal(self, req_id: int, reviewer_id: str, note: str, coins_per_gift: int, shop: str,
+                           coins: int | None = None) -> tuple[str, int]:
+        w = self.withdrawals.get(req_id)
+        if w is None or w.status != "pending":
+            return "not_pending", 0
+        coins = coins or w.coins
+        gifts = coins // coins_per_gift
+        user = self.users.get(w.discord_id)
+        if user is None or user.balance < coins:
+            return "insufficient", user.balance if user else 0
+        user.balance -= coins
+        self._ledger(w.discord_id, "wl_withdraw", -coins, f"withdraw_to_wl:{gifts} gifts")
+        prize_id = self._add_prize(w.discord_id, gifts, {"shop": shop, "source": "user_withdraw"})
+        self._queue_prize(prize_id, w.discord_id, w.imvu_name, w.imvu_profile or "", note)
+        w.status, w.coins, w.gifts, w.reviewer_id, w.review_note = "approved", coins, gifts, reviewer_id, note
+        return "approved", user.balance
+
+    def reject_withdrawal(self, req_id: int, reviewer_id: str, reason: str) -> bool:
+        w = self.withdrawals.get(req_id)
+        if w is None or w.status != "pending":
+            return False
+        w.status, w.reviewer_id, w.review_note = "rejected", reviewer_id, reason
+        return True
+
+    # ---- leaderboards ----
+    def _board(self, board: str, since: str | None) -> list[tuple[str, int]]:
+        if board == "balance":
+            rows = [(uid, u.balance) for uid, u in self.users.items()]
+        elif board == "roulette":
+            nets = self.roulette_net
+            if since:
+                nets = Counter()
+                for e in self.ledger:
+                    if e.kind in ("bet", "payout") and e.ts >= since:
+                        nets[e.discord_id] += e.amount
+            rows = [(uid, net) for uid, net in nets.items() if net != 0]
+        else:
+            raise ValueError(f"unknown leaderboard {board!r}")
+        return sorted(rows, key=lambda r: (r[1], r[0]), reverse=True)
+
+    def leaderboard_page(self, board: str, bound: tuple | None, op: str, limit: int,
+                         since: str | None = None) -> list[tuple[str, int]]:
+        return _keyset_list(self._board(board, since), lambda r: (r[1], r[0]), bound, op, limit, desc=True)
+
+    def leaderboard_rank(self, board: str, key: tuple, since: str | None = None) -> int:
+        return 1 + sum((v, uid) > tuple(key) for uid, v in self._board(board, since))
+
+    def leaderboard_entry(self, board: str, uid: str, since: str | None = None) -> int | None:
+        return next((v for u, v in self._board(board, since) if u == uid), None)
+
+    def leaderboard_size(self, board: str, since: str | None = None) -> int:
+        return len(self._board(board, since))
+
+    def leaderboard_standing(self, board: str, uid: str, since: str | None = None) -> Standing:
+        rows = self._board(board, since)
+        rank = next((i for i, (u, _v) in enumerate(rows, 1) if u == uid), None)
+        return Standing(rank, rows[rank - 1][1] if rank else None, len(rows))
+
+    # ---- slots ----
+    def get_slots_pot(self, channel_id: str) -> int | None:
+        return self.slots_pots.get(channel_id, [None])[0]
+
+    def set_slots_pot(self, channel_id: str, pot: int):
+        self.slots_pots.setdefault(channel_id, [None, None])[0] = pot
+
+    def get_slots_panel(self, channel_id: str) -> str | None:
+        return self.slots_pots.get(channel_id, [None, None])[1]
+
+    def set_slots_panel(self, channel_id: str, message_id: int | str, seed: int):
+        entry = self.slots_pots.setdefault(channel_id, [seed, None])
+        entry[1] = str(message_id)
+
+    def record_spins(self, spins: list[SlotsSpin]):
+        self.slots_spins.extend(spins)
+
+    def slots_top(self, channel_id: str, limit: int = 10) -> list[tuple[str, int]]:
+        totals = Counter()
+        for s in self.slots_spins:
+            if s.channel_id == channel_id:
+                totals[s.discord_id] += s.win
+        return [(uid, t) for uid, t in totals.most_common() if t > 0][:limit]
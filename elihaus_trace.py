@@ -0,0 +1,85 @@
+# elihaus_trace.py — opt-in interaction trace for elihaus_replay.py
+# While on, every slash command / button / modal submit becomes one JSON line when it finishes:
+#
+#   {"t": 12.031, "ms": 84.2, "kind": "modal", "name": "BetModal", "guild": 1, "channel": 3, "user": 17,
+#    "admin": false, "state": {"rid": "$round", "choice": "red"}, "inputs": {"amount": "2500"}}
+#
+# t is seconds since the trace started, ms how long the callback took in production. Discord ids
+# are replaced by small per-trace numbers (the mapping is never written), and free text is kept only
+# if the bot says it is safe (numbers, bet choices, option keywords); anything else becomes "x"s of
+# the same length. Stdlib only, so it can be imported without discord.py.
+import json, threading, time
+from datetime import datetime, timezone
+from typing import Callable, Iterator
+
+TRACE_VERSION = 1
+
+class TraceRecorder:
+    def __init__(self, keep_text: Callable[[str], bool] = str.isdigit):
+        self.enabled = False
+        self.path: str | None = None
+        self.events = 0
+        self.keep_text = keep_text
+        self._f = None
+        self._t0 = 0.0
+        self._ids: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def start(self, path: str):
+        if self.enabled:
+            return
+        self._f = open(path, "a", encoding="utf-8")
+        self._t0 = time.monotonic()
+        self._ids = {}
+        self.path, self.events, self.enabled = path, 0, True
+        self._write({"trace": TRACE_VERSION, "started": datetime.now(timezone.utc).isoformat(timespec="seconds")})
+
+    def stop(self):
+        self.enabled = False
+        if self._f:
+            self._f.close()
+            self._f = None
+
+    # ---- anonymising ----
+    def anon(self, snowflake) -> int | None:
+        if snowflake is None:
+            return None
+        return self._ids.setdefault(int(snowflake), len(self._ids) + 1)
+
+    def scrub(self, value):
+        if isinstance(value, str) and not self.keep_text(value.strip()):
+            return "x" * len(value)
+        return value
+
+    # ---- events ----
+    def begin(self) -> float:
+        return time.monotonic()
+
+    def finish(self, started: float, event: dict):
+        if not self.enabled:
+            return
+        event = {"t": round(started - self._t0, 3), "ms": round((time.monotonic() - started) * 1000, 1), **event}
+        self._write(event)
+        self.events += 1
+
+    def _write(self, obj: dict):
+        with self._lock:
+            if self._f:
+                self._f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+                self._f.flush()
+
+def read_trace(path: str) -> Iterator[dict]:
+    """Events of a trace file in order. A file holding several recording sessions (each starts
+    with a header line and t=0) plays them back to back."""
+    base = last = 0.0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line)
+            if "trace" in obj:
+                base = last
+                continue
+            obj["t"] = last = base + obj["t"]
+            yield obj
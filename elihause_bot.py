@@ -1,13 +1,25 @@
 # elihause_bot.py — EliHaus (coins + admin roulette + weekly lotto + prize queue) — SLASH ver (eh_*)
 # Requires: pip install -U discord.py
-import os, sqlite3, random, json, traceback
+import os, re, sqlite3, random, json, math, traceback
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import IO
 from datetime import datetime, timedelta, timezone
 
 import discord
 from discord.ext import commands
 from discord import app_commands
 from zoneinfo import ZoneInfo  # proper DST (e.g., Europe/London)
-import io, time
+import io, time, tempfile
+
+from elihaus_store import (SQLiteStore, InsufficientFunds, RoundClosed, AlreadyBet, RoundSnapshot, SlotsSpin,
+                           Fulfilment, PendingWithdrawal, keyset_rows)
+from elihaus_games import new_seed, roulette_roll, roulette_color, RouletteRules, SlotsRules
+from elihaus_export import EXPORT_TABLES, FORMATS, GAMES, build_where, export_table, parse_tables
+from elihaus_profiler import TaskProfiler
+from elihaus_backup import BackupError, archives, backup_db, verify_archive
+from elihaus_trace import TraceRecorder
 
 
 # ---------------- Config ----------------
@@ -30,27 +42,159 @@ MIN_WL_GIFTS = int(os.getenv("MIN_WL_GIFTS", "1"))
 MAX_WL_GIFTS = int(os.getenv("MAX_WL_GIFTS", "40"))
 
 
-STICKY_AFTER_MSGS = 15  # bump after this many chat messages
-STICKY_COUNT: dict[int, int] = {}  # channel_id -> counter since last bump
-
-INTENTS = discord.Intents.default()
-INTENTS.message_content = True
-INTENTS.members = True
+# Sticky round panel: re-post it at the bottom once chat has buried it (see StickyBumper)
+STICKY_MIN_DISTANCE = int(os.getenv("STICKY_MIN_DISTANCE", "15"))  # messages below the panel before a bump
+STICKY_COOLDOWN = float(os.getenv("STICKY_COOLDOWN", "20"))         # min seconds between bumps in a quiet channel
+STICKY_BUSY_RATE = 1.0     # msgs/sec at which the cooldown has doubled (it keeps growing with the rate)
+STICKY_QUIET = 3.0         # bump once chat pauses this long...
+STICKY_MAX_WAIT = 15.0     # ...or after this long regardless
+STICKY_RATE_HALFLIFE = 30.0  # seconds; memory of the per-channel message-rate estimate
+
+# Lean gateway (ELIHAUS_LEAN=1): only the guilds + guild_messages intents (no members/message_content),
+# no member chunking at startup, a small message cache. Everything is slash commands/components, so
+# no message text is read; mentions fall back to <@id> and members are remembered from interactions.
+LEAN_GATEWAY = os.getenv("ELIHAUS_LEAN", "0") == "1"
+MESSAGE_CACHE_SIZE = int(os.getenv("ELIHAUS_MESSAGE_CACHE", "100" if LEAN_GATEWAY else "1000"))
+MEMBER_CACHE_SIZE = int(os.getenv("ELIHAUS_MEMBER_CACHE", "5000"))
+
+if LEAN_GATEWAY:
+    INTENTS = discord.Intents.none()
+    INTENTS.guilds = True          # channels/roles/categories
+    INTENTS.guild_messages = True  # on_message drives the sticky round panel
+else:
+    INTENTS = discord.Intents.default()
+    INTENTS.message_content = True
+    INTENTS.members = True
+
+class MemberCache:
+    """Bounded LRU of guild members. Fed from interactions (their payload carries the member's roles
+    and permissions), so admin checks and mentions work without the members intent; the gateway
+    cache is still consulted first when it exists."""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._members: OrderedDict[tuple[int, int], discord.Member] = OrderedDict()
+
+    def put(self, member):
+        if isinstance(member, discord.Member) and self._size > 0:
+            key = (member.guild.id, member.id)
+            self._members[key] = member
+            self._members.move_to_end(key)
+            if len(self._members) > self._size:
+                self._members.popitem(last=False)
+
+    def get(self, guild: discord.Guild | None, uid: int) -> discord.Member | None:
+        if guild is None:
+            return None
+        m = guild.get_member(uid)
+        if m is None:
+            m = self._members.get((guild.id, uid))
+            if m is not None:
+                self._members.move_to_end((guild.id, uid))
+        return m
+
+MEMBERS = MemberCache(MEMBER_CACHE_SIZE)
+
+# Admin-toggled sampling profiler (/eh_profile): the interaction_check hooks below register each
+# command/button/modal task with it (_observe); while it's off that's a single flag check
+PROFILER = TaskProfiler()
+PROFILE_THRESHOLD_MS = 250
+PROFILE_INTERVAL_MS = 5
+
+# Opt-in interaction trace (/eh_trace, or ELIHAUS_TRACE=path at startup) for elihaus_replay.py
+TRACE_PATH = os.getenv("ELIHAUS_TRACE", "")
+TRACE_DEFAULT_PATH = "elihaus_trace.jsonl"
+_TRACE_WORDS = {"all", "on", "off", "status", "dump", "reset", "balance", "roulette_week", "roulette_all",
+                *FORMATS, *GAMES, *EXPORT_TABLES}
+
+def _trace_keep(text: str) -> bool:
+    """Free text that is safe to keep in a trace: numbers, dates, bet choices, option keywords."""
+    t = text.lower()
+    if not t or t.replace("_", "").replace(",", "").isdigit() or re.fullmatch(r"\d{4}-\d{2}-\d{2}", t):
+        return True
+    return ROULETTE_RULES.parse_choice(t) is not None or all(w.strip() in _TRACE_WORDS for w in t.split(","))
+
+TRACE = TraceRecorder(_trace_keep)
+
+def _trace_value(key: str, value):
+    if key == "rid":
+        return "$round"  # replays bet on whatever round is open in the channel
+    if isinstance(value, str) and value.isdigit() and len(value) > 15:
+        value = int(value)  # a snowflake kept as text (uid strings)
+    if isinstance(value, int) and not isinstance(value, bool) and value > 2**32:
+        return {"$id": TRACE.anon(value)}  # a snowflake
+    return TRACE.scrub(value)
+
+def _trace_event(interaction: discord.Interaction, kind: str, name: str, owner=None, item: str | None = None) -> dict:
+    event = {"kind": kind, "name": name, "guild": TRACE.anon(interaction.guild_id),
+             "channel": TRACE.anon(interaction.channel_id), "user": TRACE.anon(interaction.user.id),
+             "admin": user_is_admin(interaction.user) if interaction.guild else False}
+    if item:
+        event["item"] = item
+    if kind == "command":
+        opts = {}
+        for o in (interaction.data or {}).get("options", []):
+            v = o.get("value")
+            opts[o["name"]] = {"$id": TRACE.anon(v)} if o.get("type") in (6, 7, 8, 9) else _trace_value(o["name"], v)
+        event["options"] = opts
+    if owner is not None:
+        attrs = {k: v for k, v in vars(owner).items() if not k.startswith("_") and k not in ("id", "custom_id")}
+        event["state"] = {k: _trace_value(k, v) for k, v in attrs.items()
+                          if v is None or isinstance(v, (int, float, str))}
+        inputs = {k: v.value for k, v in attrs.items() if isinstance(v, discord.ui.TextInput)}
+        if inputs:
+            event["inputs"] = {k: TRACE.scrub(v) for k, v in inputs.items()}
+    return event
+
+def _observe(interaction: discord.Interaction, kind: str, owner=None):
+    """Profiler/trace hook, called from every interaction_check; a no-op unless one of them is on."""
+    if not (PROFILER.enabled or TRACE.enabled):
+        return
+    item = None
+    if kind == "command":
+        name = (interaction.data or {}).get("name", "?")
+        label = f"/{name}"
+    elif kind == "component":
+        cid = (interaction.data or {}).get("custom_id")
+        found = next((i for i in owner.children if getattr(i, "custom_id", None) == cid), None)
+        name, item = type(owner).__name__, getattr(found, "label", None) or cid
+        label = f"{name}[{item}]"
+    else:
+        name = type(owner).__name__
+        label = f"{name}.on_submit"
+    if PROFILER.enabled:
+        PROFILER.track(label)
+    task = asyncio.current_task()
+    if TRACE.enabled and task is not None:
+        event, started = _trace_event(interaction, kind, name, owner, item), TRACE.begin()
+        task.add_done_callback(lambda _t: TRACE.finish(started, event))
+
+class ShardedTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        use_guild(interaction.guild_id)  # slash commands talk to their guild's DB shard
+        MEMBERS.put(interaction.user)
+        _observe(interaction, "command")
+        return True
 
-bot = commands.Bot(command_prefix="!", intents=INTENTS)
+bot = commands.Bot(command_prefix="!", intents=INTENTS, tree_cls=ShardedTree,
+                   chunk_guilds_at_startup=not LEAN_GATEWAY, max_messages=MESSAGE_CACHE_SIZE or None,
+                   member_cache_flags=discord.MemberCacheFlags.from_intents(INTENTS))
 
 # Admin role (optional): users with Manage Server or this role ID are treated as admins
 ADMIN_ROLE_ID = int(os.getenv("ADMIN_ROLE_ID", "0"))
 
 # Economy
 DAILY_AMOUNT = 1_800
+DAILY_COOLDOWN = 24 * 3600  # seconds
 WEEKLY_AMOUNT = 6_000
 STARTER_AMOUNT = 5_000
 
 # Lotto
 TICKET_COST = 10_000
-LOTTO_WINNERS = 1
+LOTTO_WINNERS = int(os.getenv("LOTTO_WINNERS", "1"))  # default for the weekly draw; /eh_drawlotto can override
+LOTTO_MAX_WINNERS = 25
 LOTTO_WL_COUNT = 10
+LOTTO_CHANNEL_ID = int(os.getenv("LOTTO_CHANNEL_ID", "0"))  # set to auto-draw + announce here every Saturday
 SHOP_NAME = "Shop YaEli"
 # Keep SHOP_YAELI_URL defined first
 SHOP_YAELI_URL = os.getenv(
@@ -67,120 +211,498 @@ POLICY_TEXT = os.getenv("ELIHAUS_POLICY", DEFAULT_POLICY_TEXT)
 
 # Roulette (admin-led)
 ROUND_SECONDS_DEFAULT = 120
-PAYOUT_RED_BLACK = 2.0
-PAYOUT_GREEN = 14.0
+ROULETTE_RULES = RouletteRules()  # bet types + payouts live in elihaus_games so the simulator uses the same ones
+PAYOUT_RED_BLACK = ROULETTE_RULES.payout_red_black
+PAYOUT_GREEN = ROULETTE_RULES.payout_green
 MAX_STAKE = 50_000
 ONE_BET_PER_ROUND = True
 
+# Scheduled jobs (durable queue in the `jobs` table)
+JOB_POLL_SECONDS = int(os.getenv("JOB_POLL_SECONDS", "30"))
+JOB_LEASE_SECONDS = 300        # a crashed run becomes claimable again after this
+JOB_MAX_ATTEMPTS = 5
+JOB_RETENTION_DAYS = 14        # finished jobs are pruned by the daily cleanup
+JOB_RESCHEDULE_SECONDS = 3600  # how often every shard's recurring jobs are re-queued (idempotent)
+
+# Outbox (Discord side effects of DB changes, drained by a worker)
+OUTBOX_CONCURRENCY = 4
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_REPLY_WAIT = 10  # seconds an interaction waits for its ticket before replying "queued"
+
+# WL fulfilment (/eh_fulfil_batch leases queue items to one admin at a time)
+FULFIL_LEASE_SECONDS = 1800
+FULFIL_BATCH_MAX = 25
+FULFIL_PAGE_SIZE = 5
+
 # Tickets category for WL claims
 TICKETS_CATEGORY_ID = int(os.getenv("TICKETS_CATEGORY_ID", "0"))
 TICKETS_CATEGORY_NAME = os.getenv("TICKETS_CATEGORY_NAME", "🎟️ wl-claims")
 TICKETS_STAFF_ROLE_ID = int(os.getenv("TICKETS_STAFF_ROLE_ID", "0"))
+TICKET_POOL_SIZE = int(os.getenv("TICKET_POOL_SIZE", "3"))  # hidden spare ticket channels kept per guild (0 = off)
 
 # ---------------- DB ----------------
-DB_PATH = os.getenv("ELIHAUS_DB", "elihause.db")
-
-def db():
-    return sqlite3.connect(DB_PATH, isolation_level=None)
-
-def init_db():
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("""CREATE TABLE IF NOT EXISTS users(
-            id INTEGER PRIMARY KEY,
-            discord_id TEXT UNIQUE,
-            balance INTEGER DEFAULT 0,
-            last_daily TEXT,
-            last_weekly TEXT,
-            joined_at TEXT,
-            tutorial_done INTEGER DEFAULT 0
-        )""")
-        c.execute("""CREATE TABLE IF NOT EXISTS tx(
-            id INTEGER PRIMARY KEY,
-            discord_id TEXT,
-            kind TEXT,
-            amount INTEGER,
-            meta TEXT,
-            ts TEXT
-        )""")
-        c.execute("""CREATE TABLE IF NOT EXISTS state(
-            key TEXT PRIMARY KEY,
-            val TEXT
-        )""")
-        c.execute("""CREATE TABLE IF NOT EXISTS rounds(
-            rid TEXT PRIMARY KEY,
-            channel_id TEXT,
-            status TEXT,       -- OPEN|RESOLVED|CANCELLED
-            opened_by TEXT,
-            opened_at TEXT,
-            expires_at TEXT,
-            outcome TEXT,
-            seed TEXT,
-            resolved_at TEXT,
-            message_id TEXT
-        )""")
-        c.execute("""CREATE TABLE IF NOT EXISTS bets(
-            id INTEGER PRIMARY KEY,
-            rid TEXT,
-            channel_id TEXT,
-            discord_id TEXT,
-            choice TEXT,
-            stake INTEGER,
-            ts TEXT
-        )""")
-        c.execute("""CREATE TABLE IF NOT EXISTS tickets(
-            id INTEGER PRIMARY KEY,
-            week_id TEXT,
-            discord_id TEXT,
-            ts TEXT
-        )""")
-        c.execute("""CREATE TABLE IF NOT EXISTS lotto_draws(
-            id INTEGER PRIMARY KEY,
-            week_id TEXT,
-            run_at TEXT,
-            winner_id TEXT,
-            seed TEXT,
-            status TEXT
-        )""")
-        c.execute("""CREATE TABLE IF NOT EXISTS prizes(
-            id INTEGER PRIMARY KEY,
-            winner_id TEXT,
-            kind TEXT,
-            amount INTEGER,
-            meta TEXT,
-            status TEXT,
-            created_ts TEXT,
-            updated_ts TEXT
-        )""")
-        c.execute("""CREATE TABLE IF NOT EXISTS prize_queue(
-            id INTEGER PRIMARY KEY,
-            prize_id INTEGER,
-            winner_id TEXT,
-            imvu_name TEXT,
-            imvu_profile TEXT,
-            note TEXT,
-            status TEXT,         -- 'waiting_claim','ready','fulfilled','failed'
-            created_ts TEXT,
-            updated_ts TEXT
-        )""")
-        c.execute("""CREATE TABLE IF NOT EXISTS withdraw_requests(
-            id INTEGER PRIMARY KEY,
-            discord_id TEXT,
-            coins INTEGER,
-            gifts INTEGER,
-            imvu_name TEXT,
-            imvu_profile TEXT,  -- wishlist or profile URL
-            note TEXT,
-            status TEXT,        -- 'pending','approved','rejected'
-            ticket_channel_id TEXT,
-            message_id TEXT,    -- review message id inside ticket
-            reviewer_id TEXT,   -- admin who approved/rejected
-            review_note TEXT,
-            created_ts TEXT,
-            updated_ts TEXT
+# One SQLite file per guild (wallets, rounds, lotto, jobs and outbox are all per guild),
+# so a long write in one server never holds the lock another server is waiting on.
+# db() routes to the shard of the guild in CURRENT_GUILD; connections are opened on first
+# use and the least recently used ones are closed once more than DB_MAX_OPEN are open.
+DB_DIR = os.getenv("ELIHAUS_DB_DIR", "elihaus_db")
+DB_MAX_OPEN = int(os.getenv("ELIHAUS_DB_MAX_OPEN", "32"))
+DB_PATH = os.getenv("ELIHAUS_DB", "elihause.db")  # pre-sharding single DB, split by migrate_legacy_db()
+HOME_GUILD_ID = int(os.getenv("ELIHAUS_HOME_GUILD_ID", "0"))  # guild that inherits the legacy wallets
+# Legacy split, players who played in several guilds: "home" keeps their wallet in the home guild,
+# "most_active" moves it to the guild they played in most. Unset = don't split until one is chosen.
+MULTI_GUILD_WALLETS = os.getenv("ELIHAUS_MULTI_GUILD_WALLETS", "").strip().lower()
+
+CURRENT_GUILD: ContextVar[int] = ContextVar("CURRENT_GUILD", default=0)  # 0 = DMs / no guild
+SHARD_SCHEMA: list = []  # fn(cursor) run on every shard when it is opened
+_SHARDS: "OrderedDict[int, sqlite3.Connection]" = OrderedDict()
+
+class _ShardConnection(sqlite3.Connection):
+    # Connections are cached and autocommit, so `with db() as conn:` must neither commit
+    # (it could end a db_tx that is open on the same connection) nor close.
+    def __exit__(self, *exc):
+        return False
+
+def shard_schema(fn):
+    SHARD_SCHEMA.append(fn)
+    return fn
+
+def shard_path(guild_id: int) -> str:
+    return os.path.join(DB_DIR, f"guild_{guild_id}.db")
+
+def shard_ids() -> list[int]:
+    """Guilds that have (or should have) a shard: every joined guild plus any file on disk."""
+    ids = {g.id for g in bot.guilds}
+    if os.path.isdir(DB_DIR):
+        for name in os.listdir(DB_DIR):
+            if name.startswith("guild_") and name.endswith(".db"):
+                try:
+                    ids.add(int(name[6:-3]))
+                except ValueError:
+                    pass
+    return sorted(ids)
+
+def use_guild(guild_id: int | None):
+    """Route this task's DB calls (interaction/event handlers run in their own task)."""
+    CURRENT_GUILD.set(int(guild_id or 0))
+
+@contextmanager
+def guild_scope(guild_id: int | None):
+    """Temporarily route to another guild's shard (background workers)."""
+    token = CURRENT_GUILD.set(int(guild_id or 0))
+    try:
+        yield
+    finally:
+        CURRENT_GUILD.reset(token)
+
+def _open_shard(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, isolation_level=None, factory=_ShardConnection)
+    conn.execute("PRAGMA journal_mode=WAL")  # readers don't wait on the writer
+    conn.execute("PRAGMA busy_timeout=5000")
+    c = conn.cursor()
+    for fn in SHARD_SCHEMA:
+        fn(c)
+    return conn
+
+def db(guild_id: int | None = None) -> sqlite3.Connection:
+    gid = CURRENT_GUILD.get() if guild_id is None else int(guild_id)
+    conn = _SHARDS.get(gid)
+    if conn is not None:
+        _SHARDS.move_to_end(gid)
+        return conn
+    os.makedirs(DB_DIR, exist_ok=True)
+    conn = _SHARDS[gid] = _open_shard(shard_path(gid))
+    while len(_SHARDS) > DB_MAX_OPEN:
+        old_gid, old = next(iter(_SHARDS.items()))
+        if old.in_transaction:
+            break  # someone is mid-transaction on it; evict on a later open
+        del _SHARDS[old_gid]
+        old.close()
+    return conn
+
+def close_shard(guild_id: int):
+    conn = _SHARDS.pop(guild_id, None)
+    if conn is not None:
+        conn.close()
+
+@contextmanager
+def db_tx():
+    """One write transaction (connections are autocommit, so grouping needs an explicit BEGIN).
+    Nested use joins the outer transaction, since the shard connection is shared."""
+    conn = db()
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+@shard_schema
+def init_db(c: sqlite3.Cursor):
+    c.execute("""CREATE TABLE IF NOT EXISTS users(
+        id INTEGER PRIMARY KEY,
+        discord_id TEXT UNIQUE,
+        balance INTEGER DEFAULT 0,
+        last_daily TEXT,         -- ISO; superseded by daily_ts/weekly_ts, no longer written
+        last_weekly TEXT,
+        joined_at TEXT,
+        tutorial_done INTEGER DEFAULT 0
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS tx(
+        id INTEGER PRIMARY KEY,
+        discord_id TEXT,
+        kind TEXT,
+        amount INTEGER,
+        meta TEXT,
+        ts TEXT
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS state(
+        key TEXT PRIMARY KEY,
+        val TEXT,
+        expires_ts INTEGER  -- unix seconds; NULL = keep, otherwise GC'd by the cleanup job
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS rounds(
+        rid TEXT PRIMARY KEY,
+        channel_id TEXT,
+        status TEXT,       -- OPEN|RESOLVED|CANCELLED
+        opened_by TEXT,
+        opened_at TEXT,
+        expires_at TEXT,
+        outcome TEXT,      -- red|black|green
+        seed TEXT,
+        resolved_at TEXT,
+        message_id TEXT,
+        label TEXT         -- per-channel display label, e.g. "#12"
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS round_counters(
+        channel_id TEXT PRIMARY KEY,
+        last_no INTEGER
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS bets(
+        id INTEGER PRIMARY KEY,
+        rid TEXT,
+        channel_id TEXT,
+        discord_id TEXT,
+        choice TEXT,
+        stake INTEGER,
+        ts TEXT
+    )""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_bets_rid_ts ON bets(rid, ts)")
+    if ONE_BET_PER_ROUND:
+        # the DB itself refuses a second bet, so two racing clicks can't both land
+        try:
+            c.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_bets_rid_user ON bets(rid, discord_id)")
+        except sqlite3.IntegrityError:
+            print("[db] bets has duplicate (round, user) rows from before the one-bet index; "
+                  "falling back to the in-transaction check")
+    else:
+        c.execute("DROP INDEX IF EXISTS uq_bets_rid_user")
+    c.execute("""CREATE TABLE IF NOT EXISTS tickets(
+        id INTEGER PRIMARY KEY,
+        week_id TEXT,
+        discord_id TEXT,
+        ts TEXT
+    )""")
+    # covers the draw's per-holder counts and ticket_counts without touching the table
+    c.execute("CREATE INDEX IF NOT EXISTS idx_tickets_week_holder ON tickets(week_id, id, discord_id)")
+    c.execute("DROP INDEX IF EXISTS idx_tickets_week")
+    c.execute("""CREATE TABLE IF NOT EXISTS lotto_draws(
+        id INTEGER PRIMARY KEY,
+        week_id TEXT,
+        run_at TEXT,
+        winner_id TEXT,
+        seed TEXT,
+        status TEXT,
+        ticket_count INTEGER, -- tickets in the draw (the first N by id for that week)
+        winner_ids TEXT       -- JSON list in draw order (winner_id is the first); NULL = single-pick draw
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS prizes(
+        id INTEGER PRIMARY KEY,
+        winner_id TEXT,
+        kind TEXT,
+        amount INTEGER,
+        meta TEXT,
+        status TEXT,
+        created_ts TEXT,
+        updated_ts TEXT,
+        message_id TEXT,         -- public claim-button message
+        ticket_channel_id TEXT   -- claim ticket opened by the winner
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS prize_queue(
+        id INTEGER PRIMARY KEY,
+        prize_id INTEGER,
+        winner_id TEXT,
+        imvu_name TEXT,
+        imvu_profile TEXT,
+        note TEXT,
+        status TEXT,         -- 'waiting_claim','ready','fulfilled','failed'
+        created_ts TEXT,
+        updated_ts TEXT,
+        leased_by TEXT,      -- admin working this item (/eh_fulfil_*), until lease_until
+        lease_until INTEGER  -- unix seconds
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS withdraw_requests(
+        id INTEGER PRIMARY KEY,
+        discord_id TEXT,
+        coins INTEGER,
+        gifts INTEGER,
+        imvu_name TEXT,
+        imvu_profile TEXT,  -- wishlist or profile URL
+        note TEXT,
+        status TEXT,        -- 'pending','approved','rejected'
+        ticket_channel_id TEXT,
+        message_id TEXT,    -- review message id inside ticket
+        reviewer_id TEXT,   -- admin who approved/rejected
+        review_note TEXT,
+        created_ts TEXT,
+        updated_ts TEXT
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS jobs(
+        id INTEGER PRIMARY KEY,
+        kind TEXT,
+        payload TEXT,
+        dedupe_key TEXT UNIQUE,  -- one row per logical job, so re-enqueueing is a no-op
+        due_ts INTEGER,          -- unix seconds
+        status TEXT,             -- 'pending','done','failed'
+        attempts INTEGER DEFAULT 0,
+        lease_until INTEGER,     -- unix seconds; set while a worker runs it
+        last_error TEXT,
+        created_ts TEXT,
+        updated_ts TEXT
+    )""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_due ON jobs(status, due_ts)")
+    c.execute("""CREATE TABLE IF NOT EXISTS outbox(
+        id INTEGER PRIMARY KEY,
+        kind TEXT,               -- 'claim_ticket','withdraw_ticket','deposit_ticket'
+        idem_key TEXT UNIQUE,    -- one side-effect run per DB change
+        payload TEXT,
+        progress TEXT,           -- JSON of finished steps, so a retry resumes instead of repeating
+        status TEXT,             -- 'pending','done','failed'
+        attempts INTEGER DEFAULT 0,
+        next_ts INTEGER,         -- unix seconds
+        lease_until INTEGER,
+        last_error TEXT,
+        created_ts TEXT,
+        updated_ts TEXT
+    )""")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status_next ON outbox(status, next_ts)")
+    c.execute("""CREATE TABLE IF NOT EXISTS ledger_sums(
+        discord_id TEXT PRIMARY KEY,
+        total INTEGER NOT NULL   -- SUM(tx.amount) up to the recon:last_tx_id checkpoint
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS ledger_drift(
+        discord_id TEXT PRIMARY KEY,
+        balance INTEGER,         -- users.balance when last checked
+        ledger_total INTEGER,    -- what the ledger says it should be
+        detected_ts TEXT,        -- first run that saw this drift
+        checked_ts TEXT          -- last run that still saw it
+    )""")
+
+    # columns added after first release
+    _add_column(c, "state", "expires_ts", "INTEGER")
+    _add_column(c, "rounds", "label", "TEXT")
+    _add_column(c, "prizes", "message_id", "TEXT")
+    _add_column(c, "prizes", "ticket_channel_id", "TEXT")
+    _add_column(c, "lotto_draws", "ticket_count", "INTEGER")
+    _add_column(c, "lotto_draws", "winner_ids", "TEXT")
+    _add_column(c, "prize_queue", "leased_by", "TEXT")
+    _add_column(c, "prize_queue", "lease_until", "INTEGER")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_prize_queue_status_created ON prize_queue(status, created_ts, id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_withdraw_status_created ON withdraw_requests(status, created_ts, id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_users_balance ON users(balance, discord_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_tx_user_id ON tx(discord_id, id)")
+    _init_roulette_net(c)
+    _add_column(c, "rounds", "pocket", "INTEGER")  # 0-36; NULL on rounds settled before bet types
+    for period in ("daily", "weekly"):  # unix seconds of the last claim; carried over from the ISO columns
+        if _add_column(c, "users", f"{period}_ts", "INTEGER"):
+            c.execute(f"""UPDATE users SET {period}_ts=CAST(strftime('%s', last_{period}) AS INTEGER)
+                          WHERE last_{period} IS NOT NULL""")
+    _migrate_round_prize_state(c)
+
+def _init_roulette_net(c: sqlite3.Cursor):
+    """Roulette leaderboard storage. All-time nets are a running total per player, kept by a trigger
+    on every bet/payout ledger row (whichever code path writes it), so pages and ranks are ranges of
+    idx_roulette_net instead of a SUM over tx; the weekly board sums only its window, through a
+    covering partial index on tx."""
+    c.execute("SELECT 1 FROM sqlite_master WHERE type='trigger' AND name='tx_roulette_net'")
+    if c.fetchone() is None:
+        # table, backfill from the existing ledger and trigger together, so no bet lands in between
+        c.execute("BEGIN IMMEDIATE")
+        c.execute("""CREATE TABLE IF NOT EXISTS roulette_net(
+            discord_id TEXT PRIMARY KEY,
+            net INTEGER NOT NULL     -- SUM(tx.amount) over kinds bet/payout
         )""")
-
-init_db()
+        c.execute("DELETE FROM roulette_net")
+        c.execute("""INSERT INTO roulette_net(discord_id, net)
+                     SELECT discord_id, SUM(amount) FROM tx WHERE kind IN ('bet','payout') GROUP BY discord_id""")
+        c.execute("""CREATE TRIGGER tx_roulette_net AFTER INSERT ON tx
+                     WHEN NEW.kind IN ('bet','payout') BEGIN
+                         INSERT INTO roulette_net(discord_id, net) VALUES(NEW.discord_id, NEW.amount)
+                         ON CONFLICT(discord_id) DO UPDATE SET net=net+excluded.net;
+                     END""")
+        c.execute("COMMIT")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_roulette_net ON roulette_net(net, discord_id)")
+    c.execute("""CREATE INDEX IF NOT EXISTS idx_tx_game_ts ON tx(ts, kind, discord_id, amount)
+                 WHERE kind IN ('bet','payout')""")
+
+def _add_column(c: sqlite3.Cursor, table: str, column: str, decl: str) -> bool:
+    """True if the column was missing (and is now added)."""
+    c.execute(f"PRAGMA table_info({table})")
+    if column in {r[1] for r in c.fetchall()}:
+        return False
+    c.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+    return True
+
+def _migrate_round_prize_state(c: sqlite3.Cursor):
+    """One-off: move round labels/counters and prize pointers out of the generic state KV."""
+    c.execute("""SELECT key, val FROM state
+                 WHERE key GLOB 'rlabel:*' OR key GLOB 'rcount:*'
+                    OR key GLOB 'prize_msg:*' OR key GLOB 'prize_ticket:*'""")
+    rows = c.fetchall()
+    if not rows:
+        return
+    c.execute("BEGIN")
+    for key, val in rows:
+        prefix, _, ident = key.partition(":")
+        if prefix == "rlabel":
+            c.execute("UPDATE rounds SET label=? WHERE rid=? AND label IS NULL", (val, ident))
+        elif prefix == "rcount":
+            c.execute("""INSERT INTO round_counters(channel_id,last_no) VALUES(?,?)
+                         ON CONFLICT(channel_id) DO UPDATE SET last_no=MAX(last_no, excluded.last_no)""",
+                      (ident, int(val or 0)))
+        elif prefix == "prize_msg":
+            c.execute("UPDATE prizes SET message_id=? WHERE id=?", (val, int(ident)))
+        elif prefix == "prize_ticket":
+            c.execute("UPDATE prizes SET ticket_channel_id=? WHERE id=?", (val, int(ident)))
+        c.execute("DELETE FROM state WHERE key=?", (key,))
+    c.execute("COMMIT")
+
+# Rows that belong to a channel; they follow the channel's guild when the legacy DB is split.
+_CHANNEL_TABLES = ("rounds", "bets", "round_counters", "slots_pots", "slots_spins")
+
+def _legacy_wallet_guilds(c: sqlite3.Cursor, channel_guilds: dict[str, int], home: int) -> tuple[dict[str, int], int]:
+    """Where each legacy wallet should live: the guild whose channels the player bet/spun in.
+    Open prizes and pending withdrawals are handled in the home guild, so they count as home
+    activity. Returns ({uid: guild} for wallets leaving home, players active in several guilds);
+    those follow MULTI_GUILD_WALLETS."""
+    activity: dict[str, Counter] = {}
+    c.execute("""SELECT discord_id, channel_id, COUNT(*) FROM bets GROUP BY 1, 2
+                 UNION ALL SELECT discord_id, channel_id, COUNT(*) FROM slots_spins GROUP BY 1, 2
+                 UNION ALL SELECT discord_id, NULL, 1 FROM withdraw_requests WHERE status='pending'
+                 UNION ALL SELECT winner_id, NULL, 1 FROM prizes WHERE status!='fulfilled'""")
+    for uid, ch, n in c.fetchall():
+        activity.setdefault(uid, Counter())[channel_guilds.get(str(ch), home)] += n
+    placed, multi = {}, 0
+    for uid, per_guild in activity.items():
+        if len(per_guild) > 1:
+            multi += 1
+            gid = home
+            if MULTI_GUILD_WALLETS == "most_active":  # ties stay home
+                gid = max(per_guild, key=lambda g: (per_guild[g], g == home))
+        else:
+            gid = next(iter(per_guild))
+        if gid != home:
+            placed[uid] = gid
+    return placed, multi
+
+def migrate_legacy_db():
+    """One-off split of the pre-sharding DB_PATH. The whole file becomes the home guild's shard
+    (lotto, prizes and withdrawals were global, so they stay with one guild), then rounds/bets/slots
+    rows move to the shard of whichever guild owns their channel, and each player's wallet and
+    full ledger move (never copy: coins must not be minted) to the guild they played in. A player
+    active in several guilds has one wallet, so the split waits for MULTI_GUILD_WALLETS to say
+    where those go."""
+    if not os.path.exists(DB_PATH):
+        return
+    home = HOME_GUILD_ID or GUILD_ID or (bot.guilds[0].id if len(bot.guilds) == 1 else 0)
+    if not home:
+        print(f"[EliHaus] {DB_PATH} not split: set ELIHAUS_HOME_GUILD_ID to the guild that keeps its wallets")
+        return
+    if os.path.exists(shard_path(home)):
+        print(f"[EliHaus] {DB_PATH} not split: {shard_path(home)} already exists")
+        return
+    if MULTI_GUILD_WALLETS not in ("", "home", "most_active"):
+        print(f"[EliHaus] {DB_PATH} not split: ELIHAUS_MULTI_GUILD_WALLETS must be home or most_active")
+        return
+    channel_guilds = {str(ch.id): g.id for g in bot.guilds if g.id != home for ch in g.channels}
+    os.makedirs(DB_DIR, exist_ok=True)
+    tmp = shard_path(home) + ".tmp"
+    src = sqlite3.connect(DB_PATH, isolation_level=None)
+    try:
+        for fn in SHARD_SCHEMA:  # bring the old file up to the current schema first
+            fn(src.cursor())
+        wallet_moves, multi = _legacy_wallet_guilds(src.cursor(), channel_guilds, home)
+        if multi and not MULTI_GUILD_WALLETS:
+            print(f"[EliHaus] {DB_PATH} not split: {multi} player(s) played in more than one guild but have "
+                  f"one wallet. Set ELIHAUS_MULTI_GUILD_WALLETS=home (keep theirs in guild {home}) or "
+                  f"most_active (move each to the guild they played in most) and restart.")
+            return
+        dst = sqlite3.connect(tmp)
+        src.backup(dst)
+        dst.close()
+    finally:
+        src.close()
+    os.replace(tmp, shard_path(home))
+    os.replace(DB_PATH, DB_PATH + ".pre-shard")
+
+    conn = db(home)
+    c = conn.cursor()
+    c.execute(" UNION ".join(f"SELECT channel_id FROM {t}" for t in _CHANNEL_TABLES))
+    moves: dict[int, list[str]] = {}
+    for (ch,) in c.fetchall():
+        if ch in channel_guilds:
+            moves.setdefault(channel_guilds[ch], []).append(ch)
+    wallets: dict[int, list[str]] = {}
+    for uid, gid in wallet_moves.items():
+        wallets.setdefault(gid, []).append(uid)
+        moves.setdefault(gid, [])
+    c.execute("CREATE TEMP TABLE moving_users(discord_id TEXT PRIMARY KEY)")
+    for gid, chans in moves.items():
+        db(gid)  # creates the target shard with the current schema
+        marks = ",".join("?" * len(chans))
+        c.execute("ATTACH DATABASE ? AS dst", (shard_path(gid),))
+        try:
+            with guild_scope(home), db_tx():
+                # wallets + their whole ledger, so balance == SUM(tx) holds in both shards
+                c.execute("DELETE FROM temp.moving_users")
+                c.executemany("INSERT INTO temp.moving_users VALUES(?)", [(u,) for u in wallets.get(gid, [])])
+                moving = "discord_id IN (SELECT discord_id FROM temp.moving_users)"
+                c.execute("PRAGMA main.table_info(users)")
+                cols = ",".join(r[1] for r in c.fetchall() if r[1] != "id")
+                c.execute(f"""INSERT INTO dst.users({cols}) SELECT {cols} FROM main.users WHERE {moving}
+                              ON CONFLICT(discord_id) DO UPDATE SET balance=balance+excluded.balance""")
+                c.execute(f"""INSERT INTO dst.tx(discord_id,kind,amount,meta,ts)
+                              SELECT discord_id,kind,amount,meta,ts FROM main.tx WHERE {moving} ORDER BY id""")
+                for table in ("users", "tx", "ledger_sums", "ledger_drift", "roulette_net"):
+                    c.execute(f"DELETE FROM main.{table} WHERE {moving}")
+                for table in _CHANNEL_TABLES:
+                    c.execute(f"PRAGMA main.table_info({table})")
+                    cols = ",".join(r[1] for r in c.fetchall() if r[1] != "id")
+                    c.execute(f"""INSERT OR REPLACE INTO dst.{table}({cols})
+                                  SELECT {cols} FROM main.{table} WHERE channel_id IN ({marks})""", chans)
+                    c.execute(f"DELETE FROM main.{table} WHERE channel_id IN ({marks})", chans)
+                # open rounds keep their expiry job and channel lock
+                cond = f"kind='round_expire' AND CAST(json_extract(payload,'$.channel_id') AS TEXT) IN ({marks})"
+                c.execute(f"""INSERT OR IGNORE INTO dst.jobs(kind,payload,dedupe_key,due_ts,status,attempts,
+                                                             lease_until,last_error,created_ts,updated_ts)
+                              SELECT kind,payload,dedupe_key,due_ts,status,attempts,lease_until,last_error,created_ts,updated_ts
+                              FROM main.jobs WHERE {cond}""", chans)
+                c.execute(f"DELETE FROM main.jobs WHERE {cond}", chans)
+                keys = [round_key(ch) for ch in chans]
+                c.execute(f"INSERT OR REPLACE INTO dst.state SELECT * FROM main.state WHERE key IN ({marks})", keys)
+                c.execute(f"DELETE FROM main.state WHERE key IN ({marks})", keys)
+        finally:
+            c.execute("DETACH DATABASE dst")
+    c.execute("DROP TABLE temp.moving_users")
+    print(f"[EliHaus] Split {DB_PATH} into {1 + len(moves)} guild shard(s); home guild {home}; "
+          f"{len(wallet_moves)} wallet(s) moved to the guild they play in"
+          + (f", {multi} multi-guild wallet(s) placed by {MULTI_GUILD_WALLETS}" if multi else ""))
+
+STORE = SQLiteStore(db, lambda: iso(now_local()))  # repository for the simple reads/writes
 
 # ---------------- Time / State helpers ----------------
 def now_local():
@@ -189,22 +711,36 @@ def now_local():
 def iso(dt: datetime) -> str:
     return dt.astimezone(TZ).isoformat()
 
-def set_state(key: str, val: str | None):
+def set_state(key: str, val: str | None, ttl: int | None = None):
+    """`ttl` (seconds) lets the cleanup job drop keys nobody clears explicitly."""
     with db() as conn:
         c = conn.cursor()
         if val is None:
             c.execute("DELETE FROM state WHERE key=?", (key,))
         else:
-            c.execute("""INSERT INTO state(key,val) VALUES(?,?)
-                         ON CONFLICT(key) DO UPDATE SET val=excluded.val""", (key, val))
+            exp_ts = int(time.time()) + ttl if ttl else None
+            c.execute("""INSERT INTO state(key,val,expires_ts) VALUES(?,?,?)
+                         ON CONFLICT(key) DO UPDATE SET val=excluded.val, expires_ts=excluded.expires_ts""",
+                      (key, val, exp_ts))
 
 def get_state(key: str) -> str | None:
     with db() as conn:
         c = conn.cursor()
-        c.execute("SELECT val FROM state WHERE key=?", (key,))
+        c.execute("SELECT val FROM state WHERE key=? AND (expires_ts IS NULL OR expires_ts>?)",
+                  (key, int(time.time())))
         r = c.fetchone()
         return r[0] if r else None
 
+def clear_state(key: str, val: str):
+    """Drop `key` only while it still holds `val` (a newer value was set by someone else)."""
+    with db() as conn:
+        conn.execute("DELETE FROM state WHERE key=? AND val=?", (key, val))
+
+def gc_state() -> int:
+    with db() as conn:
+        return conn.execute("DELETE FROM state WHERE expires_ts IS NOT NULL AND expires_ts<=?",
+                            (int(time.time()),)).rowcount
+
 def round_key(channel_id: int) -> str:
     return f"round:{channel_id}"
 
@@ -268,6 +804,7 @@ def _result_emoji(outcome: str) -> str:
 def build_roulette_result_embed(
     rlabel: str,
     outcome: str,
+    pocket: int,
     total_bets: int,
     total_pool: int,
     winners_mentions: list[str],
@@ -275,7 +812,7 @@ def build_roulette_result_embed(
 ) -> discord.Embed:
     e = discord.Embed(
         title=f"🎰 EliHaus Roulette — Round {rlabel}",
-        description=f"**RESULT:** {_result_emoji(outcome)} **{outcome.upper()}**",
+        description=f"**RESULT:** {_result_emoji(outcome)} **{pocket} {outcome.upper()}**",
         color=_result_color(outcome),
         timestamp=now_local(),
     )
@@ -301,70 +838,212 @@ def user_is_admin(member: discord.Member) -> bool:
     return False
 
 # ---------------- Tickets category helper ----------------
+TICKETS_CATEGORY_CACHE: dict[int, int] = {}  # guild_id -> category id (skips the categories scan)
+
 async def _get_or_create_tickets_category(guild: discord.Guild) -> discord.CategoryChannel | None:
-    if TICKETS_CATEGORY_ID:
-        cat = guild.get_channel(TICKETS_CATEGORY_ID)
+    cached = TICKETS_CATEGORY_CACHE.get(guild.id) or TICKETS_CATEGORY_ID
+    if cached:
+        cat = guild.get_channel(cached)
         if isinstance(cat, discord.CategoryChannel):
+            TICKETS_CATEGORY_CACHE[guild.id] = cat.id
             return cat
-    for ch in guild.categories:
-        if ch.name == TICKETS_CATEGORY_NAME:
-            return ch
-    try:
-        return await guild.create_category(TICKETS_CATEGORY_NAME, reason="EliHaus WL claims")
-    except Exception:
+    cat = next((ch for ch in guild.categories if ch.name == TICKETS_CATEGORY_NAME), None)
+    if cat is None:
+        try:
+            cat = await guild.create_category(TICKETS_CATEGORY_NAME, reason="EliHaus WL claims")
+        except Exception:
+            return None
+    TICKETS_CATEGORY_CACHE[guild.id] = cat.id
+    return cat
+
+def _ticket_overwrites(guild: discord.Guild, user: discord.abc.Snowflake | None = None) -> dict:
+    """Private to staff (and `user` if given). Spare pool channels get user=None."""
+    overwrites = {
+        guild.default_role: discord.PermissionOverwrite(view_channel=False),
+        guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True, manage_channels=True),
+    }
+    if user is not None:
+        overwrites[user] = discord.PermissionOverwrite(view_channel=True, send_messages=True, attach_files=True, read_message_history=True)
+    if TICKETS_STAFF_ROLE_ID:
+        role = guild.get_role(TICKETS_STAFF_ROLE_ID)
+        if role:
+            overwrites[role] = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True, manage_messages=True)
+    return overwrites
+
+# ---------------- Ticket channel pool ----------------
+TICKET_SPARE_PREFIX = "ticket-spare"
+
+def _ticket_name(*parts) -> str:
+    """Channel name exactly as Discord stores it (lowercase a-z 0-9 _ -, no doubled dashes), so a
+    lookup by the name we asked for finds the channel."""
+    slug = re.sub(r"[^a-z0-9_-]+", "-", "-".join(str(p) for p in parts).lower())
+    return re.sub(r"-{2,}", "-", slug).strip("-")[:100] or "ticket"
+
+class TicketPool:
+    """Hidden, pre-created ticket channels per guild. Claims take one and only have to
+    rename it + set permissions (a single edit) instead of creating a channel inline;
+    the pool is topped back up in the background."""
+
+    def __init__(self):
+        self._spare: dict[int, list[int]] = {}  # guild_id -> channel ids
+        self._refilling: set[int] = set()
+
+    def acquire(self, guild: discord.Guild) -> discord.TextChannel | None:
+        spare = self._spare.get(guild.id, [])
+        while spare:
+            ch = guild.get_channel(spare.pop())
+            if isinstance(ch, discord.TextChannel):
+                return ch
         return None
 
-# ---------------- Prize state keys ----------------
-def _prize_msg_key(prize_id: int) -> str:
-    return f"prize_msg:{prize_id}"
+    def release(self, guild: discord.Guild, ch: discord.TextChannel):
+        """Give back a spare whose rename failed; it is still hidden and unused."""
+        self._spare.setdefault(guild.id, []).append(ch.id)
 
-def _prize_ticket_key(prize_id: int) -> str:
-    return f"prize_ticket:{prize_id}"
+    def refill_soon(self, guild: discord.Guild):
+        if TICKET_POOL_SIZE > 0 and guild.id not in self._refilling:
+            self._refilling.add(guild.id)
+            asyncio.create_task(self._refill(guild))
+
+    async def _refill(self, guild: discord.Guild):
+        try:
+            cat = await _get_or_create_tickets_category(guild)
+            if not cat:
+                return
+            if guild.id not in self._spare:
+                # pick up spares left over from a previous run
+                self._spare[guild.id] = [ch.id for ch in cat.text_channels if ch.name.startswith(TICKET_SPARE_PREFIX)]
+            spare = self._spare[guild.id]
+            while len(spare) < TICKET_POOL_SIZE:
+                ch = await guild.create_text_channel(
+                    f"{TICKET_SPARE_PREFIX}-{int(time.time() * 1000) % 1_000_000}",
+                    category=cat, overwrites=_ticket_overwrites(guild), reason="EliHaus ticket pool"
+                )
+                spare.append(ch.id)
+        except Exception as e:
+            print(f"[EliHaus] Ticket pool refill failed for guild {guild.id}: {e!r}")
+        finally:
+            self._refilling.discard(guild.id)
+
+TICKET_POOL = TicketPool()
+
+async def _open_ticket_channel(guild: discord.Guild, user: discord.abc.Snowflake, name: str,
+                               reason: str, topic: str | None = None) -> discord.TextChannel | None:
+    """Private ticket for `user` + staff, from the pool when possible. `topic` is set in the same
+    call that renames/creates it, so it can tag the channel for lookups."""
+    ch = TICKET_POOL.acquire(guild)
+    TICKET_POOL.refill_soon(guild)
+    if ch is not None:
+        try:
+            await ch.edit(name=name, topic=topic, overwrites=_ticket_overwrites(guild, user), reason=reason)
+            return ch
+        except discord.HTTPException:
+            TICKET_POOL.release(guild, ch)  # one PATCH: a failed edit left it a spare
+    cat = await _get_or_create_tickets_category(guild)
+    if not cat:
+        return None
+    return await guild.create_text_channel(name, category=cat, topic=topic, overwrites=_ticket_overwrites(guild, user),
+                                           reason=reason)
 
 # ---------------- Views & Modals ----------------
-class DisabledClaimView(discord.ui.View):
+# Views/modals run each interaction in its own task; route it to the guild's shard first.
+class GuildView(discord.ui.View):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        use_guild(interaction.guild_id)
+        MEMBERS.put(interaction.user)
+        _observe(interaction, "component", self)
+        return True
+
+class GuildModal(discord.ui.Modal):
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        use_guild(interaction.guild_id)
+        MEMBERS.put(interaction.user)
+        _observe(interaction, "modal", self)
+        return True
+
+class KeysetPageView(GuildView):
+    """Ephemeral list paged with ◀ ▶ over a keyset (see elihaus_store.keyset_rows); only `owner_id` can use it.
+    Subclasses implement _fetch/_key/embed and may add their own items (rows 0-3)."""
+    page_size = 10
+
+    def __init__(self, owner_id: str, timeout: int | None = 600):
+        super().__init__(timeout=timeout)
+        self.owner_id = owner_id
+        self.rows: list[tuple] = []
+        self.has_prev = self.has_next = False
+
+    def _fetch(self, bound: tuple | None, op: str, limit: int) -> list[tuple]:
+        raise NotImplementedError
+
+    def _key(self, row: tuple) -> tuple:
+        raise NotImplementedError
+
+    def load(self, bound: tuple | None = None, op: str = ">"):
+        rows = self._fetch(bound, op, self.page_size + 1)
+        if op in ("<", "<="):
+            if len(rows) < self.page_size:  # reached the start: show a full first page
+                return self.load()
+            self.has_prev, self.has_next = len(rows) > self.page_size, op == "<"
+            self.rows = rows[-self.page_size:]
+        else:
+            if not rows and bound is not None:  # everything from here on is gone: show the last page
+                return self.load(bound, "<=")
+            self.has_next = len(rows) > self.page_size
+            self.has_prev = bound is not None and (op == ">" or self.has_prev)
+            self.rows = rows[:self.page_size]
+        self.prev_page.disabled, self.next_page.disabled = not self.has_prev, not self.has_next
+        self._loaded()
+
+    def reload(self):
+        self.load(self._key(self.rows[0]) if self.rows else None, ">=" if self.rows else ">")
+
+    def _loaded(self):
+        """Hook: rebuild page-dependent items."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        await super().interaction_check(interaction)
+        if str(interaction.user.id) != self.owner_id:
+            await interaction.response.send_message("Run the command yourself to get your own copy.", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary, row=4)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.load(self._key(self.rows[0]), "<") if self.rows else self.load()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary, row=4)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.load(self._key(self.rows[-1]), ">") if self.rows else self.load()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    def embed(self, note: str = "") -> discord.Embed:
+        raise NotImplementedError
+
+class DisabledClaimView(GuildView):
     def __init__(self):
         super().__init__(timeout=None)
         btn = discord.ui.Button(label="Claim WL Gifts", style=discord.ButtonStyle.secondary, disabled=True)
         self.add_item(btn)
 
-class ClaimView(discord.ui.View):
+class ClaimView(GuildView):
     """Also hosts round-label helpers; we call them via ClaimView.* to avoid NameError."""
-    def __init__(self, prize_id: int, timeout: int = 600):
+    def __init__(self, prize_id: int, timeout: int | None = 600):
         super().__init__(timeout=timeout)
         self.prize_id = prize_id
 
     # ---- Winner ID lookup for this prize ----
     def _winner_id_from_prize(self, pid: int) -> str:
-        with db() as conn:
-            c = conn.cursor()
-            c.execute("SELECT winner_id FROM prizes WHERE id=?", (pid,))
-            row = c.fetchone()
-            return row[0] if row else ""
+        prize = STORE.get_prize(pid)
+        return prize.winner_id if prize else ""
 
     # ---- Pretty round labels (per channel) ----
-    @staticmethod
-    def _round_counter_key(channel_id: int) -> str:
-        return f"rcount:{channel_id}"
-
-    @staticmethod
-    def _round_label_key(rid: str) -> str:
-        return f"rlabel:{rid}"
-
-    @staticmethod
-    def next_round_number(channel_id: int) -> int:
-        cur = int(get_state(ClaimView._round_counter_key(channel_id)) or 0)
-        cur += 1
-        set_state(ClaimView._round_counter_key(channel_id), str(cur))
-        return cur
-
-    @staticmethod
-    def set_round_label(rid: str, label: str):
-        set_state(ClaimView._round_label_key(rid), label)
-
+    # Labels live on rounds.label and are normally read alongside the round row;
+    # this is the fallback for callers that don't already have it.
     @staticmethod
     def get_round_label(rid: str) -> str:
-        return get_state(ClaimView._round_label_key(rid)) or rid
+        r = STORE.get_round(rid)
+        return (r.label if r else None) or rid
 
     @staticmethod
     def short_seed(s: str, n: int = 6) -> str:
@@ -373,7 +1052,7 @@ class ClaimView(discord.ui.View):
     # ---- Claim button ----
     @discord.ui.button(label="Claim WL Gifts", style=discord.ButtonStyle.primary)
     async def claim(self, interaction: discord.Interaction, button: discord.ui.Button):
-        set_state(_prize_msg_key(self.prize_id), str(interaction.message.id))
+        STORE.set_prize_message(self.prize_id, interaction.message.id)
 
         if str(interaction.user.id) != self._winner_id_from_prize(self.prize_id):
             return await interaction.response.send_message("Only the winner can claim this prize.", ephemeral=True)
@@ -385,7 +1064,7 @@ class ClaimView(discord.ui.View):
 
         await interaction.response.send_modal(ClaimModal(self.prize_id))
 
-class ClaimModal(discord.ui.Modal, title="Claim WL Gifts"):
+class ClaimModal(GuildModal, title="Claim WL Gifts"):
     handle_or_url = discord.ui.TextInput(
         label="IMVU Username OR Profile URL",
         placeholder="e.g. YaEli   OR   https://www.imvu.com/…",
@@ -431,7 +1110,8 @@ class ClaimModal(discord.ui.Modal, title="Claim WL Gifts"):
     async def on_submit(self, interaction: discord.Interaction):
         uid = str(interaction.user.id)
 
-        existing_ticket_id = get_state(_prize_ticket_key(self.prize_id))
+        prize = STORE.get_prize(self.prize_id)
+        existing_ticket_id, claim_msg_id = (prize.ticket_channel_id, prize.message_id) if prize else (None, None)
         if existing_ticket_id:
             ch = interaction.guild.get_channel(int(existing_ticket_id))
             if ch:
@@ -441,59 +1121,23 @@ class ClaimModal(discord.ui.Modal, title="Claim WL Gifts"):
         if not uname:
             return await interaction.response.send_message("Please enter a valid IMVU username or profile link.", ephemeral=True)
 
-        with db() as conn:
-            c = conn.cursor()
-            c.execute("""INSERT INTO prize_queue(prize_id,winner_id,imvu_name,imvu_profile,note,status,created_ts,updated_ts)
-                         VALUES(?,?,?,?,?,?,?,?)""",
-                      (self.prize_id, uid, uname, wishlist_url or profile_url or "", str(self.note or ""),
-                       "ready", iso(now_local()), iso(now_local())))
-            c.execute("UPDATE prizes SET status='claimed', updated_ts=? WHERE id=?", (iso(now_local()), self.prize_id))
-
-        cat = await _get_or_create_tickets_category(interaction.guild)
-        if not cat:
-            return await interaction.response.send_message("Could not create a ticket channel. Please ping an admin.", ephemeral=True)
-
-        overwrites = {
-            interaction.guild.default_role: discord.PermissionOverwrite(view_channel=False),
-            interaction.user: discord.PermissionOverwrite(view_channel=True, send_messages=True, attach_files=True, read_message_history=True),
-        }
-        if TICKETS_STAFF_ROLE_ID:
-            role = interaction.guild.get_role(TICKETS_STAFF_ROLE_ID)
-            if role:
-                overwrites[role] = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True, manage_messages=True)
-
-        ticket_name = f"wl-{interaction.user.name[:16].lower()}-{self.prize_id}"
-        ticket = await interaction.guild.create_text_channel(ticket_name, category=cat, overwrites=overwrites, reason="EliHaus WL claim ticket")
-        set_state(_prize_ticket_key(self.prize_id), str(ticket.id))
-
-        staff_tag = f"<@&{TICKETS_STAFF_ROLE_ID}>" if TICKETS_STAFF_ROLE_ID else "@here"
-        profile_line = f"[{uname}]({profile_url})" if profile_url else uname
-        wishlist_line = f"[Open Wishlist]({wishlist_url})" if wishlist_url else "—"
-        policy = (
-            f"**Policy:** To claim your winnings, you must have **10 items** added from **[Shop YaEli]({SHOP_YAELI_URL})**. "
-            f"Failure to comply is subject to **disqualification**."
-        )
-
-        await ticket.send(
-            f"{staff_tag} New WL claim for {interaction.user.mention}\n"
-            f"IMVU: {profile_line}\n"
-            f"Wishlist: {wishlist_line}\n"
-            f"Notes: {str(self.note or '—')}\n\n"
-            f"{policy}"
-        )
-
-        try:
-            msg_id = get_state(_prize_msg_key(self.prize_id))
-            if msg_id:
-                msg = await interaction.channel.fetch_message(int(msg_id))
-                await msg.edit(view=DisabledClaimView())
-        except Exception:
-            pass
-
-        await interaction.response.send_message(f"✅ Ticket created: {ticket.mention}", ephemeral=True)
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        # queue entry + ticket provisioning are committed together; the outbox worker does the Discord side
+        with db_tx() as conn:
+            STORE.claim_prize(self.prize_id, uid, uname, wishlist_url or profile_url or "", str(self.note or ""))
+            outbox_id = outbox_put(conn.cursor(), "claim_ticket", f"claim:{self.prize_id}", {
+                "guild_id": interaction.guild.id, "user_id": uid, "prize_id": self.prize_id,
+                "ticket_name": _ticket_name("wl", interaction.user.name[:16], self.prize_id),
+                "uname": uname, "profile_url": profile_url, "wishlist_url": wishlist_url,
+                "note": str(self.note or ""),
+                "claim_channel_id": interaction.channel.id if claim_msg_id else None,
+                "claim_msg_id": claim_msg_id,
+            })
+        await _reply_when_provisioned(interaction, outbox_id, "✅ Ticket created: {ticket}")
 
 # --- Bet Modal for the buttons ---
-class BetModal(discord.ui.Modal, title="Place your bet"):
+class BetModal(GuildModal, title="Place your bet"):
     amount = discord.ui.TextInput(
         label="Amount (coins)",
         placeholder="e.g. 2500",
@@ -501,12 +1145,27 @@ class BetModal(discord.ui.Modal, title="Place your bet"):
         max_length=12
     )
 
-    def __init__(self, rid: str, color: str):
+    def __init__(self, rid: str, choice: str | None = None):
         super().__init__()
         self.rid = rid
-        self.color = color
+        self.choice = choice
+        if choice is None:  # "Other bet": ask which one, above the amount
+            self.bet = discord.ui.TextInput(label="Bet (0-36, odd/even, low/high, dozen, col)",
+                                            placeholder="e.g. 17 · odd · high · 2nd 12 · col 3",
+                                            required=True, max_length=20)
+            self.remove_item(self.amount)
+            self.add_item(self.bet)
+            self.add_item(self.amount)
 
     async def on_submit(self, interaction: discord.Interaction):
+        if self.choice is None:
+            self.choice = ROULETTE_RULES.parse_choice(str(self.bet))
+            if self.choice is None:
+                return await interaction.response.send_message(
+                    "Unknown bet. Try a number **0-36**, **red/black/green**, **odd/even**, **low/high** (1-18/19-36), "
+                    "**1st/2nd/3rd 12** or **col 1/2/3**.", ephemeral=True
+                )
+
         # Parse amount
         try:
             amt = int(str(self.amount).strip().replace("_", ""))
@@ -518,93 +1177,56 @@ class BetModal(discord.ui.Modal, title="Place your bet"):
                 f"Stake must be between 1 and {MAX_STAKE}.", ephemeral=True
             )
 
-        # Validate round still open
-        with db() as conn:
-            c = conn.cursor()
-            c.execute("SELECT status, expires_at FROM rounds WHERE rid=?", (self.rid,))
-            row = c.fetchone()
-        if not row or row[0] != "OPEN":
-            return await interaction.response.send_message("Betting window is closed.", ephemeral=True)
-
+        uid = str(interaction.user.id)
         try:
-            exp_dt = datetime.fromisoformat(row[1])
-        except Exception:
-            exp_dt = now_local()
-        if now_local() > exp_dt:
+            placed = STORE.place_bet(self.rid, str(interaction.channel.id), uid, self.choice, amt,
+                                     f"roulette:{self.rid}|{self.choice}", ONE_BET_PER_ROUND)
+        except RoundClosed:
             return await interaction.response.send_message("Betting window is closed.", ephemeral=True)
-
-        uid = str(interaction.user.id)
-
-        # If one bet per round, show their existing bet
-        with db() as conn:
-            c = conn.cursor()
-            c.execute("""SELECT choice, stake FROM bets WHERE rid=? AND discord_id=? LIMIT 1""",
-                      (self.rid, uid))
-            existing = c.fetchone()
-        if ONE_BET_PER_ROUND and existing:
-            bal_now = get_balance(uid)
+        except AlreadyBet as e:
             return await interaction.response.send_message(
                 f"⚠️ You’ve already placed a bet this round.\n"
-                f"Your bet: **{existing[1]}** on **{existing[0].upper()}**\n"
-                f"Balance: **{bal_now}**",
+                f"Your bet: **{e.bet.stake}** on **{e.bet.choice.upper()}**\n"
+                f"Balance: **{e.balance}**",
                 ephemeral=True
             )
-
-        # Balance check
-        bal_before = get_balance(uid)
-        if bal_before < amt:
+        except InsufficientFunds as e:
             return await interaction.response.send_message(
-                f"Insufficient coins. Need **{amt}**, you have **{bal_before}**.",
+                f"Insufficient coins. Need **{amt}**, you have **{e.balance}**.",
                 ephemeral=True
             )
 
-        # Record bet + deduct
-        with db() as conn:
-            c = conn.cursor()
-            c.execute("UPDATE users SET balance=balance-? WHERE discord_id=?", (amt, uid))
-            c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
-                      (uid, "bet", -amt, f"roulette:{self.rid}|{self.color}", iso(now_local())))
-            c.execute("INSERT INTO bets(rid,channel_id,discord_id,choice,stake,ts) VALUES(?,?,?,?,?,?)",
-                      (self.rid, str(interaction.channel.id), uid, self.color, amt, iso(now_local())))
-
-        bal_after = bal_before - amt
+        # Ephemeral confirmation first: the panel edit below is a Discord round trip
+        await interaction.response.send_message(
+            f"✅ Bet placed — **{amt}** on **{self.choice.upper()}** (pays x{ROULETTE_RULES.multiplier(self.choice):g})\n"
+            f"Balance: **{placed.balance_before} ➜ {placed.balance}**",
+            ephemeral=True
+        )
 
-        # Refresh public round embed: pool/bets/time + latest players
+        # Refresh public round embed from the totals place_bet read back: pool/bets/time + latest players
         try:
-            with db() as conn:
-                c = conn.cursor()
-                c.execute("SELECT message_id, expires_at FROM rounds WHERE rid=?", (self.rid,))
-                r = c.fetchone()
-                if not r or not r[0]:
-                    raise RuntimeError("no message_id for round")
-                msg_id, exp_iso = r[0], r[1]
-
-                c.execute("SELECT COUNT(*), COALESCE(SUM(stake),0) FROM bets WHERE rid=?", (self.rid,))
-                cnt, pool = c.fetchone()
-
-                c.execute("""SELECT discord_id, choice, stake
-                             FROM bets WHERE rid=?
-                             ORDER BY ts DESC LIMIT 10""", (self.rid,))
-                last_rows = c.fetchall()
-
+            snap = placed.snapshot
+            ROUND_SCHEDULER.remember(snap)
+            if not snap.message_id:
+                raise RuntimeError("no message_id for round")
             try:
-                exp_dt2 = datetime.fromisoformat(exp_iso)
+                exp_dt = datetime.fromisoformat(snap.expires_at)
             except Exception:
-                exp_dt2 = now_local()
-            left = max(0, int((exp_dt2 - now_local()).total_seconds()))
+                exp_dt = now_local()
+            left = max(0, int((exp_dt - now_local()).total_seconds()))
 
-            msg = await interaction.channel.fetch_message(int(msg_id))
+            msg = await interaction.channel.fetch_message(int(snap.message_id))
             if msg.embeds:
                 e = msg.embeds[0]
                 e.clear_fields()
-                e.add_field(name="Pool", value=str(pool), inline=True)
+                e.add_field(name="Pool", value=str(snap.pool), inline=True)
                 e.add_field(name="Time", value=f"{left}s left", inline=True)
-                e.add_field(name="Bets", value=str(cnt), inline=True)
+                e.add_field(name="Bets", value=str(snap.bet_count), inline=True)
 
                 # Players (latest)
                 lines = []
-                for uid2, ch, st in last_rows:
-                    m = interaction.guild.get_member(int(uid2))
+                for uid2, ch, st in snap.latest:
+                    m = MEMBERS.get(interaction.guild, int(uid2))
                     name = m.mention if m else f"<@{uid2}>"
                     lines.append(f"{name} · {st} on {ch.upper()}")
                 e.add_field(name="Players (latest)", value=("\n".join(lines) if lines else "—"), inline=False)
@@ -613,55 +1235,46 @@ class BetModal(discord.ui.Modal, title="Place your bet"):
         except Exception:
             pass
 
-        # Ephemeral confirmation for the player
-        await interaction.response.send_message(
-            f"✅ Bet placed — **{amt}** on **{self.color.upper()}**\n"
-            f"Balance: **{bal_before} ➜ {bal_after}**",
-            ephemeral=True
-        )
-
-class BetView(discord.ui.View):
+class BetView(GuildView):
     def __init__(self, rid: str, timeout: int | None = None):
         super().__init__(timeout=timeout or 120)
         self.rid = rid
 
     @discord.ui.button(label="Bet RED", style=discord.ButtonStyle.danger, emoji="🟥")
     async def bet_red(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_modal(BetModal(self.rid, color="red"))
+        await interaction.response.send_modal(BetModal(self.rid, "red"))
 
     @discord.ui.button(label="Bet BLACK", style=discord.ButtonStyle.primary, emoji="⬛")
     async def bet_black(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_modal(BetModal(self.rid, color="black"))
+        await interaction.response.send_modal(BetModal(self.rid, "black"))
 
     @discord.ui.button(label="Bet GREEN", style=discord.ButtonStyle.success, emoji="🟩")
     async def bet_green(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.send_modal(BetModal(self.rid, color="green"))
+        await interaction.response.send_modal(BetModal(self.rid, "green"))
+
+    @discord.ui.button(label="Other bet", style=discord.ButtonStyle.secondary, emoji="🎲")
+    async def bet_other(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(BetModal(self.rid))
 
     # NEW: quick check button (ephemeral, no slash command needed)
     @discord.ui.button(label="My Bet", style=discord.ButtonStyle.secondary, emoji="❔")
     async def my_bet(self, interaction: discord.Interaction, button: discord.ui.Button):
         uid = str(interaction.user.id)
         # Look up this user’s bet for this round
-        with db() as conn:
-            c = conn.cursor()
-            c.execute("SELECT choice, stake FROM bets WHERE rid=? AND discord_id=? LIMIT 1", (self.rid, uid))
-            row = c.fetchone()
+        bet = STORE.get_bet(self.rid, uid)
         bal = get_balance(uid)
-        if not row:
+        if not bet:
             return await interaction.response.send_message(
                 f"You have **no bet** this round.\nBalance: **{bal}**",
                 ephemeral=True
             )
-        choice, stake = row
+        choice, stake = bet.choice, bet.stake
         # Remaining time (optional)
-        with db() as conn:
-            c = conn.cursor()
-            c.execute("SELECT expires_at FROM rounds WHERE rid=?", (self.rid,))
-            r = c.fetchone()
+        r = STORE.get_round(self.rid)
         remain = 0
-        if r and r[0]:
+        if r and r.expires_at:
             try:
-                exp_dt = datetime.fromisoformat(r[0])
+                exp_dt = datetime.fromisoformat(r.expires_at)
                 remain = max(0, int((exp_dt - now_local()).total_seconds()))
             except Exception:
                 pass
@@ -671,7 +1284,7 @@ class BetView(discord.ui.View):
             f"Balance: **{bal}**",
             ephemeral=True
         )
-class WithdrawWLModal(discord.ui.Modal, title="Withdraw → WL Gifts"):
+class WithdrawWLModal(GuildModal, title="Withdraw → WL Gifts"):
     amount_coins = discord.ui.TextInput(
         label=f"Coins to convert (multiple of {WL_COINS_PER_GIFT})",
         placeholder=str(WL_COINS_PER_GIFT),
@@ -741,60 +1354,37 @@ class WithdrawWLModal(discord.ui.Modal, title="Withdraw → WL Gifts"):
         if not uname:
             return await interaction.response.send_message("Please enter a valid IMVU username or profile link.", ephemeral=True)
 
-        # create ticket (private to user + staff)
-        cat = await _get_or_create_tickets_category(interaction.guild)
-        if not cat:
-            return await interaction.response.send_message("Could not create a ticket channel. Please ping an admin.", ephemeral=True)
-
-        overwrites = {
-            interaction.guild.default_role: discord.PermissionOverwrite(view_channel=False),
-            interaction.user: discord.PermissionOverwrite(view_channel=True, send_messages=True, attach_files=True, read_message_history=True),
-        }
-        if TICKETS_STAFF_ROLE_ID:
-            role = interaction.guild.get_role(TICKETS_STAFF_ROLE_ID)
-            if role:
-                overwrites[role] = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True, manage_messages=True)
-
-        # store request (pending)
-        with db() as conn:
-            c = conn.cursor()
-            c.execute("""INSERT INTO withdraw_requests(discord_id,coins,gifts,imvu_name,imvu_profile,note,status,created_ts,updated_ts)
-                         VALUES(?,?,?,?,?,?,?,?,?)""",
-                      (uid, coins, gifts, uname, wishlist_url or profile_url or "", str(self.note or ""),
-                       "pending", iso(now_local()), iso(now_local())))
-            req_id = c.lastrowid
-
-        ticket = await interaction.guild.create_text_channel(
-            f"wl-withdraw-{interaction.user.name[:16].lower()}-{req_id}",
-            category=cat, overwrites=overwrites, reason="WL withdraw request"
-        )
-
-        # post admin review panel inside ticket
-        embed = discord.Embed(
-            title=f"WL Withdraw Request #{req_id}",
-            description=(f"User: <@{uid}>\n"
-                         f"Coins → WL: **{coins} → {gifts}** (rate {WL_COINS_PER_GIFT}/WL)\n"
-                         f"IMVU: **{uname}**\n"
-                         f"[Profile/Wishlist]({wishlist_url or profile_url})"),
-            color=discord.Color.gold()
-        )
-        if self.note:
-            embed.add_field(name="User note", value=str(self.note)[:200], inline=False)
-        embed.set_footer(text="Staff: review and approve or reject below.")
-
-        view = AdminWithdrawReviewView(req_id)
-        msg = await ticket.send(embed=embed, view=view)
-
-        # save ticket & message
-        with db() as conn:
-            c = conn.cursor()
-            c.execute("UPDATE withdraw_requests SET ticket_channel_id=?, message_id=?, updated_ts=? WHERE id=?",
-                      (str(ticket.id), str(msg.id), iso(now_local()), req_id))
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        # store request (pending) + queue its ticket in one transaction
+        with db_tx() as conn:
+            req_id = STORE.create_withdrawal(uid, coins, gifts, uname, wishlist_url or profile_url or "",
+                                             str(self.note or ""))
+            outbox_id = outbox_put(conn.cursor(), "withdraw_ticket", f"withdraw:{req_id}", {
+                "guild_id": interaction.guild.id, "user_id": uid, "req_id": req_id,
+                "ticket_name": _ticket_name("wl-withdraw", interaction.user.name[:16], req_id),
+                "coins": coins, "gifts": gifts, "uname": uname, "link": wishlist_url or profile_url,
+                "note": str(self.note or ""),
+            })
+        await _reply_when_provisioned(interaction, outbox_id, "✅ Request submitted. A private ticket was opened: {ticket}")
+
+def _approve_withdrawal(request_id: int, reviewer_id: str, note: str, coins: int | None = None) -> tuple[str, int]:
+    """STORE.approve_withdrawal at this shop's rate; joins the caller's db_tx."""
+    return STORE.approve_withdrawal(request_id, reviewer_id, note, WL_COINS_PER_GIFT, SHOP_NAME, coins)
+
+async def _stamp_withdraw_ticket(guild: discord.Guild, tchid, mid, status: str):
+    """Add the review outcome to the request's ticket message and disable its buttons (best effort)."""
+    try:
+        channel = guild.get_channel(int(tchid)) if tchid else None
+        if channel and mid:
+            msg = await channel.fetch_message(int(mid))
+            e = msg.embeds[0] if msg.embeds else discord.Embed(color=discord.Color.gold())
+            e.add_field(name="Status", value=status, inline=False)
+            await msg.edit(embed=e, view=DisabledReviewView())
+    except Exception:
+        pass
 
-        await interaction.response.send_message(
-            f"✅ Request submitted. A private ticket was opened: {ticket.mention}", ephemeral=True
-        )
-class AdminApproveWithdrawModal(discord.ui.Modal, title="Approve WL Withdraw"):
+class AdminApproveWithdrawModal(GuildModal, title="Approve WL Withdraw"):
     coins = discord.ui.TextInput(
         label="Confirm coins to deduct",
         placeholder="e.g. 20000",
@@ -817,15 +1407,11 @@ class AdminApproveWithdrawModal(discord.ui.Modal, title="Approve WL Withdraw"):
             return await interaction.response.send_message("You don’t have permission to approve.", ephemeral=True)
 
         # load request
-        with db() as conn:
-            c = conn.cursor()
-            c.execute("""SELECT discord_id, coins, gifts, status, ticket_channel_id, message_id, imvu_name, imvu_profile
-                         FROM withdraw_requests WHERE id=?""", (self.request_id,))
-            row = c.fetchone()
-        if not row:
+        req = STORE.get_withdrawal(self.request_id)
+        if not req:
             return await interaction.response.send_message("Request not found.", ephemeral=True)
 
-        uid, coins_req, gifts_req, status, tchid, mid, uname, prof = row
+        tchid, mid, status = req.ticket_channel_id, req.message_id, req.status
         if status != "pending":
             return await interaction.response.send_message(f"Request is already **{status}**.", ephemeral=True)
 
@@ -844,52 +1430,21 @@ class AdminApproveWithdrawModal(discord.ui.Modal, title="Approve WL Withdraw"):
                 f"Gift count must be between **{MIN_WL_GIFTS}** and **{MAX_WL_GIFTS}**.", ephemeral=True
             )
 
-        # balance check at approval time
-        bal = get_balance(uid)
-        if bal < coins_final:
+        # balance check + deduct & create prize + queue, all in one transaction
+        result, bal = _approve_withdrawal(self.request_id, str(interaction.user.id), str(self.note or ""), coins_final)
+        if result == "not_pending":
+            return await interaction.response.send_message("Request is no longer pending.", ephemeral=True)
+        if result == "insufficient":
             return await interaction.response.send_message(
                 f"User balance changed. Needs **{coins_final}**, has **{bal}**. Adjust and try again.", ephemeral=True
             )
 
-        # deduct & create prize + queue
-        with db() as conn:
-            c = conn.cursor()
-            # deduct
-            c.execute("UPDATE users SET balance=balance-? WHERE discord_id=?", (coins_final, uid))
-            c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
-                      (uid, "adjust", -coins_final, f"withdraw_to_wl:{gifts_final} gifts", iso(now_local())))
-            # prize + queue
-            c.execute("""INSERT INTO prizes(winner_id,kind,amount,meta,status,created_ts,updated_ts)
-                         VALUES(?,?,?,?,?,?,?)""",
-                      (uid, "wl", gifts_final, json.dumps({"shop": SHOP_NAME, "source": "user_withdraw"}), "pending",
-                       iso(now_local()), iso(now_local())))
-            prize_id = c.lastrowid
-            c.execute("""INSERT INTO prize_queue(prize_id,winner_id,imvu_name,imvu_profile,note,status,created_ts,updated_ts)
-                         VALUES(?,?,?,?,?,?,?,?)""",
-                      (prize_id, uid, uname, prof or "", str(self.note or ""), "ready", iso(now_local()), iso(now_local())))
-            # mark request
-            c.execute("""UPDATE withdraw_requests SET status='approved', reviewer_id=?, review_note=?, coins=?, gifts=?, updated_ts=?
-                         WHERE id=?""",
-                      (str(interaction.user.id), str(self.note or ""), coins_final, gifts_final, iso(now_local()), self.request_id))
-
-        # update the ticket message (disable buttons)
-        try:
-            channel = interaction.guild.get_channel(int(tchid)) if tchid else None
-            if channel and mid:
-                msg = await channel.fetch_message(int(mid))
-                if msg.embeds:
-                    e = msg.embeds[0]
-                else:
-                    e = discord.Embed(color=discord.Color.gold())
-                e.add_field(name="Status", value=f"✅ **Approved** by {interaction.user.mention}\n"
-                                                 f"Coins: {coins_final} → WL: {gifts_final}", inline=False)
-                await msg.edit(embed=e, view=DisabledReviewView())
-        except Exception:
-            pass
+        await _stamp_withdraw_ticket(interaction.guild, tchid, mid, f"✅ **Approved** by {interaction.user.mention}\n"
+                                                                    f"Coins: {coins_final} → WL: {gifts_final}")
 
         await interaction.response.send_message("Approved and deducted. Prize queued for fulfilment. ✅", ephemeral=True)
 
-class AdminRejectWithdrawModal(discord.ui.Modal, title="Reject WL Withdraw"):
+class AdminRejectWithdrawModal(GuildModal, title="Reject WL Withdraw"):
     reason = discord.ui.TextInput(label="Reason (shown to user)", required=True, max_length=200)
 
     def __init__(self, request_id: int):
@@ -900,47 +1455,28 @@ class AdminRejectWithdrawModal(discord.ui.Modal, title="Reject WL Withdraw"):
         if not _is_admin_member(interaction.guild, interaction.user):
             return await interaction.response.send_message("You don’t have permission to reject.", ephemeral=True)
 
-        with db() as conn:
-            c = conn.cursor()
-            c.execute("""SELECT ticket_channel_id, message_id, status FROM withdraw_requests WHERE id=?""",
-                      (self.request_id,))
-            row = c.fetchone()
-        if not row:
+        req = STORE.get_withdrawal(self.request_id)
+        if not req:
             return await interaction.response.send_message("Request not found.", ephemeral=True)
-        tchid, mid, status = row
+        tchid, mid, status = req.ticket_channel_id, req.message_id, req.status
         if status != "pending":
             return await interaction.response.send_message(f"Request is already **{status}**.", ephemeral=True)
 
-        with db() as conn:
-            c = conn.cursor()
-            c.execute("""UPDATE withdraw_requests SET status='rejected', reviewer_id=?, review_note=?, updated_ts=?
-                         WHERE id=?""",
-                      (str(interaction.user.id), str(self.reason), iso(now_local()), self.request_id))
+        STORE.reject_withdrawal(self.request_id, str(interaction.user.id), str(self.reason))
 
-        try:
-            channel = interaction.guild.get_channel(int(tchid)) if tchid else None
-            if channel and mid:
-                msg = await channel.fetch_message(int(mid))
-                if msg.embeds:
-                    e = msg.embeds[0]
-                else:
-                    e = discord.Embed(color=discord.Color.gold())
-                e.add_field(name="Status", value=f"❌ **Rejected** by {interaction.user.mention}\n"
-                                                 f"Reason: {str(self.reason)}", inline=False)
-                await msg.edit(embed=e, view=DisabledReviewView())
-        except Exception:
-            pass
+        await _stamp_withdraw_ticket(interaction.guild, tchid, mid, f"❌ **Rejected** by {interaction.user.mention}\n"
+                                                                    f"Reason: {str(self.reason)}")
 
         await interaction.response.send_message("Rejected and left balance unchanged. ❌", ephemeral=True)
 
-class DisabledReviewView(discord.ui.View):
+class DisabledReviewView(GuildView):
     def __init__(self):
         super().__init__(timeout=None)
         for label, style in [("Approved", discord.ButtonStyle.success),
                              ("Rejected", discord.ButtonStyle.danger)]:
             self.add_item(discord.ui.Button(label=label, style=style, disabled=True))
 
-class AdminWithdrawReviewView(discord.ui.View):
+class AdminWithdrawReviewView(GuildView):
     def __init__(self, request_id: int):
         super().__init__(timeout=None)
         self.request_id = request_id
@@ -958,34 +1494,30 @@ class AdminWithdrawReviewView(discord.ui.View):
         await interaction.response.send_modal(AdminRejectWithdrawModal(self.request_id))
 
 # ---------------- Roulette core ----------------
-def open_round(channel_id: int, seconds: int, opener_id: str) -> tuple[str, datetime]:
+def open_round(channel_id: int, seconds: int, opener_id: str) -> tuple[str, datetime, str]:
+    """Returns (rid, expires, label); label is the user-friendly per-channel "#N"."""
     rid = f"{channel_id}-{int(now_local().timestamp())}"
     expires = now_local() + timedelta(seconds=max(5, seconds))
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("INSERT INTO rounds(rid,channel_id,status,opened_by,opened_at,expires_at) VALUES(?,?,?,?,?,?)",
-                  (rid, str(channel_id), "OPEN", opener_id, iso(now_local()), iso(expires)))
-    set_state(round_key(channel_id), rid)
-    return rid, expires
+    label = STORE.open_round(rid, str(channel_id), opener_id, iso(expires))
+    set_state(round_key(channel_id), rid, ttl=max(5, seconds) + ROUND_STATE_GRACE)
+    return rid, expires, label
+
+ROUND_STATE_GRACE = 3600  # open-round pointer outlives the timer by this much before GC
 
 def get_open_round(channel_id: int):
     rk = round_key(channel_id)
     rid = get_state(rk)
     if not rid:
         return None
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("SELECT status, expires_at FROM rounds WHERE rid=? LIMIT 1", (rid,))
-        row = c.fetchone()
-    if not row:
+    r = STORE.get_round(rid)
+    if not r:
         set_state(rk, None)
         return None
-    status, exp = row
     try:
-        exp_dt = datetime.fromisoformat(exp)
+        exp_dt = datetime.fromisoformat(r.expires_at)
     except Exception:
         exp_dt = now_local()
-    if status != "OPEN" or now_local() > exp_dt:
+    if r.status != "OPEN" or now_local() > exp_dt:
         set_state(rk, None)
         return None
     return rid, exp_dt
@@ -995,47 +1527,30 @@ def get_open_or_last_round(channel_id: int):
     rk = round_key(channel_id)
     rid = get_state(rk)
     if rid:
-        with db() as conn:
-            c = conn.cursor()
-            c.execute("SELECT status, expires_at FROM rounds WHERE rid=? LIMIT 1", (rid,))
-            row = c.fetchone()
-        if row and row[0] == "OPEN":
+        r = STORE.get_round(rid)
+        if r and r.status == "OPEN":
             try:
-                return rid, datetime.fromisoformat(row[1])
+                return rid, datetime.fromisoformat(r.expires_at)
             except Exception:
                 return rid, now_local()
 
     # Fallback: latest OPEN round in DB for this channel
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("""SELECT rid, expires_at
-                     FROM rounds
-                     WHERE channel_id=? AND status='OPEN'
-                     ORDER BY opened_at DESC LIMIT 1""", (str(channel_id),))
-        row = c.fetchone()
-    if row:
+    r = STORE.latest_open_round(str(channel_id))
+    if r:
         try:
-            return row[0], datetime.fromisoformat(row[1])
+            return r.rid, datetime.fromisoformat(r.expires_at)
         except Exception:
-            return row[0], now_local()
+            return r.rid, now_local()
     return None
 
 
-async def _bump_round_message(channel, rid: str):
-    # read latest totals + the old message id
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("SELECT message_id, expires_at FROM rounds WHERE rid=?", (rid,))
-        row = c.fetchone()
-        if not row or not row[0]:
-            return
-        old_id, exp_iso = row
-        c.execute("SELECT COUNT(*), COALESCE(SUM(stake),0) FROM bets WHERE rid=?", (rid,))
-        cnt, pool = c.fetchone()
-        c.execute("""SELECT discord_id, choice, stake
-                     FROM bets WHERE rid=?
-                     ORDER BY ts DESC LIMIT 10""", (rid,))
-        last_rows = c.fetchall()
+async def _bump_round_message(channel, rid: str, snap=None):
+    # latest totals + the old message id (the scheduler's cached snapshot if we have one)
+    snap = snap or STORE.round_snapshot(rid)
+    if not snap or not snap.message_id:
+        return
+    old_id, exp_iso, rlabel = snap.message_id, snap.expires_at, snap.label
+    cnt, pool, last_rows = snap.bet_count, snap.pool, snap.latest
 
     # remaining time
     try:
@@ -1048,7 +1563,7 @@ async def _bump_round_message(channel, rid: str):
 
     # rebuild the embed (same style as your main one)
     e = discord.Embed(
-        title=f"🎯 Roulette — Round {ClaimView.get_round_label(rid)}",
+        title=f"🎯 Roulette — Round {rlabel or rid}",
         description="Click a button to bet. A modal will ask your amount.",
         color=discord.Color.gold()
     )
@@ -1059,7 +1574,7 @@ async def _bump_round_message(channel, rid: str):
     lines = []
     guild = getattr(channel, "guild", None)
     for uid, ch, st in last_rows:
-        m = guild.get_member(int(uid)) if guild else None
+        m = MEMBERS.get(guild, int(uid))
         name = m.mention if m else f"<@{uid}>"
         lines.append(f"{name} · {st} on {ch.upper()}")
     e.add_field(name="Players (latest)", value=("\n".join(lines) if lines else "—"), inline=False)
@@ -1068,45 +1583,35 @@ async def _bump_round_message(channel, rid: str):
     view = BetView(rid, timeout=remain + 30)
     new_msg = await channel.send(embed=e, view=view)
 
-    # update DB to the new message id
-    with db() as conn:
-        conn.execute("UPDATE rounds SET message_id=? WHERE rid=?", (str(new_msg.id), rid))
+    # update DB (and the cached snapshot) to the new message id
+    STORE.set_round_message(rid, new_msg.id)
+    snap.message_id = str(new_msg.id)
 
-    # try to delete the old one to reduce clutter (requires 'Manage Messages')
+    # delete the old one to reduce clutter (requires 'Manage Messages'); no fetch needed for that
     try:
-        old_msg = await channel.fetch_message(int(old_id))
-        await old_msg.delete()
+        await channel.get_partial_message(int(old_id)).delete()
     except Exception:
         pass
 
 # ---------------- Slash Commands (eh_*) ----------------
 def ensure_user(uid: str):
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("""INSERT OR IGNORE INTO users(discord_id,balance,last_daily,last_weekly,joined_at)
-                     VALUES(?,?,?,?,?)""", (uid, 0, None, None, iso(now_local())))
+    STORE.ensure_user(uid)
 
 def get_balance(uid: str) -> int:
-    ensure_user(uid)
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("SELECT balance FROM users WHERE discord_id=?", (uid,))
-        row = c.fetchone()
-        return row[0] if row else 0
+    return STORE.get_balance(uid)
 
-ALLOWED_TX_KINDS = {"claim", "bet", "payout", "redeem", "lotto", "starter", "wl_deposit"}
+ALLOWED_TX_KINDS = {"claim", "bet", "payout", "redeem", "lotto", "starter", "wl_deposit", "wl_withdraw"}
 
 def change_balance(uid: str, delta: int, kind: str, meta: str = "") -> int:
     if kind not in ALLOWED_TX_KINDS:
         raise ValueError(f"Balance change blocked for kind='{kind}'.")
-    ensure_user(uid)
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("UPDATE users SET balance=balance+? WHERE discord_id=?", (delta, uid))
-        c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
-                  (uid, kind, delta, meta, iso(now_local())))
-        c.execute("SELECT balance FROM users WHERE discord_id=?", (uid,))
-        return c.fetchone()[0]
+    return STORE.change_balance(uid, delta, kind, meta)
+
+def apply_ledger(uid: str, delta: int, kind: str, meta: str = "") -> int:
+    """change_balance for code already inside a db_tx (the store joins it). Returns the tx id."""
+    if kind not in ALLOWED_TX_KINDS:
+        raise ValueError(f"Balance change blocked for kind='{kind}'.")
+    return STORE.post_ledger(uid, delta, kind, meta)
 
 
 # ---- Help (slash) ----
@@ -1125,6 +1630,7 @@ async def eh_help(interaction: discord.Interaction):
         "`/eh_buyticket` – buy lotto tickets",
         "`/eh_lotto` – see lotto status",
         "`/eh_table` – active roulette round status",
+        "`/eh_history` – your coin transactions / statement",
     ]
     admin = [
         "`/eh_openround` – open roulette round",
@@ -1133,184 +1639,302 @@ async def eh_help(interaction: discord.Interaction):
         "`/eh_withdrawal` / `/eh_withdraw` – adjust balance",
         "`/eh_drawlotto` – draw weekly winner",
         "`/eh_fulfil_next` / `/eh_fulfil_done` – fulfil WL claims",
+        "`/eh_fulfil_batch` – work through several WL claims at once",
+        "`/eh_withdrawals` – review pending WL withdrawals in bulk",
         "`/eh_roundreset` – unlock stuck round",
+        "`/eh_jobs` – scheduled jobs (lotto draws, cleanup)",
+        "`/eh_backup` – back up this server's data / list backups",
     ]
     lines = public + (["\n**Admin**"] + admin if is_admin else [])
     await interaction.response.send_message("\n".join(lines), ephemeral=True)
 
-import asyncio
+import asyncio, heapq
 ROUND_TICK_SECONDS = 5
-ROUND_TASKS: dict[str, asyncio.Task] = {}
 
-async def _tick_round(channel: discord.abc.Messageable, rid: str, exp_iso: str):
-    try:
+def _settle_round(rid: str):
+    """Roll + pay out an OPEN round exactly once.
+    Returns (outcome, pocket, seed, rows, winners, total_pool, msg_id, label), or None if it was already closed."""
+    seed = new_seed("ROUL", rid, time.time())
+    pocket = roulette_roll(seed)
+    outcome = roulette_color(pocket)
+
+    with db_tx():
+        # the store flips the status first, so /eh_resolve and the scheduler are safe to race
+        settled = STORE.settle_round(rid, outcome, pocket, seed, lambda bets: ROULETTE_RULES.settle(bets, pocket),
+                                     f"roulette:{rid}|{pocket} {outcome}")
+        if settled is None:
+            return None
+        r = settled.round
+        clear_state(round_key(int(r.channel_id)), rid)
+    return (outcome, pocket, seed, settled.bets, settled.credits, settled.pool,
+            (int(r.message_id) if r.message_id else None), (r.label or rid))
+
+async def _auto_resolve_round(channel: discord.abc.Messageable, rid: str):
+    """Auto resolve at 0s using the same settlement as /eh_resolve."""
+    settled = _settle_round(rid)
+    if not settled:
+        return
+    outcome, pocket, seed, rows, winners, total_pool, msg_id, rlabel = settled
+    seed_display = ClaimView.short_seed(seed, 8)
+
+    # edit original embed to show result + remove buttons
+    if msg_id:
         try:
-            exp_dt = datetime.fromisoformat(exp_iso)
+            msg = await channel.fetch_message(msg_id)
+            e = msg.embeds[0] if msg.embeds else discord.Embed(color=_result_color(outcome))
+            e.title = f"🎯 Roulette — Round {rlabel}"
+            e.description = f"**RESULT:** {pocket} {outcome.upper()}"
+            e.set_footer(text=f"Seed: {seed_display}")
+            await msg.edit(embed=e, view=None)
         except Exception:
-            exp_dt = now_local()
+            pass
 
-        while True:
-            try:
-                with db() as conn:
-                    c = conn.cursor()
-                    c.execute("SELECT message_id, status FROM rounds WHERE rid=?", (rid,))
-                    row = c.fetchone()
-                    if not row:
-                        break
-                    msg_id, status = row
-                    c.execute("SELECT COUNT(*), COALESCE(SUM(stake),0) FROM bets WHERE rid=?", (rid,))
-                    cnt, pool = c.fetchone()
-                    c.execute("""SELECT discord_id, choice, stake
-                                 FROM bets WHERE rid=? ORDER BY ts DESC LIMIT 10""", (rid,))
-                    last_rows = c.fetchall()
-            except Exception:
-                break
+    # casino-style result card
+    top_mentions = []
+    guild = getattr(channel, "guild", None)
+    for uid, _win in sorted(winners, key=lambda x: x[1], reverse=True)[:5]:
+        m = MEMBERS.get(guild, int(uid))
+        top_mentions.append(m.mention if m else f"<@{uid}>")
 
-            if status != "OPEN":
-                break
+    result_embed = build_roulette_result_embed(
+        rlabel=rlabel,
+        outcome=outcome,
+        pocket=pocket,
+        total_bets=len(rows),
+        total_pool=total_pool,
+        winners_mentions=top_mentions,
+        seed_display=seed_display,
+    )
+    await channel.send(embed=result_embed)
 
-            remain = max(0, int((exp_dt - now_local()).total_seconds()))
+def _channel_guild_id(channel) -> int:
+    return getattr(getattr(channel, "guild", None), "id", 0)
 
-            # update embed
-            try:
-                msg = await channel.fetch_message(int(msg_id))
-                if msg.embeds:
-                    e = msg.embeds[0]
-                    e.clear_fields()
-                    e.add_field(name="Pool", value=str(pool), inline=True)
-                    e.add_field(name="Time", value=f"{remain}s left", inline=True)
-                    e.add_field(name="Bets", value=str(cnt), inline=True)
-
-                    # players list
-                    lines = []
-                    guild = getattr(channel, "guild", None)
-                    for uid, ch, st in last_rows:
-                        m = guild.get_member(int(uid)) if guild else None
-                        name = m.mention if m else f"<@{uid}>"
-                        lines.append(f"{name} · {st} on {ch.upper()}")
-                    e.add_field(name="Players (latest)", value=("\n".join(lines) if lines else "—"), inline=False)
-
-                    await msg.edit(embed=e)
-            except Exception:
-                # keep looping even if one edit fails
-                pass
+class RoundScheduler:
+    """Owns the ticker for every open round across channels.
+    One loop sleeps until the earliest deadline in a heap, batches the DB read for all
+    rounds due in that wakeup, and fires auto-resolve exactly at expiry."""
 
-            if remain <= 0:
-                # Auto resolve at 0s using the same logic as /eh_resolve
+    def __init__(self):
+        self._heap: list[tuple[float, str]] = []  # (due_ts, rid)
+        self._rounds: dict[str, tuple[discord.abc.Messageable, float]] = {}  # rid -> (channel, expires_ts)
+        self._snaps: dict[str, RoundSnapshot] = {}  # rid -> latest aggregates (tick or bet), for bumps
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def add(self, channel: discord.abc.Messageable, rid: str, exp_dt: datetime):
+        self._rounds[rid] = (channel, exp_dt.timestamp())
+        self._push(rid, time.time())
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wake.set()
+
+    def discard(self, rid: str):
+        # heap entries for dropped rounds are skipped lazily when they come due
+        self._rounds.pop(rid, None)
+        self._snaps.pop(rid, None)
+
+    def remember(self, snap: RoundSnapshot):
+        if snap.rid in self._rounds:
+            self._snaps[snap.rid] = snap
+
+    def snapshot(self, rid: str) -> RoundSnapshot | None:
+        """Aggregates from the last tick or bet (at most ROUND_TICK_SECONDS stale), or None."""
+        return self._snaps.get(rid)
+
+    def __contains__(self, rid: str) -> bool:
+        return rid in self._rounds
+
+    def _push(self, rid: str, now_ts: float):
+        exp_ts = self._rounds[rid][1]
+        heapq.heappush(self._heap, (min(now_ts + ROUND_TICK_SECONDS, exp_ts), rid))
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            now_ts = time.time()
+            due: list[str] = []
+            while self._heap and self._heap[0][0] <= now_ts:
+                _, rid = heapq.heappop(self._heap)
+                if rid in self._rounds and rid not in due:
+                    due.append(rid)
+            if due:
                 try:
-                    seed = f"ROUL-{rid}-{int(now_local().timestamp())}-{random.randint(1, 1_000_000)}"
-                    random.seed(seed)
-                    roll = random.randint(0, 36)
-                    red_nums = {1,3,5,7,9,12,14,16,18,19,21,23,25,27,30,32,34,36}
-                    if roll == 0:
-                        outcome = "green"; multiplier = PAYOUT_GREEN
-                    else:
-                        outcome = "red" if roll in red_nums else "black"; multiplier = PAYOUT_RED_BLACK
-
-                    total_pool = 0; winners = []; rows = []
-                    with db() as conn:
-                        c = conn.cursor()
-                        c.execute("SELECT discord_id, choice, stake FROM bets WHERE rid=?", (rid,))
-                        rows = c.fetchall()
-                        for uid, ch, stake in rows:
-                            total_pool += stake
-                        for uid, ch, stake in rows:
-                            if ch == outcome:
-                                win = int(stake * multiplier)
-                                c.execute("UPDATE users SET balance=balance+? WHERE discord_id=?", (win, uid))
-                                c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
-                                          (uid, "payout", win, f"roulette:{rid}|{outcome}", iso(now_local())))
-                                winners.append((uid, win))
-                        c.execute("UPDATE rounds SET status='RESOLVED', outcome=?, seed=?, resolved_at=? WHERE rid=?",
-                                  (outcome, seed, iso(now_local()), rid))
-                    set_state(round_key(int(str(channel.id))), None)
-
-                    # edit original embed to show result + remove buttons
-                    try:
-                        msg = await channel.fetch_message(int(msg_id))
-                        rlabel = ClaimView.get_round_label(rid)
-                        seed_display = ClaimView.short_seed(seed, 8)
-                        e = msg.embeds[0] if msg.embeds else discord.Embed(color=_result_color(outcome))
-                        e.title = f"🎯 Roulette — Round {rlabel}"
-                        e.description = f"**RESULT:** {outcome.upper()}"
-                        e.set_footer(text=f"Seed: {seed_display}")
-                        await msg.edit(embed=e, view=None)
-                    except Exception:
-                        pass
-                    
-                    # casino-style result card
-                    top_mentions = []
-                    guild = getattr(channel, "guild", None)
-                    for uid, _win in sorted(winners, key=lambda x: x[1], reverse=True)[:5]:
-                        m = guild.get_member(int(uid)) if guild else None
-                        top_mentions.append(m.mention if m else f"<@{uid}>")
-                    
-                    result_embed = build_roulette_result_embed(
-                        rlabel=rlabel,
-                        outcome=outcome,
-                        total_bets=len(rows),
-                        total_pool=total_pool,
-                        winners_mentions=top_mentions,
-                        seed_display=seed_display,
-                    )
-                    await channel.send(embed=result_embed)
-
-                finally:
-                    break
-
-            await asyncio.sleep(ROUND_TICK_SECONDS)
-    finally:
-        ROUND_TASKS.pop(rid, None)
-
+                    await self._tick(due, now_ts)
+                except Exception:
+                    traceback.print_exc()
+            timeout = max(0.0, self._heap[0][0] - time.time()) if self._heap else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
 
-# ---- Player: join/daily/weekly/balance ----
-@bot.tree.command(name="eh_join", description="Join EliHaus and get starter coins")
-async def eh_join(interaction: discord.Interaction):
-    uid = str(interaction.user.id)
-    ensure_user(uid)
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("SELECT 1 FROM tx WHERE discord_id=? AND kind='starter' LIMIT 1", (uid,))
-        has_starter = c.fetchone() is not None
-    if has_starter:
+    async def _tick(self, due: list[str], now_ts: float):
+        by_guild: dict[int, list[str]] = {}
+        for rid in due:
+            by_guild.setdefault(_channel_guild_id(self._rounds[rid][0]), []).append(rid)
+        snaps = {}
+        for gid, rids in by_guild.items():
+            try:
+                with guild_scope(gid):
+                    snaps.update(STORE.round_snapshots(rids))
+            except Exception:
+                # DB hiccup: try again next tick rather than dropping the rounds
+                traceback.print_exc()
+                for rid in rids:
+                    self._push(rid, now_ts)
+                due = [rid for rid in due if rid not in rids]
+        await asyncio.gather(*(self._tick_one(rid, snaps.get(rid), now_ts) for rid in due),
+                             return_exceptions=True)
+
+    async def _tick_one(self, rid: str, snap, now_ts: float):
+        entry = self._rounds.get(rid)
+        if not entry:
+            return
+        channel, exp_ts = entry
+        use_guild(_channel_guild_id(channel))  # gather() gave us our own task
+        if not snap or snap.status != "OPEN":
+            self.discard(rid)
+            return
+        self.remember(snap)
+        msg_id, cnt, pool, last_rows = snap.message_id, snap.bet_count, snap.pool, snap.latest
+        expired = now_ts >= exp_ts
+        if not expired:
+            self._push(rid, now_ts)
+        remain = max(0, int(exp_ts - now_ts))
+
+        # update embed
+        try:
+            msg = await channel.fetch_message(int(msg_id))
+            if msg.embeds:
+                e = msg.embeds[0]
+                e.clear_fields()
+                e.add_field(name="Pool", value=str(pool), inline=True)
+                e.add_field(name="Time", value=f"{remain}s left", inline=True)
+                e.add_field(name="Bets", value=str(cnt), inline=True)
+
+                # players list
+                lines = []
+                guild = getattr(channel, "guild", None)
+                for uid, ch, st in last_rows:
+                    m = MEMBERS.get(guild, int(uid))
+                    name = m.mention if m else f"<@{uid}>"
+                    lines.append(f"{name} · {st} on {ch.upper()}")
+                e.add_field(name="Players (latest)", value=("\n".join(lines) if lines else "—"), inline=False)
+
+                await msg.edit(embed=e)
+        except Exception:
+            # keep ticking even if one edit fails
+            pass
+
+        if expired:
+            self.discard(rid)
+            await _auto_resolve_round(channel, rid)
+
+ROUND_SCHEDULER = RoundScheduler()
+
+class _StickyState:
+    __slots__ = ("rate", "last_ts", "distance", "last_bump", "task")
+
+    def __init__(self):
+        self.rate = 0.0        # EWMA messages/sec
+        self.last_ts = 0.0
+        self.distance = 0      # messages since the panel was last (re)posted
+        self.last_bump = 0.0
+        self.task: asyncio.Task | None = None
+
+class StickyBumper:
+    """Decides when to re-post a round panel at the bottom of a busy channel.
+    Counting is in memory per message; a bump needs the panel STICKY_MIN_DISTANCE messages up and a
+    cooldown that stretches with the channel's message rate, then waits for a lull (STICKY_QUIET,
+    capped by STICKY_MAX_WAIT) so the new panel isn't buried straight away. The DB is only read
+    once a bump is due, and the panel is rebuilt from the scheduler's cached aggregates."""
+
+    def __init__(self):
+        self._chans: dict[int, _StickyState] = {}
+
+    def cooldown(self, st: _StickyState) -> float:
+        return STICKY_COOLDOWN * (1 + st.rate / STICKY_BUSY_RATE)
+
+    def seen(self, channel: discord.abc.Messageable):
+        st = self._chans.setdefault(channel.id, _StickyState())
+        now = time.monotonic()
+        if st.last_ts:
+            st.rate *= 0.5 ** ((now - st.last_ts) / STICKY_RATE_HALFLIFE)
+        st.rate += math.log(2) / STICKY_RATE_HALFLIFE  # steady state = messages/sec
+        st.last_ts = now
+        st.distance += 1
+        if (st.distance >= STICKY_MIN_DISTANCE and (st.task is None or st.task.done())
+                and now - st.last_bump >= self.cooldown(st)):
+            st.task = asyncio.create_task(self._bump_when_quiet(channel, st, now + STICKY_MAX_WAIT))
+
+    def reset(self, channel_id: int):
+        """Panel was just (re)posted at the bottom, or the channel has no round: count from zero."""
+        st = self._chans.get(channel_id)
+        if st:
+            st.distance = 0
+            if st.task and st.task is not asyncio.current_task():
+                st.task.cancel()
+
+    async def _bump_when_quiet(self, channel, st: _StickyState, deadline: float):
+        use_guild(_channel_guild_id(channel))  # own task
+        while True:
+            now = time.monotonic()
+            wait = min(st.last_ts + STICKY_QUIET, deadline) - now
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+        o = get_open_round(channel.id)
+        if not o:
+            self.reset(channel.id)
+            return
+        rid, exp = o
+        # don't bump if nearly done to avoid spammy last seconds
+        if (exp - now_local()).total_seconds() <= 10:
+            return
+        self.reset(channel.id)
+        st.last_bump = time.monotonic()
+        try:
+            await _bump_round_message(channel, rid, ROUND_SCHEDULER.snapshot(rid))
+        except Exception:
+            pass
+
+STICKY = StickyBumper()
+
+
+# ---- Player: join/daily/weekly/balance ----
+@bot.tree.command(name="eh_join", description="Join EliHaus and get starter coins")
+async def eh_join(interaction: discord.Interaction):
+    uid = str(interaction.user.id)
+    if STORE.has_ledger_kind(uid, "starter"):
         return await interaction.response.send_message("You’ve already joined EliHaus. Use `/eh_daily` and `/eh_weekly` to build coins.", ephemeral=True)
     new_bal = change_balance(uid, STARTER_AMOUNT, "starter", "joinhaus starter")
     await interaction.response.send_message(f"Welcome to **EliHaus**. Starter pack: **{STARTER_AMOUNT}** coins. Balance: **{new_bal}**", ephemeral=True)
 
+def _week_start_ts(now: datetime) -> int:
+    """Monday 00:00 (local) of `now`'s ISO week, in unix seconds."""
+    monday = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    return int(monday.timestamp())
+
 @bot.tree.command(name="eh_daily", description="Claim your daily coins")
 async def eh_daily(interaction: discord.Interaction):
-    uid = str(interaction.user.id)
-    ensure_user(uid)
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("SELECT last_daily FROM users WHERE discord_id=?", (uid,))
-        row = c.fetchone()
-        last = datetime.fromisoformat(row[0]).astimezone(TZ) if row and row[0] else None
-        now = now_local()
-        if last and (now - last) < timedelta(hours=24):
-            left = timedelta(hours=24) - (now - last)
-            hrs = int(left.total_seconds() // 3600)
-            mins = int((left.total_seconds() % 3600) // 60)
-            return await interaction.response.send_message(f"You’ve already claimed. Try again in **{hrs}h {mins}m**.", ephemeral=True)
-        new_bal = change_balance(uid, DAILY_AMOUNT, "claim", "daily")
-        c.execute("UPDATE users SET last_daily=? WHERE discord_id=?", (iso(now), uid))
-    await interaction.response.send_message(f"Daily claimed: **{DAILY_AMOUNT}** coins. New balance: **{new_bal}**", ephemeral=True)
+    now_ts = int(now_local().timestamp())
+    res = STORE.claim(str(interaction.user.id), "daily", DAILY_AMOUNT, now_ts, now_ts - DAILY_COOLDOWN, "daily")
+    if not res.claimed:
+        left = res.last_ts + DAILY_COOLDOWN - now_ts
+        return await interaction.response.send_message(
+            f"You’ve already claimed. Try again in **{left // 3600}h {left % 3600 // 60}m**.", ephemeral=True)
+    await interaction.response.send_message(f"Daily claimed: **{DAILY_AMOUNT}** coins. New balance: **{res.balance}**", ephemeral=True)
 
 @bot.tree.command(name="eh_weekly", description="Claim your weekly coins")
 async def eh_weekly(interaction: discord.Interaction):
-    uid = str(interaction.user.id)
-    ensure_user(uid)
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("SELECT last_weekly FROM users WHERE discord_id=?", (uid,))
-        row = c.fetchone()
-        nowt = now_local()
-        last = datetime.fromisoformat(row[0]).astimezone(TZ) if row and row[0] else None
-        if last and (last.isocalendar()[:2] == nowt.isocalendar()[:2]):
-            return await interaction.response.send_message("You’ve already claimed your weekly this week.", ephemeral=True)
-        new_bal = change_balance(uid, WEEKLY_AMOUNT, "claim", "weekly")
-        c.execute("UPDATE users SET last_weekly=? WHERE discord_id=?", (iso(nowt), uid))
-    await interaction.response.send_message(f"Weekly claimed: **{WEEKLY_AMOUNT}** coins. New balance: **{new_bal}**", ephemeral=True)
+    now = now_local()
+    # once per ISO week: the last claim has to be from before this Monday
+    res = STORE.claim(str(interaction.user.id), "weekly", WEEKLY_AMOUNT, int(now.timestamp()),
+                      _week_start_ts(now) - 1, "weekly")
+    if not res.claimed:
+        return await interaction.response.send_message("You’ve already claimed your weekly this week.", ephemeral=True)
+    await interaction.response.send_message(f"Weekly claimed: **{WEEKLY_AMOUNT}** coins. New balance: **{res.balance}**", ephemeral=True)
 
 @bot.tree.command(name="eh_balance", description="Check a balance")
 @app_commands.describe(member="Member to check (optional)")
@@ -1330,57 +1954,29 @@ async def eh_deposit(interaction: discord.Interaction, amount: int, imvu: str, n
     if amount <= 0:
         return await interaction.response.send_message("Amount must be positive.", ephemeral=True)
 
-    # balance check
-    bal = get_balance(uid)
-    if bal < amount:
-        return await interaction.response.send_message(
-            f"Insufficient coins. Need **{amount}**, you have **{bal}**.",
-            ephemeral=True
-        )
-
-    # deduct immediately (kind = wl_deposit)
-    new_bal = change_balance(uid, -amount, "wl_deposit", meta=f"wl_deposit by user; imvu={imvu}")
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    ensure_user(uid)
 
-    # open (or create) the WL tickets category
-    cat = await _get_or_create_tickets_category(interaction.guild)
-    if not cat:
-        return await interaction.response.send_message(
-            "Could not create a ticket channel. Please ping an admin.",
+    # deduct (kind = wl_deposit) and queue the staff ticket in the same transaction
+    try:
+        with db_tx() as conn:
+            tx_id, new_bal = STORE.debit(uid, amount, "wl_deposit", f"wl_deposit by user; imvu={imvu}")
+            outbox_id = outbox_put(conn.cursor(), "deposit_ticket", f"deposit:{tx_id}", {
+                "guild_id": interaction.guild.id, "user_id": uid, "amount": amount,
+                "ticket_name": _ticket_name("wl-deposit", interaction.user.name[:16], int(now_local().timestamp())),
+                "imvu": imvu, "note": note, "new_bal": new_bal,
+            })
+    except InsufficientFunds as e:
+        return await interaction.followup.send(
+            f"Insufficient coins. Need **{amount}**, you have **{e.balance}**.",
             ephemeral=True
         )
+    bal = new_bal + amount
 
-    # create a private ticket for this user + staff
-    overwrites = {
-        interaction.guild.default_role: discord.PermissionOverwrite(view_channel=False),
-        interaction.user: discord.PermissionOverwrite(view_channel=True, send_messages=True, attach_files=True, read_message_history=True),
-    }
-    if TICKETS_STAFF_ROLE_ID:
-        role = interaction.guild.get_role(TICKETS_STAFF_ROLE_ID)
-        if role:
-            overwrites[role] = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True, manage_messages=True)
-
-    ticket_name = f"wl-deposit-{interaction.user.name[:16].lower()}-{int(now_local().timestamp())}"
-    ticket = await interaction.guild.create_text_channel(ticket_name, category=cat, overwrites=overwrites, reason="EliHaus WL deposit")
-
-    # post details in the ticket
-    staff_tag = f"<@&{TICKETS_STAFF_ROLE_ID}>" if TICKETS_STAFF_ROLE_ID else "@here"
-    e = discord.Embed(
-        title="💳 WL Conversion Request",
-        description=f"{interaction.user.mention} deposited **{amount}** coins to convert to wishlist gifts.",
-        color=discord.Color.gold(),
-        timestamp=now_local()
-    )
-    e.add_field(name="IMVU", value=imvu, inline=False)
-    e.add_field(name="Notes", value=(note or "—"), inline=False)
-    e.add_field(name="New Balance", value=str(new_bal), inline=True)
-
-    await ticket.send(content=staff_tag, embed=e)
-
-    # confirm to the user
-    await interaction.response.send_message(
-        f"✅ Deposited **{amount}** coins. Ticket created: {ticket.mention}\n"
-        f"Balance: **{bal} ➜ {new_bal}**",
-        ephemeral=True
+    await _reply_when_provisioned(
+        interaction, outbox_id,
+        f"✅ Deposited **{amount}** coins. Ticket created: {{ticket}}\n"
+        f"Balance: **{bal} ➜ {new_bal}**"
     )
 
 # ---- Roulette: open/status/resolve/cancel ----
@@ -1393,12 +1989,8 @@ async def eh_openround(interaction: discord.Interaction, seconds: int = ROUND_SE
     seconds = max(10, min(seconds, 600))
     if get_open_round(interaction.channel.id):
         return await interaction.response.send_message("There’s already an open round in this channel.", ephemeral=True)
-    rid, exp = open_round(interaction.channel.id, seconds, str(interaction.user.id))
-
-    # user-friendly label like #1, #2 per channel
-    rnum = ClaimView.next_round_number(interaction.channel.id)
-    rlabel = f"#{rnum}"
-    ClaimView.set_round_label(rid, rlabel)
+    # rlabel is the user-friendly label like #1, #2 per channel
+    rid, exp, rlabel = open_round(interaction.channel.id, seconds, str(interaction.user.id))
 
     embed = discord.Embed(
         title=f"🎯 Roulette — Round {rlabel}",
@@ -1411,14 +2003,16 @@ async def eh_openround(interaction: discord.Interaction, seconds: int = ROUND_SE
 
     view = BetView(rid, timeout=seconds + 30)
     msg = await interaction.channel.send(embed=embed, view=view)
-    with db() as conn:
-        conn.execute("UPDATE rounds SET message_id=? WHERE rid=?", (str(msg.id), rid))
+    STORE.set_round_message(rid, msg.id)
 
-    # launch a background ticker for this round
+    # hand the round to the shared ticker; the job is the backstop if we restart mid-round
     try:
-        ROUND_TASKS[rid] = bot.loop.create_task(_tick_round(interaction.channel, rid, iso(exp)))
+        ROUND_SCHEDULER.add(interaction.channel, rid, exp)
+        STICKY.reset(interaction.channel.id)  # the new panel is at the bottom
     except Exception:
         pass
+    enqueue_job("round_expire", int(exp.timestamp()) + ROUND_TICK_SECONDS,
+                {"rid": rid, "channel_id": interaction.channel.id}, f"round_expire:{rid}")
 
     await interaction.response.send_message(f"Opened roulette round {rlabel}.", ephemeral=True)
 
@@ -1428,13 +2022,11 @@ async def eh_table(interaction: discord.Interaction):
     if not o:
         return await interaction.response.send_message("No open round in this channel.", ephemeral=True)
     rid, exp = o
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("SELECT COUNT(*), COALESCE(SUM(stake),0) FROM bets WHERE rid=?", (rid,))
-        cnt, pool = c.fetchone()
+    snap = STORE.round_snapshot(rid, latest=0)
+    cnt, pool, rlabel = snap.bet_count, snap.pool, snap.label
     remain = max(0, int((exp - now_local()).total_seconds()))
     await interaction.response.send_message(
-        f"Round **{ClaimView.get_round_label(rid)}** — Bets: **{cnt}** | Pool: **{pool}** | Time left: **{remain}s**",
+        f"Round **{rlabel or rid}** — Bets: **{cnt}** | Pool: **{pool}** | Time left: **{remain}s**",
         ephemeral=True
     )
 
@@ -1449,59 +2041,24 @@ async def eh_resolve(interaction: discord.Interaction):
         return await interaction.response.send_message("No round found to resolve in this channel.", ephemeral=True)
     rid, _exp = o
 
-    # roll an outcome with a reproducible seed
-    seed = f"ROUL-{rid}-{int(now_local().timestamp())}-{random.randint(1, 1_000_000)}"
-    random.seed(seed)
-    roll = random.randint(0, 36)  # 0 = green
-    red_nums = {1,3,5,7,9,12,14,16,18,19,21,23,25,27,30,32,34,36}
-    if roll == 0:
-        outcome = "green"
-        multiplier = PAYOUT_GREEN
-    else:
-        outcome = "red" if roll in red_nums else "black"
-        multiplier = PAYOUT_RED_BLACK
-
-    # settle
-    total_pool = 0
-    winners = []
-    rows = []
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("SELECT discord_id, choice, stake FROM bets WHERE rid=?", (rid,))
-        rows = c.fetchall()
-        for uid, ch, stake in rows:
-            total_pool += stake
-        for uid, ch, stake in rows:
-            if ch == outcome:
-                win = int(stake * multiplier)
-                c.execute("UPDATE users SET balance=balance+? WHERE discord_id=?", (win, uid))
-                c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
-                          (uid, "payout", win, f"roulette:{rid}|{outcome}", iso(now_local())))
-                winners.append((uid, win))
-        c.execute("UPDATE rounds SET status='RESOLVED', outcome=?, seed=?, resolved_at=? WHERE rid=?",
-                  (outcome, seed, iso(now_local()), rid))
-    set_state(round_key(interaction.channel.id), None)
+    # roll an outcome with a reproducible seed + settle (no-op if the ticker beat us to it)
+    settled = _settle_round(rid)
+    if not settled:
+        return await interaction.response.send_message("Round was already resolved.", ephemeral=True)
+    outcome, pocket, seed, rows, winners, total_pool, msg_id, rlabel = settled
+    ROUND_SCHEDULER.discard(rid)
 
-    # update the original embed (remove buttons)
-    msg_id = None
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("SELECT message_id FROM rounds WHERE rid=?", (rid,))
-        r = c.fetchone()
-        if r and r[0]:
-            msg_id = int(r[0])
-
-    rlabel = ClaimView.get_round_label(rid)
     seed_display = ClaimView.short_seed(seed, 8)
     top_mentions = []
     for uid, _win in sorted(winners, key=lambda x: x[1], reverse=True)[:5]:
-        m = interaction.guild.get_member(int(uid))
+        m = MEMBERS.get(interaction.guild, int(uid))
         top_mentions.append(m.mention if m else f"<@{uid}>")
 
     # --- Casino-style result embed ---
     result_embed = build_roulette_result_embed(
         rlabel=rlabel,
         outcome=outcome,
+        pocket=pocket,
         total_bets=len(rows),
         total_pool=total_pool,
         winners_mentions=top_mentions,
@@ -1513,7 +2070,7 @@ async def eh_resolve(interaction: discord.Interaction):
             msg = await interaction.channel.fetch_message(msg_id)
             e = msg.embeds[0] if msg.embeds else discord.Embed(color=_result_color(outcome))
             e.title = f"🎯 Roulette — Round {rlabel}"
-            e.description = f"**RESULT:** {outcome.upper()}"
+            e.description = f"**RESULT:** {pocket} {outcome.upper()}"
             e.set_footer(text=f"Seed: {seed_display}")
             await msg.edit(embed=e, view=None)
         except Exception:
@@ -1532,17 +2089,13 @@ async def eh_cancelround(interaction: discord.Interaction):
     if not o:
         return await interaction.response.send_message("No open round to cancel.", ephemeral=True)
     rid, _ = o
+    ROUND_SCHEDULER.discard(rid)
     set_state(round_key(interaction.channel.id), None)
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("SELECT discord_id, stake FROM bets WHERE rid=?", (rid,))
-        rows = c.fetchall()
-        for uid, stake in rows:
-            c.execute("UPDATE users SET balance=balance+? WHERE discord_id=?", (stake, uid))
-            c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
-                      (uid, "payout", stake, f"roulette:{rid}|refund", iso(now_local())))
-        c.execute("UPDATE rounds SET status='CANCELLED', resolved_at=? WHERE rid=?", (iso(now_local()), rid))
-    await interaction.response.send_message(f"Round **{ClaimView.get_round_label(rid)}** cancelled and bets refunded.", ephemeral=True)
+    cancelled = STORE.cancel_round(rid, refund_meta=f"roulette:{rid}|refund")
+    if cancelled is None:
+        return await interaction.response.send_message("That round has already been settled.", ephemeral=True)
+    rlabel = cancelled.round.label or rid
+    await interaction.response.send_message(f"Round **{rlabel}** cancelled and bets refunded.", ephemeral=True)
 
 # ---- Lotto ----
 @bot.tree.command(name="eh_buyticket", description="Buy tickets for this week’s Lotto")
@@ -1552,104 +2105,117 @@ async def eh_buyticket(interaction: discord.Interaction, count: int = 1):
         return await interaction.response.send_message("You can buy between 1 and 100 tickets at once.", ephemeral=True)
     uid = str(interaction.user.id)
     cost = TICKET_COST * count
-    bal = get_balance(uid)
-    if bal < cost:
-        return await interaction.response.send_message(f"Not enough coins. Need **{cost}**, you have **{bal}**.", ephemeral=True)
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("UPDATE users SET balance=balance-? WHERE discord_id=?", (cost, uid))
-        c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
-                  (uid, "redeem", -cost, f"tickets {count}", iso(now_local())))
-        wk = week_id()
-        for _ in range(count):
-            c.execute("INSERT INTO tickets(week_id,discord_id,ts) VALUES(?,?,?)", (wk, uid, iso(now_local())))
-    await interaction.response.send_message(f"🎟️ Bought **{count}** ticket(s) for this week’s Lotto. Good luck!", ephemeral=True)
+    try:
+        with db_tx():  # the week can't be drawn between picking it and issuing the tickets
+            wk, draw_dt = _ticket_week()
+            STORE.buy_tickets(uid, wk, count, cost)
+    except InsufficientFunds as e:
+        return await interaction.response.send_message(f"Not enough coins. Need **{cost}**, you have **{e.balance}**.", ephemeral=True)
+    await interaction.response.send_message(
+        f"🎟️ Bought **{count}** ticket(s) for the Week {wk} Lotto (draw {draw_dt.strftime('%a %d %b, %I:%M %p')}). "
+        f"Good luck!", ephemeral=True)
 
 @bot.tree.command(name="eh_lotto", description="Show weekly lotto status")
 async def eh_lotto(interaction: discord.Interaction):
-    wk = week_id()
+    wk, draw_dt = _ticket_week()
     uid = str(interaction.user.id)
-    draw_dt = next_draw_dt()
     draw_str = draw_dt.strftime("%a %d %b %Y • %I:%M %p %Z")
     left = human_left(draw_dt)
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("SELECT COUNT(*) FROM tickets WHERE week_id=?", (wk,))
-        total = c.fetchone()[0]
-        c.execute("SELECT COUNT(*) FROM tickets WHERE week_id=? AND discord_id=?", (wk, uid))
-        mine = c.fetchone()[0]
+    total, mine = STORE.ticket_counts(wk, uid)
     await interaction.response.send_message(
         f"🎟️ **Weekly Lotto** — Week {wk}\n"
         f"Draw: **{draw_str}** _(in {left})_\n"
         f"Total tickets: **{total}** • Your tickets: **{mine}**\n"
-        f"Prize: **{LOTTO_WL_COUNT} WL gifts** from **{SHOP_NAME}** to **{LOTTO_WINNERS}** winner.",
+        f"Prize: **{LOTTO_WL_COUNT} WL gifts** from **{SHOP_NAME}** to each of **{LOTTO_WINNERS}** "
+        f"winner{'s' if LOTTO_WINNERS != 1 else ''}.",
         ephemeral=True
     )
 
+def _ticket_week() -> tuple[str, datetime]:
+    """(week, draw time) that tickets sold now take part in: the next scheduled draw's week, or the
+    following one if that week has already been drawn (early by /eh_drawlotto)."""
+    draw_dt = next_draw_dt()
+    wk = week_id(draw_dt.astimezone(TZ))
+    if STORE.lotto_drawn(wk):
+        draw_dt += timedelta(days=7)
+        wk = week_id(draw_dt.astimezone(TZ))
+    return wk, draw_dt
+
+def _draw_lotto(wk: str, announce_channel_id: int = 0, winners: int = LOTTO_WINNERS):
+    """Draw week `wk` at most once. Returns [(winner_id, prize_id)] in draw order, or None if
+    there were no tickets or the week was already drawn (see STORE.draw_lotto). With
+    announce_channel_id, the winner posts are queued as a job in the same transaction so they
+    survive a crash right after the draw."""
+    seed = new_seed("LOTTO", wk, time.time())
+    with db_tx() as conn:
+        drawn = STORE.draw_lotto(wk, seed, winners, LOTTO_WL_COUNT, SHOP_NAME)
+        if drawn and announce_channel_id:
+            enqueue_job("lotto_announce", int(time.time()),
+                        {"week": wk, "channel_id": announce_channel_id, "winners": drawn},
+                        f"lotto_announce:{wk}", conn=conn)
+    return drawn
+
+def _lotto_winner_embed(guild: discord.Guild | None, winner_id: str, place: int = 1, of: int = 1) -> discord.Embed:
+    member = MEMBERS.get(guild, int(winner_id))
+    mention = member.mention if member else f"<@{winner_id}>"
+    return discord.Embed(
+        title="🎉 Weekly Lotto Winner!" + (f" ({place}/{of})" if of > 1 else ""),
+        description=f"{mention} wins **{LOTTO_WL_COUNT}** wishlist gifts from **[{SHOP_NAME}]({SHOP_YAELI_URL})**.",
+        color=discord.Color.gold()
+    )
+
 @bot.tree.command(name="eh_drawlotto", description="(Admin) Draw this week’s lotto")
 @app_commands.default_permissions(manage_guild=True)
-async def eh_drawlotto(interaction: discord.Interaction):
+@app_commands.describe(winners=f"How many winners (1-{LOTTO_MAX_WINNERS}, default {LOTTO_WINNERS})")
+async def eh_drawlotto(interaction: discord.Interaction, winners: int | None = None):
     if not user_is_admin(interaction.user):
         return await interaction.response.send_message("You don’t have permission.", ephemeral=True)
+    winners = max(1, min(winners or LOTTO_WINNERS, LOTTO_MAX_WINNERS))
     wk = week_id()
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("SELECT id, discord_id FROM tickets WHERE week_id=?", (wk,))
-        all_tix = c.fetchall()
-    if not all_tix:
+    if STORE.lotto_drawn(wk):
+        return await interaction.response.send_message(f"Week {wk} has already been drawn.", ephemeral=True)
+    drawn = _draw_lotto(wk, winners=winners)
+    if not drawn:
         return await interaction.response.send_message(f"No tickets for Week {wk}.", ephemeral=True)
-    seed = f"LOTTO-{wk}-{int(now_local().timestamp())}-{random.randint(1, 1_000_000)}"
-    random.seed(seed)
-    winner_ticket = random.choice(all_tix)
-    winner_id = winner_ticket[1]
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("INSERT INTO lotto_draws(week_id,run_at,winner_id,seed,status) VALUES(?,?,?,?,?)",
-                  (wk, iso(now_local()), winner_id, seed, "DONE"))
-        c.execute("""INSERT INTO prizes(winner_id,kind,amount,meta,status,created_ts,updated_ts)
-                     VALUES(?,?,?,?,?,?,?)""",
-                  (winner_id, "wl", LOTTO_WL_COUNT, json.dumps({"shop": SHOP_NAME, "week": wk}), "pending", iso(now_local()), iso(now_local())))
-        prize_id = c.lastrowid
-    member = interaction.guild.get_member(int(winner_id))
-    mention = member.mention if member else f"<@{winner_id}>"
-    embed = discord.Embed(
-        title="🎉 Weekly Lotto Winner!",
-        description=f"{mention} wins **{LOTTO_WL_COUNT}** wishlist gifts from **[{SHOP_NAME}]({SHOP_YAELI_URL})**.",
-        color=discord.Color.gold()
-    )
-    # Post winner publicly with claim button, respond ephemeral to admin
-    await interaction.channel.send(embed=embed, view=ClaimView(prize_id))
-    await interaction.response.send_message("Winner posted.", ephemeral=True)
+    # ack first (several posts can take a while), then one public post + claim button per winner
+    await interaction.response.send_message(
+        f"Drew **{len(drawn)}** winner{'s' if len(drawn) != 1 else ''}" +
+        (f" (only {len(drawn)} ticket holders)." if len(drawn) < winners else "."), ephemeral=True)
+    for place, (winner_id, prize_id) in enumerate(drawn, 1):
+        await interaction.channel.send(embed=_lotto_winner_embed(interaction.guild, winner_id, place, len(drawn)),
+                                       view=ClaimView(prize_id))
 
 # ---- Prize fulfilment ----
+# Queue items are leased to one admin at a time (see STORE.lease_fulfilments), so two staff
+# members never gift the same claim; an expired lease makes the item available again.
+def _lease_fulfilments(admin_id: str, n: int) -> tuple[list[Fulfilment], int]:
+    """Lease the oldest `n` free items to `admin_id`. Returns (items in queue order, lease_until)."""
+    now_ts = int(time.time())
+    until = now_ts + FULFIL_LEASE_SECONDS
+    return STORE.lease_fulfilments(admin_id, n, now_ts, until), until
+
+def _fulfil_line(item: Fulfilment) -> str:
+    imvu_link = item.imvu_profile or f"https://www.imvu.com/catalog/web_mypage.php?av={item.imvu_name}"
+    try:
+        shop = json.loads(item.meta or "{}").get("shop", SHOP_NAME)
+    except Exception:
+        shop = SHOP_NAME
+    return (f"Queue **#{item.queue_id}** → Prize **#{item.prize_id}** for <@{item.winner_id}>\n"
+            f"IMVU: **{item.imvu_name}** • {imvu_link}\n"
+            f"Gifts to send: **{item.amount}** from **{shop}**")
+
+
 @bot.tree.command(name="eh_fulfil_next", description="(Admin) Show next WL claim to fulfil")
 @app_commands.default_permissions(manage_guild=True)
 async def eh_fulfil_next(interaction: discord.Interaction):
     if not user_is_admin(interaction.user):
         return await interaction.response.send_message("You don’t have permission.", ephemeral=True)
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("""SELECT pq.id, pq.prize_id, pq.winner_id, pq.imvu_name, pq.imvu_profile, p.amount, p.meta
-                     FROM prize_queue pq
-                     JOIN prizes p ON p.id = pq.prize_id
-                     WHERE pq.status='ready'
-                     ORDER BY pq.created_ts ASC
-                     LIMIT 1""")
-        row = c.fetchone()
-    if not row:
+    rows, _until = _lease_fulfilments(str(interaction.user.id), 1)
+    if not rows:
         return await interaction.response.send_message("No pending WL claims to fulfil.", ephemeral=True)
-    pq_id, prize_id, winner_id, imvu_name, imvu_profile, amount, meta = row
-    imvu_link = imvu_profile or f"https://www.imvu.com/catalog/web_mypage.php?av={imvu_name}"
-    meta_obj = {}
-    try:
-        meta_obj = json.loads(meta or "{}")
-    except Exception:
-        pass
     await interaction.response.send_message(
-        f"Fulfil queue **#{pq_id}** → Prize **#{prize_id}** for <@{winner_id}>\n"
-        f"IMVU: **{imvu_name}** • {imvu_link}\n"
-        f"Gifts to send: **{amount}** from **{meta_obj.get('shop', SHOP_NAME)}**\n"
-        f"After gifting, run `/eh_fulfil_done {pq_id}`.",
+        f"{_fulfil_line(rows[0])}\n"
+        f"After gifting, run `/eh_fulfil_done {rows[0].queue_id}`.",
         ephemeral=True
     )
 
@@ -1659,17 +2225,224 @@ async def eh_fulfil_next(interaction: discord.Interaction):
 async def eh_fulfil_done(interaction: discord.Interaction, queue_id: int):
     if not user_is_admin(interaction.user):
         return await interaction.response.send_message("You don’t have permission.", ephemeral=True)
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("SELECT prize_id FROM prize_queue WHERE id=?", (queue_id,))
-        row = c.fetchone()
-        if not row:
-            return await interaction.response.send_message("Queue ID not found.", ephemeral=True)
-        prize_id = row[0]
-        c.execute("UPDATE prize_queue SET status='fulfilled', updated_ts=? WHERE id=?", (iso(now_local()), queue_id))
-        c.execute("UPDATE prizes SET status='fulfilled', updated_ts=? WHERE id=?", (iso(now_local()), prize_id))
+    if not STORE.complete_fulfilments(str(interaction.user.id), [queue_id], int(time.time())):
+        return await interaction.response.send_message(
+            "Queue ID not found, already fulfilled, or being worked on by another admin.", ephemeral=True)
     await interaction.response.send_message(f"Marked fulfilment queue **#{queue_id}** as fulfilled ✅", ephemeral=True)
 
+class FulfilBatchView(GuildView):
+    """The items leased by /eh_fulfil_batch, FULFIL_PAGE_SIZE per page: a done button per item,
+    plus page navigation and "page done" / "all done" (each commit is one transaction)."""
+
+    def __init__(self, admin_id: str, rows: list[Fulfilment], lease_until: int):
+        super().__init__(timeout=FULFIL_LEASE_SECONDS)
+        self.admin_id = admin_id
+        self.rows = rows
+        self.lease_until = lease_until
+        self.done: set[int] = set()
+        self.page = 0
+        self._render()
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-len(self.rows) // FULFIL_PAGE_SIZE))
+
+    def _on_page(self) -> list[Fulfilment]:
+        return self.rows[self.page * FULFIL_PAGE_SIZE:(self.page + 1) * FULFIL_PAGE_SIZE]
+
+    def _button(self, label: str, style: discord.ButtonStyle, row: int, callback, disabled: bool = False):
+        btn = discord.ui.Button(label=label, style=style, row=row, disabled=disabled)
+        btn.callback = callback
+        self.add_item(btn)
+
+    def _render(self):
+        self.clear_items()
+        for r in self._on_page():
+            pq_id = r.queue_id
+            self._button(f"#{pq_id} done", discord.ButtonStyle.success, 0,
+                         lambda i, q=pq_id: self._complete(i, [q]), disabled=pq_id in self.done)
+        pending = [r.queue_id for r in self._on_page() if r.queue_id not in self.done]
+        self._button("◀", discord.ButtonStyle.secondary, 1, lambda i: self._turn(i, -1), disabled=self.page == 0)
+        self._button("▶", discord.ButtonStyle.secondary, 1, lambda i: self._turn(i, 1),
+                     disabled=self.page >= self.pages - 1)
+        self._button("Page done", discord.ButtonStyle.primary, 1, lambda i: self._complete(i, self._pending(True)),
+                     disabled=not pending)
+        self._button("All done", discord.ButtonStyle.primary, 1, lambda i: self._complete(i, self._pending(False)),
+                     disabled=len(self.done) == len(self.rows))
+        self._button("Release rest", discord.ButtonStyle.danger, 1, self._release,
+                     disabled=len(self.done) == len(self.rows))
+
+    def _pending(self, page_only: bool) -> list[int]:
+        return [r.queue_id for r in (self._on_page() if page_only else self.rows) if r.queue_id not in self.done]
+
+    def embed(self, note: str = "") -> discord.Embed:
+        lines = []
+        for r in self._on_page():
+            mark = "✅ " if r.queue_id in self.done else ""
+            lines.append(mark + _fulfil_line(r))
+        e = discord.Embed(title="🎁 WL fulfilment batch", description=("\n\n".join(lines) or "—"),
+                          color=discord.Color.gold())
+        e.set_footer(text=f"Page {self.page + 1}/{self.pages} · {len(self.done)}/{len(self.rows)} done · "
+                          f"leased to you until {datetime.fromtimestamp(self.lease_until, TZ):%H:%M}"
+                          + (f" · {note}" if note else ""))
+        return e
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        await super().interaction_check(interaction)
+        if str(interaction.user.id) != self.admin_id:
+            await interaction.response.send_message("This batch is leased to another admin.", ephemeral=True)
+            return False
+        return True
+
+    async def _turn(self, interaction: discord.Interaction, step: int):
+        self.page = max(0, min(self.page + step, self.pages - 1))
+        self._render()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    async def _complete(self, interaction: discord.Interaction, queue_ids: list[int]):
+        marked = STORE.complete_fulfilments(self.admin_id, queue_ids, int(time.time()))
+        self.done.update(queue_ids)  # skipped ones are finished or someone else's now; either way not ours
+        skipped = len(queue_ids) - len(marked)
+        self._render()
+        note = f"{len(marked)} marked" + (f", {skipped} skipped (lease lost or already done)" if skipped else "")
+        if len(self.done) == len(self.rows):
+            self.stop()
+        await interaction.response.edit_message(embed=self.embed(note), view=self)
+
+    async def _release(self, interaction: discord.Interaction):
+        rest = self._pending(False)
+        STORE.release_fulfilments(self.admin_id, rest)
+        self.stop()
+        self.clear_items()
+        await interaction.response.edit_message(embed=self.embed(f"released {len(rest)} back to the queue"), view=None)
+
+@bot.tree.command(name="eh_fulfil_batch", description="(Admin) Lease the next WL claims to fulfil, as one list")
+@app_commands.default_permissions(manage_guild=True)
+@app_commands.describe(count=f"How many claims to take (1-{FULFIL_BATCH_MAX}, default 10)")
+async def eh_fulfil_batch(interaction: discord.Interaction, count: int = 10):
+    if not user_is_admin(interaction.user):
+        return await interaction.response.send_message("You don’t have permission.", ephemeral=True)
+    admin_id = str(interaction.user.id)
+    rows, until = _lease_fulfilments(admin_id, max(1, min(count, FULFIL_BATCH_MAX)))
+    if not rows:
+        return await interaction.response.send_message(
+            "No WL claims to fulfil (or the rest are leased to other admins).", ephemeral=True)
+    view = FulfilBatchView(admin_id, rows, until)
+    await interaction.response.send_message(embed=view.embed(), view=view, ephemeral=True)
+
+# ---- Withdraw review dashboard ----
+WITHDRAW_PAGE_SIZE = 10
+
+class WithdrawDashboardView(KeysetPageView):
+    """Pending WL withdrawals across the guild, oldest first, with whether each user can still cover
+    it. Select some (or none = every payable request on the page), then approve or reject them in bulk."""
+    page_size = WITHDRAW_PAGE_SIZE
+
+    def __init__(self, admin_id: str):
+        super().__init__(admin_id)
+        self.pending = 0
+        self.picker = discord.ui.Select(placeholder="Select requests (none = all payable on this page)",
+                                        min_values=0, row=0)
+        self.picker.callback = self._picked
+        self.add_item(self.picker)
+        self.load()
+
+    def _fetch(self, bound, op, limit):
+        rows = STORE.pending_withdrawals(bound, op, limit)
+        self.pending = STORE.count_withdrawals("pending")
+        return rows
+
+    def _key(self, row: PendingWithdrawal):
+        return row.request.created_ts, row.request.id
+
+    def _loaded(self):
+        self.picker.options = [
+            discord.SelectOption(label=f"#{w.id} · {w.coins:,} coins → {w.gifts} WL", value=str(w.id),
+                                 description=f"{w.imvu_name or '?'} · balance {r.balance:,}"
+                                             + ("" if r.payable else " · short"))
+            for r in self.rows for w in (r.request,)
+        ] or [discord.SelectOption(label="Nothing pending", value="0")]
+        self.picker.max_values = max(1, len(self.rows))
+        self.picker.disabled = self.approve.disabled = self.reject.disabled = not self.rows
+
+    def _targets(self, payable_only: bool) -> list[int]:
+        chosen = {int(v) for v in self.picker.values}
+        return [r.request.id for r in self.rows
+                if (r.request.id in chosen if chosen else (r.payable or not payable_only))]
+
+    def embed(self, note: str = "") -> discord.Embed:
+        lines = [f"{'✅' if r.payable else '⚠️'} **#{w.id}** <@{w.discord_id}> · **{w.coins:,}** coins → "
+                 f"**{w.gifts}** WL · balance {r.balance:,} · IMVU `{w.imvu_name or '?'}` · "
+                 f"{str(w.created_ts)[:16].replace('T', ' ')}"
+                 for r in self.rows for w in (r.request,)]
+        e = discord.Embed(title="🧾 Pending WL withdrawals", description="\n".join(lines) or "Nothing pending 🎉",
+                          color=discord.Color.gold())
+        e.set_footer(text=f"{self.pending} pending · ⚠️ = balance too low · oldest first"
+                          + (f" · {note}" if note else ""))
+        return e
+
+    async def _picked(self, interaction: discord.Interaction):
+        await interaction.response.defer()
+
+    @discord.ui.button(label="Approve", style=discord.ButtonStyle.success, row=1)
+    async def approve(self, interaction: discord.Interaction, button: discord.ui.Button):
+        ids = self._targets(payable_only=True)
+        if not ids:
+            return await interaction.response.send_message("No payable requests on this page.", ephemeral=True)
+        tickets = {r.request.id: (r.request.ticket_channel_id, r.request.message_id) for r in self.rows}
+        reviewer = str(interaction.user.id)
+        with db_tx():
+            results = {rid: _approve_withdrawal(rid, reviewer, "bulk approve") for rid in ids}
+        done = [rid for rid, (res, _bal) in results.items() if res == "approved"]
+        short = sum(res == "insufficient" for res, _bal in results.values())
+        self.reload()
+        note = f"approved {len(done)}" + (f", {short} short of coins" if short else "") \
+            + (f", {len(ids) - len(done) - short} already handled" if len(ids) - len(done) - short else "")
+        await interaction.response.edit_message(embed=self.embed(note), view=self)
+        for rid in done:
+            asyncio.create_task(_stamp_withdraw_ticket(interaction.guild, *tickets[rid],
+                                                       f"✅ **Approved** by {interaction.user.mention} (bulk)"))
+
+    @discord.ui.button(label="Reject…", style=discord.ButtonStyle.danger, row=1)
+    async def reject(self, interaction: discord.Interaction, button: discord.ui.Button):
+        ids = self._targets(payable_only=False)
+        await interaction.response.send_modal(BulkRejectWithdrawModal(self, ids))
+
+    @discord.ui.button(label="Refresh", style=discord.ButtonStyle.secondary, row=4)
+    async def refresh(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.reload()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+class BulkRejectWithdrawModal(GuildModal, title="Reject WL Withdrawals"):
+    reason = discord.ui.TextInput(label="Reason (shown to users)", required=True, max_length=200)
+
+    def __init__(self, view: WithdrawDashboardView, ids: list[int]):
+        super().__init__(timeout=180)
+        self.view, self.ids = view, ids
+        self.title = f"Reject {len(ids)} WL withdrawal{'s' if len(ids) != 1 else ''}"
+
+    async def on_submit(self, interaction: discord.Interaction):
+        tickets = {r.request.id: (r.request.ticket_channel_id, r.request.message_id) for r in self.view.rows}
+        reviewer = str(interaction.user.id)
+        with db_tx():
+            done = [rid for rid in self.ids if STORE.reject_withdrawal(rid, reviewer, str(self.reason))]
+        self.view.reload()
+        skipped = len(self.ids) - len(done)
+        note = f"rejected {len(done)}" + (f", {skipped} already handled" if skipped else "")
+        await interaction.response.edit_message(embed=self.view.embed(note), view=self.view)
+        for rid in done:
+            asyncio.create_task(_stamp_withdraw_ticket(interaction.guild, *tickets.get(rid, (None, None)),
+                                                       f"❌ **Rejected** by {interaction.user.mention}\n"
+                                                       f"Reason: {str(self.reason)}"))
+
+@bot.tree.command(name="eh_withdrawals", description="(Admin) Review pending WL withdrawals, in bulk")
+@app_commands.default_permissions(manage_guild=True)
+async def eh_withdrawals(interaction: discord.Interaction):
+    if not user_is_admin(interaction.user):
+        return await interaction.response.send_message("You don’t have permission.", ephemeral=True)
+    view = WithdrawDashboardView(str(interaction.user.id))
+    await interaction.response.send_message(embed=view.embed(), view=view, ephemeral=True)
+
 # ---- Utilities ----
 @bot.tree.command(name="eh_roundreset", description="(Admin) Force-unlock this channel if a round is stuck")
 @app_commands.default_permissions(manage_guild=True)
@@ -1679,17 +2452,807 @@ async def eh_roundreset(interaction: discord.Interaction):
     rid = get_state(round_key(interaction.channel.id))
     if not rid:
         return await interaction.response.send_message("No open round to reset (state already clear).", ephemeral=True)
+    STORE.cancel_round(rid)  # stuck OPEN rounds only; a settled one keeps its result
+    rlabel = ClaimView.get_round_label(rid)
+    ROUND_SCHEDULER.discard(rid)
+    set_state(round_key(interaction.channel.id), None)
+    await interaction.response.send_message(f"Force-reset round **{rlabel}** — channel unlocked.", ephemeral=True)
+
+# ---------------- Scheduled jobs ----------------
+# Durable queue: rows in `jobs` survive restarts, so anything that came due while we
+# were down runs on the next start. `dedupe_key` makes enqueueing idempotent and the
+# lease stops a second worker (or a restarted one) from running the same job twice.
+JOB_HANDLERS: dict = {}
+JOB_WAKE = asyncio.Event()
+JOB_TASK: asyncio.Task | None = None
+
+def job_handler(kind: str):
+    def deco(fn):
+        JOB_HANDLERS[kind] = fn
+        return fn
+    return deco
+
+def enqueue_job(kind: str, due_ts: int, payload: dict | None = None,
+                dedupe_key: str | None = None, conn: sqlite3.Connection | None = None) -> bool:
+    """Queue a job (no-op if dedupe_key already exists). Pass `conn` to join the caller's transaction."""
+    sql = """INSERT OR IGNORE INTO jobs(kind,payload,dedupe_key,due_ts,status,attempts,created_ts,updated_ts)
+             VALUES(?,?,?,?,'pending',0,?,?)"""
+    args = (kind, json.dumps(payload or {}), dedupe_key, int(due_ts), iso(now_local()), iso(now_local()))
+    if conn is not None:
+        added = conn.execute(sql, args).rowcount == 1
+    else:
+        with db() as c:
+            added = c.execute(sql, args).rowcount == 1
+    if added and due_ts <= time.time():
+        JOB_WAKE.set()
+    return added
+
+def _lease_next_job(now_ts: int):
+    with db_tx() as conn:
+        c = conn.cursor()
+        c.execute("""SELECT id, kind, payload, attempts FROM jobs
+                     WHERE status='pending' AND due_ts<=? AND (lease_until IS NULL OR lease_until<=?)
+                     ORDER BY due_ts LIMIT 1""", (now_ts, now_ts))
+        row = c.fetchone()
+        if not row:
+            return None
+        job_id, kind, payload, attempts = row
+        c.execute("UPDATE jobs SET attempts=attempts+1, lease_until=?, updated_ts=? WHERE id=?",
+                  (now_ts + JOB_LEASE_SECONDS, iso(now_local()), job_id))
+    return job_id, kind, json.loads(payload or "{}"), attempts + 1
+
+def _finish_job(job_id: int, attempts: int, error: str | None = None):
+    with db() as conn:
+        if error is None:
+            conn.execute("UPDATE jobs SET status='done', lease_until=NULL, updated_ts=? WHERE id=?",
+                         (iso(now_local()), job_id))
+        elif attempts >= JOB_MAX_ATTEMPTS:
+            conn.execute("UPDATE jobs SET status='failed', lease_until=NULL, last_error=?, updated_ts=? WHERE id=?",
+                         (error[:500], iso(now_local()), job_id))
+        else:
+            retry_at = int(time.time()) + 30 * 2 ** attempts
+            conn.execute("UPDATE jobs SET due_ts=?, lease_until=NULL, last_error=?, updated_ts=? WHERE id=?",
+                         (retry_at, error[:500], iso(now_local()), job_id))
+
+def _lotto_guild_id() -> int | None:
+    channel = bot.get_channel(LOTTO_CHANNEL_ID) if LOTTO_CHANNEL_ID else None
+    return _channel_guild_id(channel) if channel else None
+
+def _schedule_lotto_draw():
+    draw_dt = next_draw_dt()
+    wk = week_id(draw_dt.astimezone(TZ))
+    enqueue_job("lotto_draw", int(draw_dt.timestamp()), {"week": wk, "channel_id": LOTTO_CHANNEL_ID},
+                f"lotto_draw:{wk}")
+
+def _schedule_recurring_jobs():
+    """Per shard: daily cleanup everywhere, the lotto draw in the guild that owns LOTTO_CHANNEL_ID.
+    Every key is per slot, so this is safe to call any time; the worker calls it for every shard
+    at start and each JOB_RESCHEDULE_SECONDS, which also restarts a chain whose job ended up failed."""
+    if LOTTO_CHANNEL_ID and _lotto_guild_id() == CURRENT_GUILD.get():
+        _schedule_lotto_draw()
+    enqueue_job("cleanup", int(time.time()), {}, f"cleanup:{now_local().date().isoformat()}")
+    slot = int(time.time()) // RECON_INTERVAL * RECON_INTERVAL
+    enqueue_job("reconcile", slot, {}, f"reconcile:{slot}")
+    if BACKUP_INTERVAL > 0:
+        slot = int(time.time()) // BACKUP_INTERVAL * BACKUP_INTERVAL
+        enqueue_job("backup", slot, {}, f"backup:{slot}")
+
+def _lease_any_job(now_ts: int):
+    """Next due job from any shard -> (guild_id, job) or None."""
+    for gid in shard_ids():
+        try:
+            with guild_scope(gid):
+                job = _lease_next_job(now_ts)
+        except Exception:
+            traceback.print_exc()
+            continue
+        if job:
+            return gid, job
+    return None
+
+def _schedule_all_shards():
+    for gid in shard_ids():
+        try:
+            with guild_scope(gid):
+                _schedule_recurring_jobs()
+        except Exception:
+            traceback.print_exc()
+
+async def _job_worker():
+    rescheduled = 0.0
+    while True:
+        if time.monotonic() - rescheduled >= JOB_RESCHEDULE_SECONDS:
+            _schedule_all_shards()
+            rescheduled = time.monotonic()
+        JOB_WAKE.clear()
+        leased = _lease_any_job(int(time.time()))
+        if not leased:
+            try:
+                await asyncio.wait_for(JOB_WAKE.wait(), JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        gid, (job_id, kind, payload, attempts) = leased
+        handler = JOB_HANDLERS.get(kind)
+        with guild_scope(gid):  # handlers (and their follow-up jobs) stay in the job's shard
+            try:
+                if handler is None:
+                    raise RuntimeError(f"no handler for job kind '{kind}'")
+                await handler(payload)
+            except Exception as e:
+                print(f"[EliHaus] Job #{job_id} ({kind}) in guild {gid} failed (attempt {attempts}): {e!r}")
+                _finish_job(job_id, attempts, f"{type(e).__name__}: {e}")
+            else:
+                _finish_job(job_id, attempts)
+
+async def _get_channel(channel_id: int):
+    return bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+
+@job_handler("lotto_draw")
+async def _job_lotto_draw(payload: dict):
+    _schedule_lotto_draw()  # next Saturday's, queued first so a failing draw can't end the schedule
+    _draw_lotto(payload["week"], announce_channel_id=int(payload["channel_id"]))
+
+@job_handler("lotto_announce")
+async def _job_lotto_announce(payload: dict):
+    channel = await _get_channel(int(payload["channel_id"]))
+    winners = payload.get("winners") or [(payload["winner_id"], payload["prize_id"])]  # pre-multi-winner jobs
+    # places already posted by an earlier attempt are skipped on retry (posts go out in order)
+    sent_key = f"lotto_announced:{payload.get('week') or 'prize' + str(winners[0][1])}"
+    sent = int(get_state(sent_key) or 0)
+    for place, (winner_id, prize_id) in enumerate(winners, 1):
+        if place <= sent:
+            continue
+        embed = _lotto_winner_embed(getattr(channel, "guild", None), winner_id, place, len(winners))
+        await channel.send(embed=embed, view=ClaimView(int(prize_id), timeout=None))
+        set_state(sent_key, str(place), ttl=JOB_RETENTION_DAYS * 86400)
+
+@job_handler("round_expire")
+async def _job_round_expire(payload: dict):
+    rid = payload["rid"]
+    if rid in ROUND_SCHEDULER:
+        return  # live ticker still owns it
+    try:
+        channel = await _get_channel(int(payload["channel_id"]))
+    except discord.HTTPException:
+        channel = None
+    if channel is not None:
+        await _auto_resolve_round(channel, rid)
+    else:
+        _settle_round(rid)
+
+@job_handler("cleanup")
+async def _job_cleanup(payload: dict):
+    tomorrow = (now_local() + timedelta(days=1)).replace(hour=4, minute=0, second=0, microsecond=0)
+    enqueue_job("cleanup", int(tomorrow.timestamp()), {}, f"cleanup:{tomorrow.date().isoformat()}")
+    cutoff = int(time.time()) - JOB_RETENTION_DAYS * 86400
+    with db() as conn:
+        conn.execute("DELETE FROM jobs WHERE status IN ('done','failed') AND due_ts<?", (cutoff,))
+    gc_state()
+
+# ---------------- Ledger reconciliation ----------------
+# users.balance must always equal SUM(tx.amount) for that user. Each run folds only the tx
+# rows added since the `recon:last_tx_id` checkpoint into per-user running sums, in id-ordered
+# batches (memory stays flat however long the ledger is), then flags users whose balance
+# disagrees in `ledger_drift`.
+RECON_BATCH = 5000
+RECON_INTERVAL = 3600  # seconds between scheduled runs
+
+def _fold_ledger_batch(c: sqlite3.Cursor) -> int:
+    after = int(get_state("recon:last_tx_id") or 0)
+    c.execute("""SELECT discord_id, SUM(amount), COUNT(*), MAX(id) FROM
+                 (SELECT id, discord_id, amount FROM tx WHERE id>? ORDER BY id LIMIT ?)
+                 GROUP BY discord_id""", (after, RECON_BATCH))
+    rows = c.fetchall()
+    if not rows:
+        return 0
+    c.executemany("""INSERT INTO ledger_sums(discord_id,total) VALUES(?,?)
+                     ON CONFLICT(discord_id) DO UPDATE SET total=total+excluded.total""",
+                  [(uid, total) for uid, total, _n, _last in rows])
+    set_state("recon:last_tx_id", str(max(r[3] for r in rows)))
+    return sum(r[2] for r in rows)
+
+def _flag_drift(c: sqlite3.Cursor) -> list[tuple]:
+    ts = iso(now_local())
+    c.execute("""SELECT u.discord_id, u.balance, COALESCE(s.total, 0)
+                 FROM users u LEFT JOIN ledger_sums s ON s.discord_id = u.discord_id
+                 WHERE u.balance != COALESCE(s.total, 0)""")
+    drift = c.fetchall()
+    c.executemany("""INSERT INTO ledger_drift(discord_id,balance,ledger_total,detected_ts,checked_ts)
+                     VALUES(?,?,?,?,?)
+                     ON CONFLICT(discord_id) DO UPDATE SET balance=excluded.balance,
+                         ledger_total=excluded.ledger_total, checked_ts=excluded.checked_ts""",
+                  [(uid, bal, total, ts, ts) for uid, bal, total in drift])
+    c.execute("DELETE FROM ledger_drift WHERE checked_ts != ?", (ts,))
+    return drift
+
+async def reconcile_ledger() -> tuple[int, list[tuple]]:
+    """Catch the running sums up with the ledger and refresh drift flags.
+    Returns (tx rows folded, [(discord_id, balance, ledger_total), ...])."""
+    folded = 0
+    while True:
+        with db_tx() as conn:
+            c = conn.cursor()
+            n = _fold_ledger_batch(c)
+            folded += n
+            if n < RECON_BATCH:
+                # same transaction as the last batch, so balances and sums are one snapshot
+                return folded, _flag_drift(c)
+        await asyncio.sleep(0)  # let interactions run between catch-up batches
+
+@job_handler("reconcile")
+async def _job_reconcile(payload: dict):
+    slot = (int(time.time()) // RECON_INTERVAL + 1) * RECON_INTERVAL
+    enqueue_job("reconcile", slot, {}, f"reconcile:{slot}")  # next slot first, so a failing pass can't end the schedule
+    folded, drift = await reconcile_ledger()
+    if drift:
+        print(f"[EliHaus] Ledger drift in guild {CURRENT_GUILD.get()}: {len(drift)} user(s) "
+              f"(folded {folded} new tx rows)")
+
+@bot.tree.command(name="eh_reconcile", description="(Admin) Check balances against the coin ledger")
+@app_commands.default_permissions(manage_guild=True)
+async def eh_reconcile(interaction: discord.Interaction):
+    if not user_is_admin(interaction.user):
+        return await interaction.response.send_message("You don’t have permission.", ephemeral=True)
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    folded, drift = await reconcile_ledger()
+    lines = [f"Ledger checked up to tx **#{get_state('recon:last_tx_id') or 0}** "
+             f"({folded} new rows). Users with drift: **{len(drift)}**"]
+    for uid, bal, total in sorted(drift, key=lambda r: abs(r[1] - r[2]), reverse=True)[:10]:
+        lines.append(f"<@{uid}> · balance {bal} · ledger {total} · off by **{bal - total:+}**")
+    await interaction.followup.send("\n".join(lines), ephemeral=True)
+
+# ---------------- Export ----------------
+def _export_files(guild_id: int, tables: list[str], fmt: str, filters: dict) -> list[tuple[str, IO[bytes], int]]:
+    """Runs in a worker thread with its own read-only connection (WAL lets it read alongside the bot).
+    Spools to temp files on disk, so a big history never sits in memory."""
+    conn = sqlite3.connect(f"file:{shard_path(guild_id)}?mode=ro", uri=True)
+    out = []
+    try:
+        for table in tables:
+            f = tempfile.TemporaryFile()
+            rows = export_table(conn, table, fmt, f, **filters)
+            f.seek(0)
+            out.append((f"{table}.{fmt}.gz", f, rows))
+    finally:
+        conn.close()
+    return out
+
+@bot.tree.command(name="eh_export", description="(Admin) Export ledger / game history as gzip'd CSV or JSONL")
+@app_commands.default_permissions(manage_guild=True)
+@app_commands.describe(
+    tables=f"all (default) or a comma list of: {', '.join(EXPORT_TABLES)}",
+    fmt="csv (default) or jsonl",
+    member="Only this member's rows",
+    since="From date, YYYY-MM-DD",
+    until="To date (inclusive), YYYY-MM-DD",
+    game=f"Only one game: {', '.join(GAMES)}"
+)
+async def eh_export(interaction: discord.Interaction, tables: str = "all", fmt: str = "csv",
+                    member: discord.Member | None = None, since: str | None = None,
+                    until: str | None = None, game: str | None = None):
+    if not user_is_admin(interaction.user):
+        return await interaction.response.send_message("You don’t have permission.", ephemeral=True)
+    fmt, game = fmt.lower().strip(), (game.lower().strip() if game else None)
+    try:
+        names = parse_tables(tables)
+        for d in (since, until):
+            if d:
+                datetime.strptime(d, "%Y-%m-%d")
+        if fmt not in FORMATS or (game and game not in GAMES):
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}; game one of {', '.join(GAMES)}")
+    except ValueError as e:
+        return await interaction.response.send_message(f"Invalid export options: {e}", ephemeral=True)
+
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    filters = {"user": str(member.id) if member else None, "since": since, "until": until, "game": game}
+    files = await asyncio.to_thread(_export_files, CURRENT_GUILD.get(), names, fmt, filters)
+    await _send_export(interaction, files)
+
+async def _send_export(interaction: discord.Interaction, files: list[tuple[str, IO[bytes], int]]):
+    """Attach _export_files() output to a followup (the interaction is deferred) and close the files."""
+    try:
+        summary = " · ".join(f"{name}: **{rows}** rows" for name, _f, rows in files)
+        total = sum(os.fstat(f.fileno()).st_size for _n, f, _r in files)
+        limit = interaction.guild.filesize_limit if interaction.guild else 8 * 1024 * 1024
+        if total > limit:
+            return await interaction.followup.send(
+                f"{summary}\nToo big to attach ({total // 1024} KB > {limit // 1024} KB). "
+                f"Narrow the filters or run `python elihaus_export.py --guild {interaction.guild_id}` on the host.",
+                ephemeral=True)
+        await interaction.followup.send(summary, files=[discord.File(f, filename=n) for n, f, _r in files],
+                                        ephemeral=True)
+    finally:
+        for _n, f, _r in files:
+            f.close()
+
+# ---- Transaction history ----
+HISTORY_PAGE_SIZE = 15
+
+async def _send_statement(interaction: discord.Interaction, uid: str, filters: dict):
+    """The member's whole (filtered) tx history as one gzip'd CSV, streamed through a temp file."""
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    files = await asyncio.to_thread(_export_files, CURRENT_GUILD.get(), ["tx"], "csv", {"user": uid, **filters})
+    await _send_export(interaction, [(f"statement_{uid}.csv.gz", f, rows) for _n, f, rows in files])
+
+class HistoryView(KeysetPageView):
+    """One member's tx rows, newest first. Pages are ranges of idx_tx_user_id (discord_id, id), so an
+    old page costs the same as the first; game/kind/date filters are checked on the rows walked."""
+    page_size = HISTORY_PAGE_SIZE
+
+    def __init__(self, owner_id: str, uid: str, filters: dict):
+        super().__init__(owner_id)
+        self.uid, self.filters = uid, filters
+        where, args = build_where("tx", user=uid, **filters)
+        self.sql = f"SELECT id, kind, amount, meta, ts FROM tx WHERE {' AND '.join(where)}"
+        self.params = tuple(args)
+        self.load()
+
+    def _fetch(self, bound, op, limit):
+        with db() as conn:
+            return keyset_rows(conn.cursor(), self.sql, self.params, "id", bound, op, limit, desc=True)
+
+    def _key(self, row):
+        return (row[0],)
+
+    def embed(self, note: str = "") -> discord.Embed:
+        lines = [f"`#{tx_id}` {str(ts)[:16].replace('T', ' ')} · **{amount:+,}** {kind}"
+                 + (f" · {str(meta)[:60]}" if meta else "")
+                 for tx_id, kind, amount, meta, ts in self.rows]
+        shown = ", ".join(f"{k}: {v}" for k, v in self.filters.items() if v)
+        e = discord.Embed(title="📒 Coin history", description=f"<@{self.uid}>\n" + ("\n".join(lines) or "_No matching transactions._"),
+                          color=discord.Color.gold())
+        e.set_footer(text="Newest first" + (f" · {shown}" if shown else "") + (f" · {note}" if note else ""))
+        return e
+
+    @discord.ui.button(label="Statement (.csv.gz)", style=discord.ButtonStyle.primary, row=4)
+    async def statement(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await _send_statement(interaction, self.uid, self.filters)
+
+@bot.tree.command(name="eh_history", description="Your coin transactions, newest first (or download a statement)")
+@app_commands.describe(
+    game=f"Only one game: {', '.join(GAMES)}",
+    kind=f"Only one kind: {', '.join(sorted(ALLOWED_TX_KINDS))}",
+    since="From date, YYYY-MM-DD",
+    until="To date (inclusive), YYYY-MM-DD",
+    statement="Download the full (filtered) history as a gzip'd CSV instead",
+    member="(Admin) Someone else's history"
+)
+async def eh_history(interaction: discord.Interaction, game: str | None = None, kind: str | None = None,
+                     since: str | None = None, until: str | None = None, statement: bool = False,
+                     member: discord.Member | None = None):
+    if member and member.id != interaction.user.id and not user_is_admin(interaction.user):
+        return await interaction.response.send_message("Only admins can view someone else's history.", ephemeral=True)
+    game, kind = (game.lower().strip() if game else None), (kind.lower().strip() if kind else None)
+    try:
+        for d in (since, until):
+            if d:
+                datetime.strptime(d, "%Y-%m-%d")
+        if (game and game not in GAMES) or (kind and kind not in ALLOWED_TX_KINDS):
+            raise ValueError(f"game one of {', '.join(GAMES)}; kind one of {', '.join(sorted(ALLOWED_TX_KINDS))}")
+    except ValueError as e:
+        return await interaction.response.send_message(f"Invalid filters: {e}", ephemeral=True)
+
+    uid = str((member or interaction.user).id)
+    filters = {"game": game, "kind": kind, "since": since, "until": until}
+    if statement:
+        return await _send_statement(interaction, uid, filters)
+    view = HistoryView(str(interaction.user.id), uid, filters)
+    await interaction.response.send_message(embed=view.embed(), view=view, ephemeral=True)
+
+# ---------------- Backups ----------------
+# Every shard is copied on a schedule (a "backup" job per shard) with elihaus_backup: SQLite's
+# online backup API in page steps from a read snapshot, in a worker thread, so players never wait
+# on it. Archives are checked, gzip'd, read back and rotated (BACKUP_KEEP per shard).
+BACKUP_DIR = os.getenv("ELIHAUS_BACKUP_DIR", "elihaus_backups")
+BACKUP_INTERVAL = int(os.getenv("ELIHAUS_BACKUP_INTERVAL", str(6 * 3600)))  # seconds; 0 = no schedule
+BACKUP_KEEP = int(os.getenv("ELIHAUS_BACKUP_KEEP", "28"))
+
+async def backup_shard(guild_id: int) -> dict:
+    return await asyncio.to_thread(backup_db, shard_path(guild_id), BACKUP_DIR, f"guild_{guild_id}", BACKUP_KEEP)
+
+# what a backup can fail with: its own checks, the copy itself, or the disk (full, permissions)
+BACKUP_ERRORS = (BackupError, sqlite3.Error, OSError)
+
+@job_handler("backup")
+async def _job_backup(payload: dict):
+    gid = CURRENT_GUILD.get()
+    slot = (int(time.time()) // BACKUP_INTERVAL + 1) * BACKUP_INTERVAL
+    enqueue_job("backup", slot, {}, f"backup:{slot}")  # next slot first, so a failed backup can't end the schedule
+    try:
+        await backup_shard(gid)
+    except BACKUP_ERRORS as e:  # e.g. an on-demand one is running, or the disk is full; the next slot retries
+        print(f"[EliHaus] Backup failed for guild {gid}: {e!r}")
+
+@bot.tree.command(name="eh_backup", description="(Admin) Back up this server's data now, or list/verify backups")
+@app_commands.default_permissions(manage_guild=True)
+@app_commands.describe(action="now, status (default) or verify (re-check the newest backup)")
+async def eh_backup(interaction: discord.Interaction, action: str = "status"):
+    if not user_is_admin(interaction.user):
+        return await interaction.response.send_message("You don’t have permission.", ephemeral=True)
+    action = action.lower().strip()
+    gid = CURRENT_GUILD.get()
+    if action == "now":
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            r = await backup_shard(gid)
+        except BACKUP_ERRORS as e:
+            return await interaction.followup.send(f"Backup failed: {e}", ephemeral=True)
+        return await interaction.followup.send(
+            f"Backed up to `{r['path']}` · {r['raw_bytes'] // 1024} KB → {r['bytes'] // 1024} KB gzip'd · "
+            f"integrity ok · {r['seconds']}s · {len(r['removed'])} old backup(s) rotated out", ephemeral=True)
+    files = archives(BACKUP_DIR, f"guild_{gid}")
+    if action == "verify":
+        if not files:
+            return await interaction.response.send_message("No backups yet.", ephemeral=True)
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        result = await asyncio.to_thread(verify_archive, files[-1])
+        return await interaction.followup.send(f"`{os.path.basename(files[-1])}`: **{result}**", ephemeral=True)
+    if action != "status":
+        return await interaction.response.send_message("Action must be now, status or verify.", ephemeral=True)
+    lines = [f"Backups in `{BACKUP_DIR}` (keeping {BACKUP_KEEP}, every "
+             + (f"{BACKUP_INTERVAL // 60} min" if BACKUP_INTERVAL > 0 else "— schedule off") + "):"]
+    for path in files[-5:][::-1]:
+        st = os.stat(path)
+        lines.append(f"`{os.path.basename(path)}` · {st.st_size // 1024} KB · <t:{int(st.st_mtime)}:R>")
+    if not files:
+        lines.append("None yet — `/eh_backup action:now` makes one.")
+    await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+# ---------------- Profiling ----------------
+@bot.tree.command(name="eh_profile", description="(Admin) Sample slow commands/buttons; download a flame graph")
+@app_commands.default_permissions(manage_guild=True)
+@app_commands.describe(
+    action="on, off, status (default), dump (collapsed stacks file) or reset",
+    threshold_ms=f"on: keep only calls slower than this (default {PROFILE_THRESHOLD_MS})",
+    interval_ms=f"on: sampling interval (default {PROFILE_INTERVAL_MS})"
+)
+async def eh_profile(interaction: discord.Interaction, action: str = "status",
+                     threshold_ms: int | None = None, interval_ms: int | None = None):
+    if not user_is_admin(interaction.user):
+        return await interaction.response.send_message("You don’t have permission.", ephemeral=True)
+    action = action.lower().strip()
+    if action == "on":
+        PROFILER.start(max(0, threshold_ms if threshold_ms is not None else PROFILE_THRESHOLD_MS) / 1000,
+                       max(1, interval_ms or PROFILE_INTERVAL_MS) / 1000)
+    elif action == "off":
+        PROFILER.stop()
+    elif action == "reset":
+        PROFILER.reset()
+    elif action == "dump":
+        data = PROFILER.collapsed().encode()
+        if not data:
+            return await interaction.response.send_message("No slow calls sampled yet.", ephemeral=True)
+        name = f"elihaus-profile-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.folded"
+        return await interaction.response.send_message(
+            "Collapsed stacks — open in speedscope.app, or `flamegraph.pl` them into an SVG.",
+            file=discord.File(io.BytesIO(data), filename=name), ephemeral=True)
+    elif action != "status":
+        return await interaction.response.send_message("Action must be on, off, status, dump or reset.", ephemeral=True)
+
+    lines = [f"Profiler **{'on' if PROFILER.enabled else 'off'}** · threshold **{PROFILER.threshold * 1000:.0f} ms** · "
+             f"interval **{PROFILER.interval * 1000:.0f} ms**",
+             f"Calls seen: **{PROFILER.calls}**, kept (slow): **{PROFILER.slow_calls}**"]
+    for frame, n in PROFILER.top():
+        lines.append(f"`{frame}` · {n} samples")
+    await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+@bot.tree.command(name="eh_trace", description="(Admin) Record anonymised interactions for elihaus_replay.py")
+@app_commands.default_permissions(manage_guild=True)
+@app_commands.describe(action="on, off or status (default)")
+async def eh_trace(interaction: discord.Interaction, action: str = "status"):
+    if not user_is_admin(interaction.user):
+        return await interaction.response.send_message("You don’t have permission.", ephemeral=True)
+    action = action.lower().strip()
+    if action == "on":
+        TRACE.start(TRACE_PATH or TRACE_DEFAULT_PATH)
+    elif action == "off":
+        TRACE.stop()
+    elif action != "status":
+        return await interaction.response.send_message("Action must be on, off or status.", ephemeral=True)
+    state = f"**on** → `{TRACE.path}`" if TRACE.enabled else "**off**"
+    await interaction.response.send_message(
+        f"Trace {state} · events written: **{TRACE.events}**\n"
+        f"Replay on the host with `python elihaus_replay.py {TRACE.path or TRACE_PATH or TRACE_DEFAULT_PATH}`.",
+        ephemeral=True)
+
+def _start_background_workers():
+    global JOB_TASK
+    migrate_legacy_db()
+    if JOB_TASK is None or JOB_TASK.done():
+        JOB_TASK = asyncio.create_task(_job_worker())
+    OUTBOX.start()
+    for guild in bot.guilds:
+        TICKET_POOL.refill_soon(guild)
+    if TRACE_PATH:
+        TRACE.start(TRACE_PATH)
+
+@bot.tree.command(name="eh_jobs", description="(Admin) Show upcoming and failed scheduled jobs")
+@app_commands.default_permissions(manage_guild=True)
+async def eh_jobs(interaction: discord.Interaction):
+    if not user_is_admin(interaction.user):
+        return await interaction.response.send_message("You don’t have permission.", ephemeral=True)
     with db() as conn:
         c = conn.cursor()
-        c.execute("UPDATE rounds SET status='CANCELLED', resolved_at=? WHERE rid=?",
-                  (iso(now_local()), rid))
-    set_state(round_key(interaction.channel.id), None)
-    await interaction.response.send_message(f"Force-reset round **{ClaimView.get_round_label(rid)}** — channel unlocked.", ephemeral=True)
+        c.execute("""SELECT id, kind, due_ts, status, attempts, last_error FROM jobs
+                     WHERE status IN ('pending','failed')
+                     ORDER BY status='failed' DESC, due_ts ASC LIMIT 15""")
+        rows = c.fetchall()
+        c.execute("SELECT status, COUNT(*) FROM outbox WHERE status IN ('pending','failed') GROUP BY status")
+        outbox = dict(c.fetchall())
+        c.execute("""SELECT id, kind, last_error FROM outbox WHERE status='failed'
+                     ORDER BY updated_ts DESC LIMIT 5""")
+        failed_outbox = c.fetchall()
+    lines = [f"Outbox: **{outbox.get('pending', 0)}** pending · **{outbox.get('failed', 0)}** failed"]
+    for item_id, kind, err in failed_outbox:
+        lines.append(f"  ↳ outbox `#{item_id}` **{kind}**"
+                     + (" (refunded)" if kind in OUTBOX_ON_FAILED else "") + f": {(err or '')[:100]}")
+    if not rows:
+        lines.append("No pending or failed jobs.")
+    for job_id, kind, due_ts, status, attempts, err in rows:
+        line = f"`#{job_id}` **{kind}** · {status} · due <t:{due_ts}:R> · tries {attempts}"
+        if status == "failed" and err:
+            line += f"\n  ↳ {err[:120]}"
+        lines.append(line)
+    await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+# ---------------- Outbox ----------------
+# Discord side effects (ticket channels, staff posts, message edits) are written to
+# `outbox` in the same transaction as the DB change they belong to, then performed by
+# a worker with retries. `progress` records finished steps so a retry never opens a
+# second channel or re-posts; the interaction itself is just deferred and followed up.
+OUTBOX_HANDLERS: dict = {}
+OUTBOX_ON_FAILED: dict = {}  # kind -> fn(cursor, item_id, payload, progress), run when an item gives up
+
+def outbox_handler(kind: str, on_failed=None):
+    """`on_failed` undoes the item's DB change (e.g. a refund) in the transaction that marks it failed."""
+    def deco(fn):
+        OUTBOX_HANDLERS[kind] = fn
+        if on_failed:
+            OUTBOX_ON_FAILED[kind] = on_failed
+        return fn
+    return deco
+
+def outbox_put(c: sqlite3.Cursor, kind: str, idem_key: str, payload: dict) -> int:
+    """Queue a side effect inside the caller's transaction; returns the outbox id (existing one for a repeated key)."""
+    c.execute("""INSERT OR IGNORE INTO outbox(kind,idem_key,payload,progress,status,attempts,next_ts,created_ts,updated_ts)
+                 VALUES(?,?,?,'{}','pending',0,?,?,?)""",
+              (kind, idem_key, json.dumps(payload), int(time.time()), iso(now_local()), iso(now_local())))
+    c.execute("SELECT id FROM outbox WHERE idem_key=?", (idem_key,))
+    OUTBOX.kick()
+    return c.fetchone()[0]
+
+def _outbox_save(item_id: int, progress: dict):
+    with db() as conn:
+        conn.execute("UPDATE outbox SET progress=?, updated_ts=? WHERE id=?",
+                     (json.dumps(progress), iso(now_local()), item_id))
+    if progress.get("ticket"):
+        OUTBOX.notify(item_id, progress)
+
+class Outbox:
+    def __init__(self):
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._waiters: dict[tuple[int, int], list[asyncio.Future]] = {}
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def kick(self):
+        self._wake.set()
+
+    def notify(self, item_id: int, progress: dict | None):
+        # outbox ids are per shard, so waiters are keyed by (guild, id)
+        for fut in self._waiters.pop((CURRENT_GUILD.get(), item_id), []):
+            if not fut.done():
+                fut.set_result(progress)
+
+    async def wait(self, item_id: int, timeout: float) -> dict | None:
+        """Progress once the item's ticket exists (or it finished/failed), None on timeout."""
+        with db() as conn:
+            c = conn.cursor()
+            c.execute("SELECT status, progress FROM outbox WHERE id=?", (item_id,))
+            status, progress = c.fetchone()
+        progress = json.loads(progress or "{}")
+        if status != "pending" or progress.get("ticket"):
+            return progress
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault((CURRENT_GUILD.get(), item_id), []).append(fut)
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def _lease(self, now_ts: int, limit: int) -> list[tuple]:
+        with db_tx() as conn:
+            c = conn.cursor()
+            c.execute("""SELECT id, kind, payload, progress, attempts FROM outbox
+                         WHERE status='pending' AND next_ts<=? AND (lease_until IS NULL OR lease_until<=?)
+                         ORDER BY id LIMIT ?""", (now_ts, now_ts, limit))
+            rows = c.fetchall()
+            for row in rows:
+                c.execute("UPDATE outbox SET attempts=attempts+1, lease_until=? WHERE id=?",
+                          (now_ts + JOB_LEASE_SECONDS, row[0]))
+        return rows
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            now_ts = int(time.time())
+            items, next_due = [], []
+            for gid in shard_ids():
+                try:
+                    with guild_scope(gid):
+                        items += [(gid, *row) for row in self._lease(now_ts, OUTBOX_CONCURRENCY - len(items))]
+                        if not items:
+                            c = db().cursor()
+                            c.execute("SELECT MIN(next_ts) FROM outbox WHERE status='pending'")
+                            next_due.append(c.fetchone()[0])
+                except Exception:
+                    traceback.print_exc()
+                if len(items) >= OUTBOX_CONCURRENCY:
+                    break
+            if items:
+                await asyncio.gather(*(self._process(*item) for item in items))
+                continue
+            next_ts = min((t for t in next_due if t), default=None)
+            timeout = max(1, next_ts - time.time()) if next_ts else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _process(self, gid: int, item_id: int, kind: str, payload: str, progress: str, attempts: int):
+        use_guild(gid)  # gather() gave us our own task
+        attempts += 1
+        progress = json.loads(progress or "{}")
+        try:
+            handler = OUTBOX_HANDLERS.get(kind)
+            if handler is None:
+                raise RuntimeError(f"no handler for outbox kind '{kind}'")
+            await handler(item_id, json.loads(payload), progress)
+        except Exception as e:
+            print(f"[EliHaus] Outbox #{item_id} ({kind}) failed (attempt {attempts}): {e!r}")
+            failed = attempts >= OUTBOX_MAX_ATTEMPTS
+            with db_tx() as conn:
+                conn.execute("""UPDATE outbox SET status=?, next_ts=?, lease_until=NULL, last_error=?, updated_ts=?
+                                WHERE id=?""",
+                             ("failed" if failed else "pending", int(time.time()) + 5 * 2 ** attempts,
+                              f"{type(e).__name__}: {e}"[:500], iso(now_local()), item_id))
+                if failed and kind in OUTBOX_ON_FAILED:
+                    OUTBOX_ON_FAILED[kind](conn.cursor(), item_id, json.loads(payload), progress)
+            if failed:
+                self.notify(item_id, None)
+        else:
+            with db() as conn:
+                conn.execute("UPDATE outbox SET status='done', lease_until=NULL, updated_ts=? WHERE id=?",
+                             (iso(now_local()), item_id))
+            self.notify(item_id, progress)
+
+OUTBOX = Outbox()
+
+async def _reply_when_provisioned(interaction: discord.Interaction, outbox_id: int, done_msg: str):
+    """Follow up a deferred interaction once its ticket exists; `done_msg` gets {ticket}."""
+    progress = await OUTBOX.wait(outbox_id, OUTBOX_REPLY_WAIT)
+    if progress and progress.get("ticket"):
+        msg = done_msg.format(ticket=f"<#{progress['ticket']}>")
+    else:
+        msg = "✅ Saved. Your private ticket is being opened — you’ll be pinged in it shortly."
+    await interaction.followup.send(msg, ephemeral=True)
+
+async def _outbox_ticket(item_id: int, p: dict, progress: dict, reason: str) -> discord.TextChannel:
+    guild = bot.get_guild(int(p["guild_id"]))
+    if guild is None:
+        raise RuntimeError(f"guild {p['guild_id']} not available")
+    if progress.get("ticket"):
+        ch = guild.get_channel(int(progress["ticket"]))
+        if ch:
+            return ch
+    # an earlier attempt may have opened it and died before saving progress: the topic names this
+    # item (the name is a fallback for items queued before topics were set)
+    marker = f"EliHaus outbox #{item_id}"
+    name = _ticket_name(p["ticket_name"])
+    ch = next((c for c in guild.text_channels if c.topic == marker), None) \
+        or discord.utils.get(guild.text_channels, name=name)
+    if ch is None:
+        ch = await _open_ticket_channel(guild, discord.Object(id=int(p["user_id"])), name, reason, topic=marker)
+    if ch is None:
+        raise RuntimeError("could not open a ticket channel")
+    progress["ticket"] = ch.id
+    _outbox_save(item_id, progress)
+    return ch
+
+@outbox_handler("claim_ticket")
+async def _outbox_claim_ticket(item_id: int, p: dict, progress: dict):
+    ticket = await _outbox_ticket(item_id, p, progress, "EliHaus WL claim ticket")
+    STORE.set_prize_ticket(p["prize_id"], ticket.id)
+
+    if not progress.get("posted"):
+        staff_tag = f"<@&{TICKETS_STAFF_ROLE_ID}>" if TICKETS_STAFF_ROLE_ID else "@here"
+        uname, profile_url, wishlist_url = p["uname"], p["profile_url"], p["wishlist_url"]
+        profile_line = f"[{uname}]({profile_url})" if profile_url else uname
+        wishlist_line = f"[Open Wishlist]({wishlist_url})" if wishlist_url else "—"
+        policy = (
+            f"**Policy:** To claim your winnings, you must have **10 items** added from **[Shop YaEli]({SHOP_YAELI_URL})**. "
+            f"Failure to comply is subject to **disqualification**."
+        )
+        await ticket.send(
+            f"{staff_tag} New WL claim for <@{p['user_id']}>\n"
+            f"IMVU: {profile_line}\n"
+            f"Wishlist: {wishlist_line}\n"
+            f"Notes: {p['note'] or '—'}\n\n"
+            f"{policy}"
+        )
+        progress["posted"] = True
+        _outbox_save(item_id, progress)
+
+    if p.get("claim_msg_id") and not progress.get("claim_disabled"):
+        try:
+            channel = await _get_channel(int(p["claim_channel_id"]))
+            msg = await channel.fetch_message(int(p["claim_msg_id"]))
+            await msg.edit(view=DisabledClaimView())
+        except discord.NotFound:
+            pass
+        progress["claim_disabled"] = True
+        _outbox_save(item_id, progress)
+
+@outbox_handler("withdraw_ticket")
+async def _outbox_withdraw_ticket(item_id: int, p: dict, progress: dict):
+    ticket = await _outbox_ticket(item_id, p, progress, "WL withdraw request")
+    if progress.get("posted"):
+        return
+    req_id = p["req_id"]
+
+    # post admin review panel inside ticket
+    embed = discord.Embed(
+        title=f"WL Withdraw Request #{req_id}",
+        description=(f"User: <@{p['user_id']}>\n"
+                     f"Coins → WL: **{p['coins']} → {p['gifts']}** (rate {WL_COINS_PER_GIFT}/WL)\n"
+                     f"IMVU: **{p['uname']}**\n"
+                     f"[Profile/Wishlist]({p['link']})"),
+        color=discord.Color.gold()
+    )
+    if p["note"]:
+        embed.add_field(name="User note", value=p["note"][:200], inline=False)
+    embed.set_footer(text="Staff: review and approve or reject below.")
+    msg = await ticket.send(embed=embed, view=AdminWithdrawReviewView(req_id))
+
+    STORE.set_withdrawal_ticket(req_id, ticket.id, msg.id)
+    progress["posted"] = True
+    _outbox_save(item_id, progress)
+
+def _refund_failed_deposit(c: sqlite3.Cursor, item_id: int, p: dict, progress: dict):
+    # no staff ticket will ever see this deposit, so the coins go back
+    apply_ledger(p["user_id"], int(p["amount"]), "wl_deposit",
+                 f"wl_deposit refund: ticket could not be opened (outbox #{item_id})")
+
+@outbox_handler("deposit_ticket", on_failed=_refund_failed_deposit)
+async def _outbox_deposit_ticket(item_id: int, p: dict, progress: dict):
+    ticket = await _outbox_ticket(item_id, p, progress, "EliHaus WL deposit")
+    if progress.get("posted"):
+        return
+
+    # post details in the ticket
+    staff_tag = f"<@&{TICKETS_STAFF_ROLE_ID}>" if TICKETS_STAFF_ROLE_ID else "@here"
+    e = discord.Embed(
+        title="💳 WL Conversion Request",
+        description=f"<@{p['user_id']}> deposited **{p['amount']}** coins to convert to wishlist gifts.",
+        color=discord.Color.gold(),
+        timestamp=now_local()
+    )
+    e.add_field(name="IMVU", value=p["imvu"], inline=False)
+    e.add_field(name="Notes", value=(p["note"] or "—"), inline=False)
+    e.add_field(name="New Balance", value=str(p["new_bal"]), inline=True)
+    await ticket.send(content=staff_tag, embed=e)
+    progress["posted"] = True
+    _outbox_save(item_id, progress)
 
 # ---------------- Sync & Ready ----------------
 @bot.event
 async def on_ready():
     print(f"[EliHaus] Logged in as {bot.user} | TZ={TIMEZONE_NAME}")
+    _start_background_workers()
     try:
         if GUILD_ID:
             guild = discord.Object(id=GUILD_ID)
@@ -1701,6 +3264,11 @@ async def on_ready():
     except Exception as e:
         print(f"[EliHaus] Slash sync failed: {e}")
 
+@bot.event
+async def on_guild_join(guild: discord.Guild):
+    with guild_scope(guild.id):  # its shard gets the recurring jobs now, not at the next restart
+        _schedule_recurring_jobs()
+
 @bot.tree.command(name="eh_sync", description="(admin) Re-sync slash commands")
 async def eh_sync(interaction: discord.Interaction):
     if not (interaction.user.guild_permissions.manage_guild or interaction.guild.owner_id == interaction.user.id):
@@ -1720,39 +3288,87 @@ async def eh_sync(interaction: discord.Interaction):
 
 @bot.event
 async def on_message(message: discord.Message):
-    # keep prefix commands working (even though we use slash now)
-    await bot.process_commands(message)
+    # keep prefix commands working (even though we use slash now); lean mode has no message text for them
+    if not LEAN_GATEWAY:
+        await bot.process_commands(message)
 
     # ignore bots/DMs/system
     if message.author.bot or not message.guild:
         return
     if message.type != discord.MessageType.default:
         return
+    use_guild(message.guild.id)
 
-    # if there is an open round in this channel, count & bump
-    o = get_open_round(message.channel.id)
-    if not o:
-        STICKY_COUNT.pop(message.channel.id, None)
-        return
-
-    rid, exp = o
-    # don't bump if nearly done to avoid spammy last seconds
-    if (exp - now_local()).total_seconds() <= 10:
-        return
-
-    STICKY_COUNT[message.channel.id] = STICKY_COUNT.get(message.channel.id, 0) + 1
-    if STICKY_COUNT[message.channel.id] >= STICKY_AFTER_MSGS:
-        STICKY_COUNT[message.channel.id] = 0
-        try:
-            await _bump_round_message(message.channel, rid)
-        except Exception:
-            pass
+    # count towards a bump of this channel's round panel (DB is only checked once one is due)
+    STICKY.seen(message.channel)
 from datetime import timedelta
 
 def _mention_or_id(guild: discord.Guild | None, uid: str) -> str:
-    m = guild.get_member(int(uid)) if guild else None
+    m = MEMBERS.get(guild, int(uid))
     return m.mention if m else f"<@{uid}>"
 
+LEADERBOARD_PAGE_SIZE = 10
+# mode -> (title, footer, STORE leaderboard, days back or None for all time)
+LEADERBOARD_MODES = {
+    "balance": ("🏆 EliHaus Leaderboard — Balance", "Richest players", "balance", None),
+    "roulette_week": ("🎰 Roulette Leaderboard — Weekly Net", "Net = payouts − bets, last 7 days", "roulette", 7),
+    "roulette_all": ("🎰 Roulette Leaderboard — All-Time Net", "Net = payouts − bets", "roulette", None),
+}
+
+class LeaderboardView(KeysetPageView):
+    """Highest value first, keyed on (value, discord_id); pages and ranks come from the STORE
+    leaderboard_* queries."""
+    page_size = LEADERBOARD_PAGE_SIZE
+
+    def __init__(self, owner_id: str, mode: str, guild: discord.Guild | None):
+        super().__init__(owner_id)
+        self.mode, self.guild = mode, guild
+        self.title, self.footer, self.board, days = LEADERBOARD_MODES[mode]
+        self.since = (now_local() - timedelta(days=days)).isoformat() if days else None
+        self.first_rank = 1
+        self.me: tuple[int, int] | None = None  # (rank, value) of the owner, if ranked
+        self.total = 0
+        self._rank_me()
+        self.load()
+
+    def _rank_me(self):
+        standing = STORE.leaderboard_standing(self.board, self.owner_id, self.since)
+        self.me = None if standing.rank is None else (standing.rank, standing.value)
+        self.total = standing.size
+
+    def _fetch(self, bound, op, limit):
+        return STORE.leaderboard_page(self.board, bound, op, limit, self.since)
+
+    def _key(self, row):
+        return row[1], row[0]
+
+    def _loaded(self):
+        if self.rows:
+            self.first_rank = STORE.leaderboard_rank(self.board, self._key(self.rows[0]), self.since)
+        self.mine.disabled = self.me is None
+
+    def embed(self, note: str = "") -> discord.Embed:
+        e = discord.Embed(title=self.title, color=discord.Color.gold(), timestamp=now_local())
+        medals = ["🥇", "🥈", "🥉"]
+        lines = []
+        for rank, (uid, val) in enumerate(self.rows, start=self.first_rank):
+            tag = medals[rank - 1] if rank <= 3 else f"{rank:>2}."
+            name = _mention_or_id(self.guild, uid)
+            lines.append(f"{tag} {'**→** ' if uid == self.owner_id else ''}{name} — **{val:,}**")
+        e.description = "\n".join(lines) or "_No data yet._"
+        you = f"You: #{self.me[0]:,} of {self.total:,} ({self.me[1]:,})" if self.me else f"{self.total:,} ranked"
+        e.set_footer(text=f"{self.footer} · {you}" + (f" · {note}" if note else ""))
+        return e
+
+    @discord.ui.button(label="My rank", style=discord.ButtonStyle.primary, row=4)
+    async def mine(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self._rank_me()
+        if self.me:
+            # page that has the owner in it, a few places below the top when possible
+            above = self._fetch(self._key((self.owner_id, self.me[1])), "<", self.page_size // 2)
+            self.load(self._key(above[0]), ">=") if above else self.load()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
 @bot.tree.command(name="eh_leaderboard", description="Show top players by balance or roulette net")
 @app_commands.describe(
     mode="balance (default), roulette_week, or roulette_all",
@@ -1767,65 +3383,16 @@ async def eh_leaderboard(
     await interaction.response.defer(ephemeral=not public, thinking=True)
 
     mode = (mode or "balance").lower().strip()
-    guild = interaction.guild
+    if mode not in LEADERBOARD_MODES:
+        await interaction.followup.send(
+            "Unknown mode. Use `balance`, `roulette_week`, or `roulette_all`.",
+            ephemeral=not public
+        )
+        return
 
     try:
-        if mode == "balance":
-            with db() as conn:
-                c = conn.cursor()
-                c.execute("SELECT discord_id, balance FROM users ORDER BY balance DESC LIMIT 10")
-                rows = c.fetchall()
-            title = "🏆 EliHaus Leaderboard — Balance"
-            footer = "Top 10 richest players"
-            items = [(_mention_or_id(guild, uid), bal) for uid, bal in rows]
-
-        elif mode in ("roulette_week", "roulette_all"):
-            # net = payouts − bets; bets are stored negative already
-            q_time = ""
-            params = ()
-            if mode == "roulette_week":
-                since = (now_local() - timedelta(days=7)).isoformat()
-                q_time = "AND ts >= ?"
-                params = (since,)
-
-            with db() as conn:
-                c = conn.cursor()
-                c.execute(f"""
-                    SELECT discord_id, COALESCE(SUM(amount),0) AS net
-                    FROM tx
-                    WHERE kind IN ('bet','payout') {q_time}
-                    GROUP BY discord_id
-                    HAVING net != 0
-                    ORDER BY net DESC
-                    LIMIT 10
-                """, params)
-                rows = c.fetchall()
-
-            title = "🎰 Roulette Leaderboard — Weekly Net" if mode == "roulette_week" \
-                    else "🎰 Roulette Leaderboard — All-Time Net"
-            footer = "Net = payouts − bets"
-            items = [(_mention_or_id(guild, uid), net) for uid, net in rows]
-
-        else:
-            await interaction.followup.send(
-                "Unknown mode. Use `balance`, `roulette_week`, or `roulette_all`.",
-                ephemeral=not public
-            )
-            return
-
-        e = discord.Embed(title=title, color=discord.Color.gold(), timestamp=now_local())
-        if not items:
-            e.description = "_No data yet._"
-        else:
-            medals = ["🥇","🥈","🥉"]
-            lines = []
-            for i, (name, val) in enumerate(items, start=1):
-                tag = medals[i-1] if i <= 3 else f"{i:>2}."
-                lines.append(f"{tag} {name} — **{val:,}**")
-            e.description = "\n".join(lines)
-        e.set_footer(text=footer)
-
-        await interaction.followup.send(embed=e, ephemeral=not public)
+        view = LeaderboardView(str(interaction.user.id), mode, interaction.guild)
+        await interaction.followup.send(embed=view.embed(), view=view, ephemeral=not public)
 
     except Exception as e:
         # surface the exact error to you ephemerally
@@ -1849,57 +3416,65 @@ async def eh_policy(interaction: discord.Interaction, public: bool = False):
 # =========================
 
 # ---- Config ----
-SLOTS_COST = int(os.getenv("SLOTS_COST", "500"))            # coins per spin
-SLOTS_SEED = int(os.getenv("SLOTS_SEED", "1000"))           # minimum pot floor per channel
+# rules (reel weights, paytable, cost, seed) come from elihaus_games, shared with elihaus_sim.py;
+# SLOTS_PAYTABLE=path/to/paytable.json swaps in weighted reels / custom paylines
+SLOTS_RULES = SlotsRules.from_env()
+SLOTS_COST = SLOTS_RULES.cost        # coins per spin
+SLOTS_SEED = SLOTS_RULES.seed        # minimum pot floor per channel
 SLOTS_MAX_SPINS = int(os.getenv("SLOTS_MAX_SPINS", "5"))    # spins per modal submission
-SLOTS_EMOJIS = ["🍒", "🍋", "🍇", "🍀", "⭐", "💎", "7️⃣"]
-
-# payout rules (from the pot; pot never goes below seed)
-SLOTS_PAYOUT_TRIPLE = float(os.getenv("SLOTS_PAYOUT_TRIPLE", "0.80"))  # 80% of (pot - seed)
-SLOTS_PAYOUT_DOUBLE = int(os.getenv("SLOTS_PAYOUT_DOUBLE", "2000"))    # flat, capped by available
-
-# ---- DB bootstrap (safe to call multiple times) ----
-def _init_slots_tables():
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("""CREATE TABLE IF NOT EXISTS slots_spins(
-            id INTEGER PRIMARY KEY,
-            channel_id TEXT,
-            discord_id TEXT,
-            r1 TEXT, r2 TEXT, r3 TEXT,
-            win INTEGER,            -- amount paid out
-            pot_before INTEGER,     -- pot before paying win
-            ts TEXT
-        )""")
-
-# call it once at import
-_init_slots_tables()
-
-# ---- State keys ----
-def _slots_pot_key(channel_id: int) -> str:
-    return f"slots:pot:{channel_id}"
+SLOTS_RNG = random.Random()  # own instance: roulette/lotto draws never reseed it
+
+# ---- DB bootstrap (runs on every shard as it is opened) ----
+@shard_schema
+def _init_slots_tables(c: sqlite3.Cursor):
+    c.execute("""CREATE TABLE IF NOT EXISTS slots_spins(
+        id INTEGER PRIMARY KEY,
+        channel_id TEXT,
+        discord_id TEXT,
+        r1 TEXT, r2 TEXT, r3 TEXT,
+        win INTEGER,            -- amount paid out
+        pot_before INTEGER,     -- pot before paying win
+        ts TEXT
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS slots_pots(
+        channel_id TEXT PRIMARY KEY,
+        pot INTEGER,
+        message_id TEXT         -- pinned panel
+    )""")
+    # one-off: pots/panels used to live in the state KV
+    c.execute("SELECT key, val FROM state WHERE key GLOB 'slots:pot:*' OR key GLOB 'slots:msg:*'")
+    legacy = c.fetchall()
+    if legacy:
+        c.execute("BEGIN")
+        for key, val in legacy:
+            _, field, ch = key.split(":", 2)
+            col = "pot" if field == "pot" else "message_id"
+            c.execute(f"""INSERT INTO slots_pots(channel_id,{col}) VALUES(?,?)
+                          ON CONFLICT(channel_id) DO UPDATE SET {col}=excluded.{col}""", (ch, val))
+            c.execute("DELETE FROM state WHERE key=?", (key,))
+        c.execute("COMMIT")
 
-def _slots_msg_key(channel_id: int) -> str:
-    return f"slots:msg:{channel_id}"
 
 # ---- Pot helpers ----
 def get_slots_pot(channel_id: int) -> int:
-    val = get_state(_slots_pot_key(channel_id))
-    if val is None:
-        set_state(_slots_pot_key(channel_id), str(SLOTS_SEED))
-        return SLOTS_SEED
-    try:
-        return int(val)
-    except Exception:
-        set_state(_slots_pot_key(channel_id), str(SLOTS_SEED))
+    pot = STORE.get_slots_pot(str(channel_id))
+    if pot is None:
+        set_slots_pot(channel_id, SLOTS_SEED)
         return SLOTS_SEED
+    return pot
 
 def set_slots_pot(channel_id: int, pot: int):
     # Pot can never fall below the configured seed
-    set_state(_slots_pot_key(channel_id), str(max(pot, SLOTS_SEED)))
+    STORE.set_slots_pot(str(channel_id), max(pot, SLOTS_SEED))
+
+def get_slots_panel_id(channel_id: int) -> str | None:
+    return STORE.get_slots_panel(str(channel_id))
+
+def set_slots_panel_id(channel_id: int, message_id: int):
+    STORE.set_slots_panel(str(channel_id), message_id, SLOTS_SEED)
 
 # ---- UI: Modal + View ----
-class SlotsModal(discord.ui.Modal, title="Spin the Slots"):
+class SlotsModal(GuildModal, title="Spin the Slots"):
     spins = discord.ui.TextInput(
         label=f"How many spins? (1–{SLOTS_MAX_SPINS})",
         placeholder="1",
@@ -1934,11 +3509,8 @@ class SlotsModal(discord.ui.Modal, title="Spin the Slots"):
             )
 
         # charge upfront
-        with db() as conn:
-            c = conn.cursor()
-            c.execute("UPDATE users SET balance=balance-? WHERE discord_id=?", (total_cost, uid))
-            c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
-                      (uid, "bet", -total_cost, f"slots|entry x{n}", iso(now_local())))
+        with db_tx():
+            apply_ledger(uid, -total_cost, "bet", f"slots|entry x{n}")
 
         # add to pot
         pot = get_slots_pot(self.channel_id) + total_cost
@@ -1946,18 +3518,14 @@ class SlotsModal(discord.ui.Modal, title="Spin the Slots"):
 
         total_win = 0
         lines = []
+        spins: list[SlotsSpin] = []
         last_roll = "—"
         last_win = 0
 
         for i in range(1, n + 1):
             # spin
-            r1, r2, r3 = random.choice(SLOTS_EMOJIS), random.choice(SLOTS_EMOJIS), random.choice(SLOTS_EMOJIS)
-            available = max(0, pot - SLOTS_SEED)
-            win = 0
-            if r1 == r2 == r3:
-                win = int(available * SLOTS_PAYOUT_TRIPLE)
-            elif (r1 == r2) or (r1 == r3) or (r2 == r3):
-                win = min(SLOTS_PAYOUT_DOUBLE, available)
+            r1, r2, r3 = SLOTS_RULES.spin(SLOTS_RNG)
+            win = SLOTS_RULES.win(SLOTS_RULES.line(r1, r2, r3), pot)
 
             pot_before = pot
             if win > 0:
@@ -1965,28 +3533,22 @@ class SlotsModal(discord.ui.Modal, title="Spin the Slots"):
                 set_slots_pot(self.channel_id, pot)
                 total_win += win
 
-            # record spin
-            with db() as conn:
-                c = conn.cursor()
-                c.execute("""INSERT INTO slots_spins(channel_id,discord_id,r1,r2,r3,win,pot_before,ts)
-                             VALUES(?,?,?,?,?,?,?,?)""",
-                          (str(self.channel_id), uid, r1, r2, r3, win, pot_before, iso(now_local())))
+            spins.append(SlotsSpin(str(self.channel_id), uid, r1, r2, r3, win, pot_before))
 
             sign = f"+{win}" if win else "—"
             lines.append(f"{i}. {r1}{r2}{r3} → {sign}")
             last_roll, last_win = f"{r1}{r2}{r3}", win
 
+        STORE.record_spins(spins)
+
         # pay out once after bundle
         if total_win > 0:
-            with db() as conn:
-                c = conn.cursor()
-                c.execute("UPDATE users SET balance=balance+? WHERE discord_id=?", (total_win, uid))
-                c.execute("INSERT INTO tx(discord_id,kind,amount,meta,ts) VALUES(?,?,?,?,?)",
-                          (uid, "payout", total_win, f"slots|bundle x{n}", iso(now_local())))
+            with db_tx():
+                apply_ledger(uid, total_win, "payout", f"slots|bundle x{n}")
 
         # refresh the panel
         try:
-            mid = get_state(_slots_msg_key(self.channel_id))
+            mid = get_slots_panel_id(self.channel_id)
             if mid:
                 panel = await interaction.channel.fetch_message(int(mid))
                 if panel.embeds:
@@ -1997,8 +3559,7 @@ class SlotsModal(discord.ui.Modal, title="Spin the Slots"):
                 e.title = "🎰 Emoji Slots — Shared Pot"
                 e.description = (
                     f"Entry: **{SLOTS_COST}** coins per spin.\n"
-                    f"Triples pay **{int(SLOTS_PAYOUT_TRIPLE*100)}%** of available pot.\n"
-                    f"Doubles pay **{SLOTS_PAYOUT_DOUBLE}**.\n"
+                    f"{SLOTS_RULES.describe()}\n"
                     f"Pot never drops below seed **{SLOTS_SEED}**."
                 )
                 e.add_field(name="Pot", value=str(get_slots_pot(self.channel_id)), inline=True)
@@ -2048,7 +3609,7 @@ class SlotsModal(discord.ui.Modal, title="Spin the Slots"):
             pass
 
         
-class SlotsView(discord.ui.View):
+class SlotsView(GuildView):
     def __init__(self, channel_id: int, timeout: int | None = None):
         super().__init__(timeout=timeout or None)
         self.channel_id = channel_id
@@ -2081,8 +3642,7 @@ async def slots_open(interaction: discord.Interaction):
             title="🎰 Emoji Slots — Shared Pot",
             description=(
                 f"Entry: **{SLOTS_COST}** coins per spin.\n"
-                f"Triples pay **{int(SLOTS_PAYOUT_TRIPLE*100)}%** of available pot.\n"
-                f"Doubles pay **{SLOTS_PAYOUT_DOUBLE}**.\n"
+                f"{SLOTS_RULES.describe()}\n"
                 f"Pot never drops below seed **{SLOTS_SEED}**."
             ),
             color=discord.Color.gold()
@@ -2093,7 +3653,7 @@ async def slots_open(interaction: discord.Interaction):
         view = SlotsView(interaction.channel.id)
         msg = await interaction.channel.send(embed=e, view=view)
 
-        set_state(_slots_msg_key(interaction.channel.id), str(msg.id))
+        set_slots_panel_id(interaction.channel.id, msg.id)
         try:
             await msg.pin(reason="EliHaus Slots panel")
         except Exception:
@@ -2109,7 +3669,7 @@ async def slots_open(interaction: discord.Interaction):
 # user: get a jump link to panel
 @bot.tree.command(name="slots_panel", description="Get a jump link to the Slots panel")
 async def slots_panel(interaction: discord.Interaction):
-    mid = get_state(_slots_msg_key(interaction.channel.id))
+    mid = get_slots_panel_id(interaction.channel.id)
     if not mid:
         return await interaction.response.send_message("No Slots panel in this channel.", ephemeral=True)
     url = f"https://discord.com/channels/{interaction.guild.id}/{interaction.channel.id}/{mid}"
@@ -2125,7 +3685,7 @@ async def slots_reset(interaction: discord.Interaction):
 
     # refresh panel if exists
     try:
-        mid = get_state(_slots_msg_key(interaction.channel.id))
+        mid = get_slots_panel_id(interaction.channel.id)
         if mid:
             panel = await interaction.channel.fetch_message(int(mid))
             if panel.embeds:
@@ -2136,8 +3696,7 @@ async def slots_reset(interaction: discord.Interaction):
             e.title = "🎰 Emoji Slots — Shared Pot"
             e.description = (
                 f"Entry: **{SLOTS_COST}** coins per spin.\n"
-                f"Triples pay **{int(SLOTS_PAYOUT_TRIPLE*100)}%** of available pot.\n"
-                f"Doubles pay **{SLOTS_PAYOUT_DOUBLE}**."
+                f"{SLOTS_RULES.describe()}"
             )
             e.add_field(name="Pot", value=str(SLOTS_SEED), inline=True)
             e.add_field(name="Seed", value=str(SLOTS_SEED), inline=True)
@@ -2150,23 +3709,15 @@ async def slots_reset(interaction: discord.Interaction):
 # top winners (by total coins won) in this channel
 @bot.tree.command(name="slots_top", description="Show top Slots winners (by total coins won) for this channel")
 async def slots_top(interaction: discord.Interaction):
-    with db() as conn:
-        c = conn.cursor()
-        c.execute("""SELECT discord_id, COALESCE(SUM(win),0) AS total
-                     FROM slots_spins
-                     WHERE channel_id=?
-                     GROUP BY discord_id
-                     HAVING total>0
-                     ORDER BY total DESC
-                     LIMIT 10""", (str(interaction.channel.id),))
-        rows = c.fetchall()
+    rows = STORE.slots_top(str(interaction.channel.id))
     if not rows:
         return await interaction.response.send_message("No wins yet.", ephemeral=True)
     lines = []
     for i, (uid, total) in enumerate(rows, start=1):
-        m = interaction.guild.get_member(int(uid))
+        m = MEMBERS.get(interaction.guild, int(uid))
         name = m.mention if m else f"<@{uid}>"
         lines.append(f"{i}. {name} — **{total}**")
     await interaction.response.send_message("**Slots Top Winners**\n" + "\n".join(lines), ephemeral=True)
 
-bot.run(TOKEN)
+if __name__ == "__main__":  # elihaus_replay.py imports the handlers without connecting
+    bot.run(TOKEN)
@@ -0,0 +1,116 @@
+# tests/test_lotto.py — FenwickTree, the weighted lotto_draw and its replay by elihaus_audit
+import json, os, random, sqlite3, sys, unittest
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from elihaus_audit import audit_lotto
+from elihaus_games import FenwickTree, lotto_draw
+
+HOLDERS = [("a", 1), ("b", 3), ("c", 6), ("d", 2), ("e", 8)]
+
+
+class FenwickTreeTest(unittest.TestCase):
+    def brute_find(self, weights, r):
+        for i, w in enumerate(weights):
+            if r < w:
+                return i
+            r -= w
+
+    def test_find_matches_prefix_sums(self):
+        rng = random.Random(5)
+        for n in (1, 2, 7, 16, 33):
+            weights = [rng.choice((0, 1, 2, 5)) for _ in range(n)] + [1]
+            tree = FenwickTree(weights)
+            self.assertEqual(tree.total, sum(weights))
+            for r in range(tree.total):
+                self.assertEqual(tree.find(r), self.brute_find(weights, r), msg=(weights, r))
+
+    def test_add_updates_find(self):
+        weights = [3, 0, 4, 1, 2]
+        tree = FenwickTree(weights)
+        for i, delta in ((2, -4), (1, 5), (0, -3), (4, 1)):
+            tree.add(i, delta)
+            weights[i] += delta
+            self.assertEqual(tree.total, sum(weights))
+            self.assertEqual([tree.find(r) for r in range(tree.total)],
+                             [self.brute_find(weights, r) for r in range(sum(weights))])
+
+
+class LottoDrawTest(unittest.TestCase):
+    def test_no_repeated_winner(self):
+        for k in range(200):
+            drawn = lotto_draw(f"seed-{k}", HOLDERS, 4)
+            self.assertEqual(len(drawn), 4)
+            self.assertEqual(len(set(drawn)), 4, msg=drawn)
+
+    def test_deterministic_per_seed(self):
+        for k in range(50):
+            self.assertEqual(lotto_draw(f"s{k}", HOLDERS, 3), lotto_draw(f"s{k}", HOLDERS, 3))
+        self.assertGreater(len({tuple(lotto_draw(f"s{k}", HOLDERS, 3)) for k in range(50)}), 1)
+        # drawing fewer winners is a prefix of drawing more, from the same seed
+        self.assertEqual(lotto_draw("s1", HOLDERS, 2), lotto_draw("s1", HOLDERS, 5)[:2])
+
+    def test_first_place_proportional_to_tickets(self):
+        runs = 40_000
+        firsts = Counter(lotto_draw(f"freq-{k}", HOLDERS, 1)[0] for k in range(runs))
+        total = sum(n for _h, n in HOLDERS)
+        for holder, n in HOLDERS:
+            self.assertAlmostEqual(firsts[holder] / runs, n / total, delta=0.01, msg=holder)
+
+    def test_more_winners_than_holders(self):
+        drawn = lotto_draw("seed", HOLDERS, 10)
+        self.assertEqual(sorted(drawn), sorted(h for h, _n in HOLDERS))
+        self.assertEqual(lotto_draw("seed", [("solo", 4)], 3), ["solo"])
+        self.assertEqual(lotto_draw("seed", [], 3), [])
+
+    def test_holders_without_tickets_never_win(self):
+        holders = [("a", 0), ("b", 2), ("c", 0)]
+        for k in range(50):
+            self.assertEqual(lotto_draw(f"z{k}", holders, 3), ["b"])
+
+
+class AuditReplayTest(unittest.TestCase):
+    """Draws stored the way SQLiteStore.draw_lotto stores them must replay in elihaus_audit."""
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.addCleanup(self.conn.close)
+        self.conn.executescript("""
+            CREATE TABLE tickets(id INTEGER PRIMARY KEY, week_id TEXT, discord_id TEXT, ts TEXT);
+            CREATE TABLE lotto_draws(id INTEGER PRIMARY KEY, week_id TEXT, run_at TEXT, winner_id TEXT, seed TEXT,
+                                     status TEXT, ticket_count INTEGER, winner_ids TEXT);""")
+
+    def draw(self, week: str, seed: str, winners: int) -> list[str]:
+        holders = self.conn.execute("""SELECT discord_id, COUNT(*) FROM tickets WHERE week_id=?
+                                       GROUP BY discord_id ORDER BY MIN(id)""", (week,)).fetchall()
+        drawn = lotto_draw(seed, holders, winners)
+        self.conn.execute("""INSERT INTO lotto_draws(week_id,run_at,winner_id,seed,status,ticket_count,winner_ids)
+                             VALUES(?,?,?,?,'DONE',?,?)""",
+                          (week, "2026-01-03T20:00:00", drawn[0], seed, sum(n for _u, n in holders), json.dumps(drawn)))
+        return drawn
+
+    def buy(self, week: str, uid: str, n: int):
+        self.conn.executemany("INSERT INTO tickets(week_id,discord_id,ts) VALUES(?,?,?)",
+                              [(week, uid, "2026-01-01T00:00:00")] * n)
+
+    def test_audit_replays_draws(self):
+        rng = random.Random(11)
+        for w in range(20):
+            week = f"2026-W{w:02d}"
+            for _ in range(rng.randint(1, 30)):
+                self.buy(week, f"u{rng.randint(1, 8)}", rng.randint(1, 5))
+            self.draw(week, f"LOTTO-{week}-{rng.random()}", rng.randint(1, 4))
+            self.buy(week, "late", 50)  # bought after the draw; ticket_count keeps them out of the replay
+        self.assertEqual(audit_lotto(self.conn), (20, []))
+
+    def test_audit_flags_tampered_winners(self):
+        self.buy("2026-W01", "a", 3)
+        self.buy("2026-W01", "b", 3)
+        drawn = self.draw("2026-W01", "seed", 2)
+        self.conn.execute("UPDATE lotto_draws SET winner_ids=?", (json.dumps(drawn[::-1]),))
+        self.assertEqual(audit_lotto(self.conn), (1, [("2026-W01", ",".join(drawn[::-1]), ",".join(drawn))]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+# tests/test_roulette.py — POCKET_MASKS membership, choice parsing and settlement multipliers
+# The expected pocket sets are written out longhand so a slip in the mask builders can't hide.
+import os, sys, unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from elihaus_games import POCKET_MASKS, RED_NUMS, RouletteRules, roulette_color
+
+RED = {1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36}
+OUTSIDE = {
+    "red": RED,
+    "black": set(range(1, 37)) - RED,
+    "odd": {1, 3, 5, 7, 9, 11, 13, 15, 17, 19, 21, 23, 25, 27, 29, 31, 33, 35},
+    "even": {2, 4, 6, 8, 10, 12, 14, 16, 18, 20, 22, 24, 26, 28, 30, 32, 34, 36},
+    "low": set(range(1, 19)),
+    "high": set(range(19, 37)),
+    "dozen1": set(range(1, 13)),
+    "dozen2": set(range(13, 25)),
+    "dozen3": set(range(25, 37)),
+    "col1": {1, 4, 7, 10, 13, 16, 19, 22, 25, 28, 31, 34},
+    "col2": {2, 5, 8, 11, 14, 17, 20, 23, 26, 29, 32, 35},
+    "col3": {3, 6, 9, 12, 15, 18, 21, 24, 27, 30, 33, 36},
+}
+EVEN_MONEY = ("red", "black", "odd", "even", "low", "high")
+
+
+def pockets(mask: int) -> set[int]:
+    return {p for p in range(37) if mask >> p & 1}
+
+
+class PocketMaskTest(unittest.TestCase):
+    def test_outside_bets(self):
+        for choice, expected in OUTSIDE.items():
+            self.assertEqual(pockets(POCKET_MASKS[choice]), expected, msg=choice)
+
+    def test_zero_loses_every_outside_bet(self):
+        rules = RouletteRules()
+        for choice in OUTSIDE:
+            self.assertFalse(rules.hits(choice, 0), msg=choice)
+            self.assertEqual(rules.win(choice, 0, 100), 0, msg=choice)
+        self.assertTrue(rules.hits("green", 0))
+        self.assertTrue(rules.hits("0", 0))
+
+    def test_green_and_straight_up(self):
+        self.assertEqual(pockets(POCKET_MASKS["green"]), {0})
+        for n in range(37):
+            self.assertEqual(pockets(POCKET_MASKS[str(n)]), {n})
+
+    def test_colours_agree_with_roulette_color(self):
+        self.assertEqual(set(RED_NUMS), RED)
+        for p in range(37):
+            hit = [c for c in ("red", "black", "green") if POCKET_MASKS[c] >> p & 1]
+            self.assertEqual(hit, [roulette_color(p)], msg=p)
+
+    def test_masks_fit_the_wheel(self):
+        for choice, mask in POCKET_MASKS.items():
+            self.assertEqual(mask >> 37, 0, msg=choice)
+
+
+class ParseChoiceTest(unittest.TestCase):
+    def test_aliases(self):
+        rules = RouletteRules()
+        cases = {
+            "red": "red", "R": "red", " Black ": "black", "b": "black", "g": "green", "GREEN": "green",
+            "zero": "0", "0": "0", "17": "17", "36": "36",
+            "odd": "odd", "Even": "even",
+            "1-18": "low", "manque": "low", "19-36": "high", "passe": "high",
+            "1st12": "dozen1", "2nd 12": "dozen2", "3rd 12": "dozen3", "d1": "dozen1", "13-24": "dozen2",
+            "25-36": "dozen3", "dozen 2": "dozen2",
+            "col 3": "col3", "column1": "col1", "Column 2": "col2", "c3": "col3",
+        }
+        for text, expected in cases.items():
+            self.assertEqual(rules.parse_choice(text), expected, msg=text)
+
+    def test_rejects_unknown(self):
+        rules = RouletteRules()
+        for text in ("37", "-1", "purple", "", "dozen4", "col0", "1-36"):
+            self.assertIsNone(rules.parse_choice(text), msg=text)
+
+
+class SettleTest(unittest.TestCase):
+    def test_multiplier_per_choice(self):
+        rules = RouletteRules()
+        expected = {**{c: 2.0 for c in EVEN_MONEY}, "green": 14.0,
+                    **{c: 3.0 for c in ("dozen1", "dozen2", "dozen3", "col1", "col2", "col3")},
+                    **{str(n): 36.0 for n in range(37)}}
+        self.assertEqual(set(expected), set(POCKET_MASKS))
+        for choice, mult in expected.items():
+            self.assertEqual(rules.multiplier(choice), mult, msg=choice)
+
+    def test_settle_pays_winning_choices(self):
+        rules = RouletteRules()
+        bets = [(f"u{i}", choice, 10 + i) for i, choice in enumerate(POCKET_MASKS)]
+        for pocket in range(37):
+            paid = dict(rules.settle(bets, pocket))
+            for uid, choice, stake in bets:
+                winning = pocket in (OUTSIDE.get(choice) or pockets(POCKET_MASKS[choice]))
+                self.assertEqual(paid.get(uid, 0), int(stake * rules.multiplier(choice)) if winning else 0,
+                                 msg=(pocket, choice))
+                self.assertEqual(rules.win(choice, pocket, stake), paid.get(uid, 0), msg=(pocket, choice))
+
+    def test_settle_custom_payouts_and_unknown_choice(self):
+        rules = RouletteRules(payout_red_black=1.5, payout_green=20, payout_dozen=2.5, payout_straight=30)
+        bets = [("a", "red", 100), ("b", "green", 10), ("c", "dozen1", 10), ("d", "1", 10), ("e", "bogus", 10)]
+        self.assertEqual(rules.settle(bets, 1), [("a", 150), ("c", 25), ("d", 300)])
+        self.assertEqual(rules.settle(bets, 0), [("b", 200)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+# tests/test_slots.py — AliasTable sampling and the SlotsRules paytable (default and from SLOTS_PAYTABLE JSON)
+import itertools, json, os, random, sys, tempfile, unittest
+from collections import Counter
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from elihaus_games import AliasTable, SlotsRules
+
+
+class AliasTableTest(unittest.TestCase):
+    def assertFrequencies(self, weights, draws=200_000, tolerance=0.01):
+        table = AliasTable(weights)
+        rng = random.Random(7)
+        seen = Counter(table.draw(rng) for _ in range(draws))
+        total = sum(weights)
+        for i, w in enumerate(weights):
+            self.assertAlmostEqual(seen[i] / draws, w / total, delta=tolerance, msg=f"symbol {i}")
+
+    def test_frequencies_match_weights(self):
+        self.assertFrequencies([5, 1, 3, 0.5, 10])
+
+    def test_uniform(self):
+        self.assertFrequencies([1] * 7)
+
+    def test_zero_weight_never_drawn(self):
+        table = AliasTable([0, 3, 0, 1])
+        rng = random.Random(1)
+        self.assertEqual({table.draw(rng) for _ in range(10_000)}, {1, 3})
+
+    def test_rejects_bad_weights(self):
+        for weights in ([], [0, 0], [1, -1]):
+            with self.assertRaises(ValueError, msg=weights):
+                AliasTable(weights)
+
+
+class SlotsConfigTest(unittest.TestCase):
+    def write(self, text: str) -> str:
+        fd, path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_reel_weights_drive_spins(self):
+        reels = [{"A": 3, "B": 1}, {"A": 1, "B": 1}, {"B": 1}]
+        rules = SlotsRules().with_config(self.write(json.dumps({"reels": reels})))
+        self.assertEqual(rules.symbols, ("A", "B"))
+        self.assertEqual(rules.weights, ((3.0, 1.0), (1.0, 1.0), (0.0, 1.0)))
+        rng = random.Random(3)
+        spins = [rules.spin(rng) for _ in range(100_000)]
+        for reel, weights in enumerate(reels):
+            seen = Counter(s[reel] for s in spins)
+            total = sum(weights.values())
+            for sym in rules.symbols:
+                self.assertAlmostEqual(seen[sym] / len(spins), weights.get(sym, 0) / total, delta=0.01,
+                                       msg=f"reel {reel} {sym}")
+
+    def test_custom_paytable(self):
+        cfg = {"symbols": {"A": 1, "B": 1},
+               "paytable": [{"match": ["A", "A", "A"], "share": 0.5, "flat": 10},
+                            {"match": ["*", "*", "B"], "flat": 7}]}
+        rules = SlotsRules().with_config(self.write(json.dumps(cfg)))
+        self.assertEqual(rules.line("A", "A", "A"), (0.5, 10))
+        self.assertEqual(rules.line("A", "B", "B"), (0.0, 7))
+        self.assertEqual(rules.line("B", "A", "A"), (0.0, 0))
+        self.assertEqual(rules.win(rules.line("A", "A", "A"), rules.seed + 100), 60)
+
+    def test_malformed_json(self):
+        path = self.write('{"reels": [')
+        with self.assertRaises(ValueError):
+            SlotsRules().with_config(path)
+        with mock.patch.dict(os.environ, {"SLOTS_PAYTABLE": path}), self.assertRaises(ValueError):
+            SlotsRules.from_env()
+
+    def test_bad_config(self):
+        bad = [{"reels": [{"A": 1}, {"A": 1}]},
+               {"symbols": {"A": 1}, "paytable": [{"match": "quad"}]},
+               {"symbols": {"A": 1}, "paytable": [{"match": ["A", "Z", "*"]}]},
+               {"symbols": {"A": 1}, "paytable": [{"match": ["A", "A"]}]}]
+        for cfg in bad:
+            with self.assertRaises(ValueError, msg=cfg):
+                SlotsRules().with_config(self.write(json.dumps(cfg)))
+
+
+class DefaultPaytableTest(unittest.TestCase):
+    def test_flat_lookup_matches_rules(self):
+        rules = SlotsRules()
+        for pot in (0, rules.seed, rules.seed + 1500, rules.seed + 2000, rules.seed + 12345):
+            available = max(0, pot - rules.seed)
+            for r in itertools.product(rules.symbols, repeat=3):
+                if r[0] == r[1] == r[2]:
+                    expected = int(available * 0.8)
+                elif len(set(r)) == 2:
+                    expected = min(2000, available)
+                else:
+                    expected = 0
+                self.assertEqual(rules.win(rules.line(*r), pot), expected, msg=(r, pot))
+
+    def test_win_never_dips_below_seed(self):
+        rules = SlotsRules()
+        pot = rules.seed + 500
+        self.assertEqual(rules.win(rules.line("🍒", "🍒", "🍋"), pot), 500)
+        self.assertEqual(rules.win(rules.line("🍒", "🍒", "🍒"), rules.seed - 10), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
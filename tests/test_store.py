@@ -0,0 +1,360 @@
+# tests/test_store.py — the same contract checks against MemoryStore and SQLiteStore
+# SQLiteStore runs on a scratch shard with the bot's schema (elihause_bot._open_shard), so that
+# half is skipped where discord.py isn't installed. Run with `python -m pytest -q tests`.
+import os, sys, tempfile, unittest
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from elihaus_games import lotto_draw
+from elihaus_store import AlreadyBet, InsufficientFunds, MemoryStore, RoundClosed, SQLiteStore
+
+_SCRATCH = tempfile.mkdtemp(prefix="elihaus-test-")
+os.environ.setdefault("DISCORD_TOKEN", "test")
+os.environ.setdefault("ELIHAUS_DB_DIR", _SCRATCH)
+os.environ.setdefault("ELIHAUS_DB", os.path.join(_SCRATCH, "legacy.db"))
+try:
+    import elihause_bot
+except ImportError:  # no discord.py here
+    elihause_bot = None
+
+DAY = 86400
+
+
+class StoreContract:
+    """Mixed into one TestCase per backend; make_store(clock) builds a fresh, empty store."""
+
+    def make_store(self, clock):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.now = datetime(2026, 1, 3, 12, 0, tzinfo=timezone.utc)
+        self.store = self.make_store(lambda: self.now.isoformat())
+
+    def tick(self, seconds: int):
+        self.now += timedelta(seconds=seconds)
+
+    def fund(self, uid: str, coins: int):
+        self.store.change_balance(uid, coins, "admin_adjust", "test")
+
+    def open_round(self, rid: str = "r1", window: int = 60):
+        return self.store.open_round(rid, "c1", "admin", (self.now + timedelta(seconds=window)).isoformat())
+
+    # ---- place_bet ----
+    def test_place_bet_debits_and_records(self):
+        self.fund("u1", 100)
+        self.assertEqual(self.open_round(), "#1")
+        placed = self.store.place_bet("r1", "c1", "u1", "red", 30, "bet red")
+        self.assertEqual((placed.balance_before, placed.balance), (100, 70))
+        self.assertEqual((placed.snapshot.bet_count, placed.snapshot.pool), (1, 30))
+        self.assertEqual(placed.snapshot.latest, [("u1", "red", 30)])
+        self.assertEqual(self.store.get_balance("u1"), 70)
+        self.assertEqual(self.store.get_bet("r1", "u1").choice, "red")
+        self.assertTrue(self.store.has_ledger_kind("u1", "bet"))
+
+    def test_place_bet_round_closed(self):
+        self.fund("u1", 100)
+        with self.assertRaises(RoundClosed):
+            self.store.place_bet("missing", "c1", "u1", "red", 10, "")
+        self.open_round(window=60)
+        self.tick(61)
+        with self.assertRaises(RoundClosed):
+            self.store.place_bet("r1", "c1", "u1", "red", 10, "")
+        self.assertEqual(self.store.get_balance("u1"), 100)
+        self.assertIsNone(self.store.get_bet("r1", "u1"))
+        self.assertFalse(self.store.has_ledger_kind("u1", "bet"))
+
+    def test_place_bet_already_bet(self):
+        self.fund("u1", 100)
+        self.open_round()
+        self.store.place_bet("r1", "c1", "u1", "red", 30, "")
+        with self.assertRaises(AlreadyBet) as err:
+            self.store.place_bet("r1", "c1", "u1", "black", 20, "")
+        self.assertEqual((err.exception.bet.choice, err.exception.bet.stake, err.exception.balance), ("red", 30, 70))
+        self.assertEqual(self.store.get_balance("u1"), 70)
+        self.assertEqual(self.store.round_snapshot("r1").bet_count, 1)
+
+    def test_place_bet_snapshot_newest_first(self):
+        self.fund("u1", 100)
+        self.fund("u2", 100)
+        self.open_round()
+        self.store.place_bet("r1", "c1", "u1", "red", 30, "")
+        self.tick(1)
+        placed = self.store.place_bet("r1", "c1", "u2", "black", 20, "")
+        self.assertEqual((placed.balance, placed.snapshot.bet_count, placed.snapshot.pool), (80, 2, 50))
+        self.assertEqual(placed.snapshot.latest, [("u2", "black", 20), ("u1", "red", 30)])
+
+    def test_place_bet_insufficient_funds(self):
+        self.fund("u1", 10)
+        self.open_round()
+        with self.assertRaises(InsufficientFunds) as err:
+            self.store.place_bet("r1", "c1", "u1", "red", 30, "")
+        self.assertEqual(err.exception.balance, 10)
+        self.assertEqual(self.store.get_balance("u1"), 10)
+        self.assertIsNone(self.store.get_bet("r1", "u1"))
+        self.assertFalse(self.store.has_ledger_kind("u1", "bet"))
+        self.assertEqual(self.store.round_snapshot("r1").bet_count, 0)
+
+    # ---- ledger ----
+    def test_post_ledger_and_debit(self):
+        self.store.post_ledger("u1", 50, "wl_deposit", "refund")
+        self.assertEqual(self.store.get_balance("u1"), 50)
+        self.assertTrue(self.store.has_ledger_kind("u1", "wl_deposit"))
+        _tx_id, bal = self.store.debit("u1", 20, "wl_deposit", "deposit")
+        self.assertEqual((bal, self.store.get_balance("u1")), (30, 30))
+        with self.assertRaises(InsufficientFunds) as err:
+            self.store.debit("u1", 31, "wl_deposit", "deposit")
+        self.assertEqual(err.exception.balance, 30)
+        self.assertEqual(self.store.get_balance("u1"), 30)
+
+    # ---- settle / cancel ----
+    def bet_round(self):
+        for uid in ("u1", "u2"):
+            self.fund(uid, 100)
+        self.open_round()
+        self.store.place_bet("r1", "c1", "u1", "red", 30, "")
+        self.store.place_bet("r1", "c1", "u2", "black", 20, "")
+
+    def test_settle_round_pays_once(self):
+        self.bet_round()
+        seen = []
+        payouts = lambda bets: seen.append(bets) or [(uid, stake * 2) for uid, choice, stake in bets if choice == "red"]
+        settled = self.store.settle_round("r1", "red", 1, "seed", payouts, "roulette:r1|1 red")
+        self.assertEqual(seen, [[("u1", "red", 30), ("u2", "black", 20)]])
+        self.assertEqual((settled.credits, settled.pool), ([("u1", 60)], 50))
+        r = settled.round
+        self.assertEqual((r.status, r.outcome, r.pocket, r.seed), ("RESOLVED", "red", 1, "seed"))
+        self.assertEqual((self.store.get_balance("u1"), self.store.get_balance("u2")), (130, 80))
+        self.assertIsNone(self.store.settle_round("r1", "red", 1, "seed", payouts, ""))
+        self.assertIsNone(self.store.cancel_round("r1", "refund"))
+        self.assertEqual(self.store.get_balance("u1"), 130)
+
+    def test_cancel_round_refunds(self):
+        self.bet_round()
+        cancelled = self.store.cancel_round("r1", "roulette:r1|refund")
+        self.assertEqual((cancelled.round.status, cancelled.credits), ("CANCELLED", [("u1", 30), ("u2", 20)]))
+        self.assertEqual((self.store.get_balance("u1"), self.store.get_balance("u2")), (100, 100))
+        self.assertIsNone(self.store.settle_round("r1", "red", 1, "seed", lambda bets: [], ""))
+        self.assertIsNone(self.store.cancel_round("r1", "roulette:r1|refund"))
+
+    def test_cancel_round_without_refund(self):
+        self.bet_round()
+        self.assertEqual(self.store.cancel_round("r1").credits, [])
+        self.assertEqual(self.store.get_round("r1").status, "CANCELLED")
+        self.assertEqual(self.store.get_balance("u1"), 70)
+        self.assertIsNone(self.store.cancel_round("missing"))
+
+    # ---- claim ----
+    def test_claim_cooldown(self):
+        t0 = 1_000_000
+        first = self.store.claim("u1", "daily", 50, t0, t0 - DAY, "daily")
+        self.assertEqual((first.claimed, first.balance, first.last_ts), (True, 50, t0))
+        again = self.store.claim("u1", "daily", 50, t0 + 60, t0 + 60 - DAY, "daily")
+        self.assertEqual((again.claimed, again.balance, again.last_ts), (False, 50, t0))
+        weekly = self.store.claim("u1", "weekly", 200, t0 + 60, t0 + 60 - 7 * DAY, "weekly")
+        self.assertEqual((weekly.claimed, weekly.balance), (True, 250))
+        later = self.store.claim("u1", "daily", 50, t0 + DAY, t0, "daily")
+        self.assertEqual((later.claimed, later.balance, later.last_ts), (True, 300, t0 + DAY))
+        self.assertEqual(self.store.get_balance("u1"), 300)
+        self.assertEqual(self.store.get_user("u1").daily_ts, t0 + DAY)
+
+    # ---- lotto ----
+    def test_buy_tickets(self):
+        self.fund("u1", 100)
+        self.fund("u2", 100)
+        self.assertEqual(self.store.buy_tickets("u1", "2026-W01", 3, 30), 70)
+        self.assertEqual(self.store.buy_tickets("u2", "2026-W01", 1, 10), 90)
+        self.assertEqual(self.store.ticket_counts("2026-W01", "u1"), (4, 3))
+        self.assertEqual(self.store.ticket_counts("2026-W02", "u1"), (0, 0))
+        self.assertTrue(self.store.has_ledger_kind("u1", "redeem"))
+        with self.assertRaises(InsufficientFunds) as err:
+            self.store.buy_tickets("u1", "2026-W01", 100, 1000)
+        self.assertEqual(err.exception.balance, 70)
+        self.assertEqual(self.store.get_balance("u1"), 70)
+        self.assertEqual(self.store.ticket_counts("2026-W01", "u1"), (4, 3))
+
+    def test_draw_lotto_once(self):
+        self.assertIsNone(self.store.draw_lotto("2026-W01", "seed", 2, 5, "Shop"))
+        for uid, n in (("a", 3), ("b", 1), ("c", 2)):
+            self.fund(uid, 100)
+            self.store.buy_tickets(uid, "2026-W01", n, n)
+        drawn = self.store.draw_lotto("2026-W01", "seed", 2, 5, "Shop")
+        self.assertEqual([w for w, _p in drawn], lotto_draw("seed", [("a", 3), ("b", 1), ("c", 2)], 2))
+        self.assertTrue(self.store.lotto_drawn("2026-W01"))
+        self.assertFalse(self.store.lotto_drawn("2026-W02"))
+        for place, (winner, prize_id) in enumerate(drawn, 1):
+            prize = self.store.get_prize(prize_id)
+            self.assertEqual((prize.winner_id, prize.kind, prize.amount, prize.status), (winner, "wl", 5, "pending"))
+            self.assertIn(f'"place": {place}', prize.meta)
+        self.assertIsNone(self.store.draw_lotto("2026-W01", "other", 2, 5, "Shop"))
+
+    # ---- prize claims / fulfilment ----
+    def drawn_prizes(self, winners: int = 1) -> list[int]:
+        self.fund("a", 100)
+        self.store.buy_tickets("a", "2026-W01", 1, 1)
+        return [prize_id for _w, prize_id in self.store.draw_lotto("2026-W01", "seed", winners, 5, "Shop")]
+
+    def test_claim_prize_once(self):
+        [prize_id] = self.drawn_prizes()
+        self.store.set_prize_ticket(prize_id, 42)
+        self.assertTrue(self.store.claim_prize(prize_id, "a", "Eli", "https://imvu.example/eli", "hi"))
+        self.assertFalse(self.store.claim_prize(prize_id, "a", "Eli", "", ""))
+        prize = self.store.get_prize(prize_id)
+        self.assertEqual((prize.status, prize.ticket_channel_id), ("claimed", "42"))
+        [item] = self.store.lease_fulfilments("admin", 10, 1000, 2000)
+        self.assertEqual((item.prize_id, item.winner_id, item.imvu_name, item.imvu_profile, item.amount),
+                         (prize_id, "a", "Eli", "https://imvu.example/eli", 5))
+
+    def test_fulfilment_leases(self):
+        for uid in ("u1", "u2", "u3"):
+            self.fund(uid, 100)
+            req = self.store.create_withdrawal(uid, 100, 1, uid, "")
+            self.store.approve_withdrawal(req, "admin", "ok", 100, "Shop")
+        mine = self.store.lease_fulfilments("a1", 2, 1000, 2000)
+        self.assertEqual([f.winner_id for f in mine], ["u1", "u2"])
+        self.assertIn('"shop": "Shop"', mine[0].meta)
+        theirs = self.store.lease_fulfilments("a2", 5, 1000, 2000)
+        self.assertEqual([f.winner_id for f in theirs], ["u3"])
+        queue = [f.queue_id for f in mine + theirs]
+        # a2 can't finish a1's items while the lease holds
+        self.assertEqual(self.store.complete_fulfilments("a2", queue, 1500), [queue[2]])
+        self.assertEqual(self.store.complete_fulfilments("a1", queue[:1], 1500), queue[:1])
+        self.assertEqual(self.store.get_prize(mine[0].prize_id).status, "fulfilled")
+        self.store.release_fulfilments("a1", queue[1:2])
+        self.assertEqual([f.queue_id for f in self.store.lease_fulfilments("a2", 5, 1500, 2500)], queue[1:2])
+        # expired leases are up for grabs
+        self.assertEqual(self.store.complete_fulfilments("a1", queue[1:2], 2600), queue[1:2])
+        self.assertEqual(self.store.lease_fulfilments("a1", 5, 3000, 4000), [])
+
+    # ---- withdrawals ----
+    def test_pending_withdrawals(self):
+        self.fund("u1", 150)
+        reqs = []
+        for coins in (100, 200, 300):
+            reqs.append(self.store.create_withdrawal("u1", coins, coins // 100, "Eli", ""))
+            self.tick(1)
+        self.store.reject_withdrawal(reqs[2], "admin", "no")
+        self.store.set_withdrawal_ticket(reqs[0], 7, 8)
+        self.assertEqual(self.store.count_withdrawals("pending"), 2)
+        self.assertEqual(self.store.count_withdrawals("rejected"), 1)
+        page = self.store.pending_withdrawals(None, ">", 10)
+        self.assertEqual([(r.request.id, r.balance, r.payable) for r in page], [(reqs[0], 150, True), (reqs[1], 150, False)])
+        self.assertEqual((page[0].request.ticket_channel_id, page[0].request.message_id), ("7", "8"))
+        first = page[0].request
+        self.assertEqual([r.request.id for r in self.store.pending_withdrawals((first.created_ts, first.id), ">", 10)],
+                         reqs[1:2])
+        self.assertEqual([r.request.id for r in self.store.pending_withdrawals((first.created_ts, first.id), ">=", 1)],
+                         reqs[:1])
+
+    def test_approve_withdrawal(self):
+        self.fund("u1", 100)
+        req = self.store.create_withdrawal("u1", 200, 2, "Eli", "https://imvu.example/eli")
+        self.assertEqual(self.store.approve_withdrawal(req, "admin", "ok", 100, "Shop"), ("insufficient", 100))
+        self.assertEqual(self.store.get_withdrawal(req).status, "pending")
+        self.assertEqual(self.store.approve_withdrawal(req, "admin", "ok", 100, "Shop", coins=100), ("approved", 0))
+        w = self.store.get_withdrawal(req)
+        self.assertEqual((w.status, w.coins, w.gifts, w.reviewer_id, w.review_note), ("approved", 100, 1, "admin", "ok"))
+        self.assertTrue(self.store.has_ledger_kind("u1", "wl_withdraw"))
+        self.assertEqual(self.store.approve_withdrawal(req, "admin", "ok", 100, "Shop"), ("not_pending", 0))
+        self.assertFalse(self.store.reject_withdrawal(req, "admin", "late"))
+        self.assertEqual(self.store.get_balance("u1"), 0)
+
+    def test_reject_withdrawal(self):
+        req = self.store.create_withdrawal("u1", 100, 1, "Eli", "")
+        self.assertTrue(self.store.reject_withdrawal(req, "admin", "no"))
+        w = self.store.get_withdrawal(req)
+        self.assertEqual((w.status, w.review_note), ("rejected", "no"))
+        self.assertEqual(self.store.approve_withdrawal(req, "admin", "ok", 100, "Shop"), ("not_pending", 0))
+
+    # ---- leaderboards ----
+    def test_balance_leaderboard_pages_and_ranks(self):
+        for uid, coins in (("a", 50), ("b", 300), ("c", 50), ("d", 10), ("e", 200)):
+            self.fund(uid, coins)
+        board = [("b", 300), ("e", 200), ("c", 50), ("a", 50), ("d", 10)]
+        self.assertEqual(self.store.leaderboard_page("balance", None, ">", 10), board)
+        self.assertEqual(self.store.leaderboard_page("balance", (200, "e"), ">", 2), board[2:4])
+        self.assertEqual(self.store.leaderboard_page("balance", (200, "e"), ">=", 2), board[1:3])
+        self.assertEqual(self.store.leaderboard_page("balance", (50, "a"), "<", 2), board[1:3])
+        self.assertEqual(self.store.leaderboard_page("balance", (50, "a"), "<=", 2), board[2:4])
+        self.assertEqual([self.store.leaderboard_rank("balance", (v, u)) for u, v in board], [1, 2, 3, 4, 5])
+        self.assertEqual(self.store.leaderboard_entry("balance", "c"), 50)
+        self.assertIsNone(self.store.leaderboard_entry("balance", "zz"))
+        self.assertEqual(self.store.leaderboard_size("balance"), 5)
+
+    def test_roulette_leaderboard_since(self):
+        self.fund("a", 100)
+        self.fund("b", 100)
+        self.open_round("r1")
+        self.store.place_bet("r1", "c1", "a", "red", 40, "")
+        self.store.change_balance("a", 80, "payout", "r1")
+        since = self.now.isoformat()
+        self.tick(10)
+        self.open_round("r2")
+        self.store.place_bet("r2", "c1", "b", "red", 30, "")
+        self.assertEqual(self.store.leaderboard_page("roulette", None, ">", 10), [("a", 40), ("b", -30)])
+        self.tick(1)
+        self.assertEqual(self.store.leaderboard_page("roulette", None, ">", 10, since=self.now.isoformat()), [])
+        self.assertEqual(self.store.leaderboard_page("roulette", None, ">", 10, since=since), [("a", 40), ("b", -30)])
+        self.assertEqual(self.store.leaderboard_rank("roulette", (-30, "b")), 2)
+        self.assertEqual(self.store.leaderboard_size("roulette"), 2)
+        with self.assertRaises(ValueError):
+            self.store.leaderboard_size("slots")
+
+    def test_leaderboard_standing(self):
+        self.bet_round()
+        self.store.settle_round("r1", "red", 1, "seed", lambda bets: [("u1", 60)], "")
+        self.store.post_ledger("u3", -5, "bet", "slots|entry x1")
+        self.store.post_ledger("u3", 500, "claim", "daily")  # not a game kind
+        board = [("u1", 30), ("u3", -5), ("u2", -20)]
+        self.assertEqual(self.store.leaderboard_page("roulette", None, ">", 10), board)
+        for rank, (uid, net) in enumerate(board, 1):
+            standing = self.store.leaderboard_standing("roulette", uid)
+            self.assertEqual((standing.rank, standing.value, standing.size), (rank, net, 3))
+        nobody = self.store.leaderboard_standing("roulette", "zz")
+        self.assertEqual((nobody.rank, nobody.value, nobody.size), (None, None, 3))
+        week = self.store.leaderboard_standing("roulette", "u2", since=self.now.isoformat())
+        self.assertEqual((week.rank, week.value, week.size), (3, -20, 3))
+        self.tick(1)
+        self.assertEqual(self.store.leaderboard_standing("roulette", "u2", since=self.now.isoformat()).size, 0)
+        top = self.store.leaderboard_standing("balance", "u3")
+        self.assertEqual((top.rank, top.value, top.size), (1, 495, 3))
+        # a cancelled round's refunds net out to nothing
+        self.tick(1)
+        self.open_round("r2")
+        self.store.place_bet("r2", "c1", "u1", "red", 10, "")
+        self.store.cancel_round("r2", "roulette:r2|refund")
+        self.assertEqual(self.store.leaderboard_page("roulette", None, ">", 10), board)
+
+
+class MemoryStoreTest(StoreContract, unittest.TestCase):
+    def make_store(self, clock):
+        return MemoryStore(clock)
+
+
+@unittest.skipIf(elihause_bot is None, "discord.py not installed")
+class SQLiteStoreTest(StoreContract, unittest.TestCase):
+    def make_store(self, clock):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        conn = elihause_bot._open_shard(os.path.join(tmp.name, "guild_0.db"))
+        self.addCleanup(conn.close)
+        self.conn = conn
+        return SQLiteStore(lambda: conn, clock)
+
+    def test_roulette_net_backfilled_once(self):
+        # a shard from before roulette_net: the ledger is summed into it when the schema is applied
+        self.conn.execute("DROP TRIGGER tx_roulette_net")
+        self.conn.execute("DROP TABLE roulette_net")
+        self.store.post_ledger("a", -40, "bet", "")
+        self.store.post_ledger("a", 100, "payout", "")
+        self.store.post_ledger("b", -30, "bet", "")
+        self.store.post_ledger("b", 70, "claim", "")
+        elihause_bot.init_db(self.conn.cursor())
+        elihause_bot.init_db(self.conn.cursor())
+        self.store.post_ledger("b", -5, "bet", "")
+        self.assertEqual(sorted(self.conn.execute("SELECT discord_id, net FROM roulette_net")), [("a", 60), ("b", -35)])
+        self.assertEqual(self.store.leaderboard_page("roulette", None, ">", 10), [("a", 60), ("b", -35)])
+
+
+if __name__ == "__main__":
+    unittest.main()